@@ -0,0 +1,290 @@
+"""Headless batch runner distributing scenario sweeps over several simulator instances.
+
+Run with: python -m src.batch_runner --ports 2000 2002 --output results/batch_summary.json
+Each worker process binds to one simulator port and runs its share of the sweep.
+"""
+import argparse
+import copy
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from .utils.config_loader import load_config
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'settings.yaml')
+
+# Speed drop (m/s per second) counted as a hard braking event
+HARD_BRAKE_DECELERATION = 4.0
+
+# ScenarioType values that ScenarioManager.setup_scenario can build
+SUPPORTED_SCENARIOS = ('urban_driving', 'highway', 'intersection')
+
+
+@dataclass
+class RunSpec:
+    run_id: int
+    scenario: str
+    weather: str
+    num_vehicles: int
+    seed: int
+    ticks: int
+    tick_rate: float
+
+
+def expand_sweep(sweep: Dict[str, Any]) -> List[RunSpec]:
+    """Expand scenario x weather x vehicle count x seed into individual runs"""
+    for scenario in sweep['scenarios']:
+        if scenario not in SUPPORTED_SCENARIOS:
+            raise ValueError(f"Scenario {scenario} is not supported by ScenarioManager")
+
+    combos = itertools.product(sweep['scenarios'], sweep['weathers'],
+                               sweep['num_vehicles'], sweep['seeds'])
+    return [
+        RunSpec(run_id, scenario, weather, int(num_vehicles), int(seed),
+                int(sweep['ticks']), float(sweep['tick_rate']))
+        for run_id, (scenario, weather, num_vehicles, seed) in enumerate(combos)
+    ]
+
+
+def run_scenario(spec: RunSpec, host: str, port: int, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one headless scenario against the simulator on port and collect metrics"""
+    import carla
+    from .scenario_manager import ScenarioManager, ScenarioConfig, ScenarioType
+    from .sensor_manager import SensorManager
+    from .vehicle_manager import VehicleManager
+
+    random.seed(spec.seed)
+    np.random.seed(spec.seed)
+
+    client = carla.Client(host, port)
+    client.set_timeout(config['simulation'].get('timeout', 10.0))
+    world = client.get_world()
+    original_settings = world.get_settings()
+
+    settings = world.get_settings()
+    settings.synchronous_mode = True
+    settings.fixed_delta_seconds = spec.tick_rate
+    settings.no_rendering_mode = True
+    world.apply_settings(settings)
+
+    # Each simulator instance needs its own traffic manager port
+    vehicle_manager = VehicleManager(world, client, tm_port=port + 6000)
+    vehicle_manager.traffic_manager.set_random_device_seed(spec.seed)
+
+    # Only the event sensors are needed for safety metrics
+    sensor_config = copy.deepcopy(config)
+    for sensor_type, sensor in sensor_config['sensors'].items():
+        if isinstance(sensor, dict) and 'enabled' in sensor:
+            sensor['enabled'] = sensor_type in ('collision', 'lane_invasion')
+    sensor_config['sensors']['lidar'].pop('lod', None)
+    sensor_manager = SensorManager(world, sensor_config, client)
+
+    try:
+        scenario_manager = ScenarioManager(world, vehicle_manager, sensor_manager)
+        scenario_manager.setup_scenario(ScenarioConfig(
+            type=ScenarioType(spec.scenario),
+            num_vehicles=spec.num_vehicles,
+            weather=spec.weather,
+            time_of_day='Noon',
+            traffic_density=0.5
+        ))
+        vehicles = vehicle_manager.get_vehicles()
+        if not vehicles:
+            raise RuntimeError("Scenario spawned no vehicles")
+        sensor_manager.attach_sensors_batch([(vehicle, None) for vehicle in vehicles])
+
+        metrics = _collect_metrics(world, sensor_manager, vehicles, spec)
+        metrics['vehicles_spawned'] = len(vehicles)
+        return metrics
+    finally:
+        sensor_manager.cleanup()
+        vehicle_manager.cleanup()
+        world.apply_settings(original_settings)
+
+
+def _collect_metrics(world, sensor_manager, vehicles, spec: RunSpec) -> Dict[str, Any]:
+    """Tick the world and accumulate throughput and safety metrics"""
+    vehicle_ids = [vehicle.id for vehicle in vehicles]
+    last_sequences = {vid: sensor_manager.get_sensor_sequences(vid) for vid in vehicle_ids}
+    collision_events = lane_invasions = hard_brakes = 0
+    collided = set()
+    min_gap = float('inf')
+    speed_sum = 0.0
+    speed_ticks = 0
+    previous_speeds = None
+    braking = np.zeros(len(vehicle_ids), dtype=bool)
+
+    start_time = time.perf_counter()
+    for _ in range(spec.ticks):
+        world.tick()
+        snapshot = world.get_snapshot()
+
+        # Vehicles missing from the snapshot stay NaN and drop out of every metric this tick
+        kinematics = np.full((len(vehicle_ids), 4), np.nan, dtype=np.float64)
+        for i, vehicle_id in enumerate(vehicle_ids):
+            actor_snapshot = snapshot.find(vehicle_id)
+            if actor_snapshot is None:
+                continue
+            location = actor_snapshot.get_transform().location
+            velocity = actor_snapshot.get_velocity()
+            kinematics[i] = (location.x, location.y, location.z,
+                             (velocity.x ** 2 + velocity.y ** 2 + velocity.z ** 2) ** 0.5)
+        present = ~np.isnan(kinematics[:, 3])
+
+        speeds = kinematics[:, 3]
+        if present.any():
+            speed_sum += float(speeds[present].mean())
+            speed_ticks += 1
+        if previous_speeds is not None:
+            # One braking manoeuvre is one event, however many ticks it lasts
+            now_braking = (previous_speeds - speeds) / spec.tick_rate > HARD_BRAKE_DECELERATION
+            hard_brakes += int(np.count_nonzero(now_braking & ~braking))
+            braking = now_braking
+        previous_speeds = speeds
+
+        positions = kinematics[present, :3]
+        if len(positions) > 1:
+            diff = positions[:, None, :] - positions[None, :, :]
+            gaps = np.einsum('ijk,ijk->ij', diff, diff)
+            np.fill_diagonal(gaps, np.inf)
+            min_gap = min(min_gap, float(np.sqrt(gaps.min())))
+
+        # New sensor sequence numbers mean new collision / lane invasion events
+        for vehicle_id in vehicle_ids:
+            sequences = sensor_manager.get_sensor_sequences(vehicle_id)
+            previous = last_sequences[vehicle_id]
+            if sequences.get('collision', 0) > previous.get('collision', 0):
+                collision_events += sequences['collision'] - previous.get('collision', 0)
+                collided.add(vehicle_id)
+            if sequences.get('lane_invasion', 0) > previous.get('lane_invasion', 0):
+                lane_invasions += sequences['lane_invasion'] - previous.get('lane_invasion', 0)
+            last_sequences[vehicle_id] = sequences
+    wall_time = time.perf_counter() - start_time
+
+    return {
+        'wall_time_s': wall_time,
+        'ticks_per_s': spec.ticks / wall_time,
+        'real_time_factor': spec.ticks * spec.tick_rate / wall_time,
+        'vehicle_ticks_per_s': spec.ticks * len(vehicle_ids) / wall_time,
+        'mean_speed_kmh': speed_sum / speed_ticks * 3.6 if speed_ticks else 0.0,
+        'collision_events': collision_events,
+        'vehicles_in_collision': len(collided),
+        'lane_invasions': lane_invasions,
+        'hard_brake_events': hard_brakes,
+        'min_gap_m': min_gap if min_gap != float('inf') else None
+    }
+
+
+# Per-process simulator binding, set by the pool initializer
+_worker_host: Optional[str] = None
+_worker_port: Optional[int] = None
+
+
+def _init_worker(host: str, port_queue) -> None:
+    global _worker_host, _worker_port
+    _worker_host = host
+    _worker_port = port_queue.get()
+    logging.basicConfig(level=logging.INFO)
+
+
+def _execute(spec: RunSpec, run_fn: Callable, config: Dict[str, Any]) -> Dict[str, Any]:
+    result = {**asdict(spec), 'port': _worker_port}
+    try:
+        result.update(run_fn(spec, _worker_host, _worker_port, config))
+        result['status'] = 'ok'
+    except Exception as e:
+        logging.error(f"Run {spec.run_id} on port {_worker_port} failed: {e}")
+        result.update(status='failed', error=str(e))
+    return result
+
+
+def run_batch(specs: List[RunSpec], ports: List[int], config: Dict[str, Any],
+              host: str = 'localhost', run_fn: Callable = run_scenario) -> List[Dict[str, Any]]:
+    """Distribute runs over one worker process per simulator port"""
+    ctx = multiprocessing.get_context('spawn')
+    port_queue = ctx.Manager().Queue()
+    for port in ports:
+        port_queue.put(port)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=len(ports), mp_context=ctx,
+                             initializer=_init_worker, initargs=(host, port_queue)) as pool:
+        futures = [pool.submit(_execute, spec, run_fn, config) for spec in specs]
+        for future in as_completed(futures):
+            result = future.result()
+            logging.info(f"Run {result['run_id']} ({result['scenario']}, {result['weather']}, "
+                         f"{result['num_vehicles']} vehicles, seed {result['seed']}): {result['status']}")
+            results.append(result)
+
+    return sorted(results, key=lambda r: r['run_id'])
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate per-run metrics by scenario"""
+    aggregates = {}
+    for scenario in sorted({r['scenario'] for r in results}):
+        runs = [r for r in results if r['scenario'] == scenario and r['status'] == 'ok']
+        if not runs:
+            aggregates[scenario] = {'runs': 0}
+            continue
+        gaps = [r['min_gap_m'] for r in runs if r.get('min_gap_m') is not None]
+        aggregates[scenario] = {
+            'runs': len(runs),
+            'mean_ticks_per_s': float(np.mean([r['ticks_per_s'] for r in runs])),
+            'mean_real_time_factor': float(np.mean([r['real_time_factor'] for r in runs])),
+            'mean_speed_kmh': float(np.mean([r['mean_speed_kmh'] for r in runs])),
+            'collision_events': int(sum(r['collision_events'] for r in runs)),
+            'lane_invasions': int(sum(r['lane_invasions'] for r in runs)),
+            'hard_brake_events': int(sum(r['hard_brake_events'] for r in runs)),
+            'min_gap_m': min(gaps) if gaps else None
+        }
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'total_runs': len(results),
+        'failed_runs': sum(1 for r in results if r['status'] != 'ok'),
+        'aggregates': aggregates,
+        'runs': results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a headless scenario sweep over several simulators")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help="Path to settings.yaml")
+    parser.add_argument('--sweep', help="YAML file overriding the batch.sweep section of the config")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--ports', type=int, nargs='+', help="Simulator ports, one worker per port")
+    parser.add_argument('--output', help="Summary JSON path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    config = load_config(args.config)
+    batch_config = config.get('batch', {})
+    sweep = dict(batch_config.get('sweep', {}))
+    if args.sweep:
+        sweep.update(load_config(args.sweep))
+    sweep.setdefault('tick_rate', config['simulation']['tick_rate'])
+
+    specs = expand_sweep(sweep)
+    ports = args.ports or batch_config.get('ports', [config['simulation'].get('port', 2000)])
+    output = args.output or batch_config.get('output', os.path.join('results', 'batch_summary.json'))
+    logging.info(f"Running {len(specs)} runs over {len(ports)} simulator(s)")
+
+    summary = summarize(run_batch(specs, ports, config, host=args.host))
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(summary, f, indent=2)
+    logging.info(f"Wrote summary of {summary['total_runs']} runs to {output}")
+    return 0 if summary['failed_runs'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1076 @@
+"""Micro-benchmarks and stress tests for the simulation hot paths.
+
+Run with: python -m src.benchmarks [name ...]
+None of these need a running CARLA server.
+"""
+import argparse
+import sys
+import threading
+import time
+from typing import Callable, Dict
+
+
+def stress_sensor_slots(num_writers: int = 32, num_readers: int = 4,
+                        duration: float = 2.0) -> Dict[str, float]:
+    """Hammer sensor slots from many callback threads while readers poll them"""
+    from .utils.sensor_slot import SensorSlot
+
+    slots = {f"sensor_{i}": SensorSlot() for i in range(num_writers)}
+    stop = threading.Event()
+    errors = []
+    read_stats = []
+    published = [0] * num_writers
+
+    def writer(index: int, slot: SensorSlot):
+        n = 0
+        while not stop.is_set():
+            n += 1
+            # Payload mirrors the sequence so readers can detect torn or reordered pairs
+            slot.publish(n)
+        published[index] = n
+
+    def reader():
+        last_seen = {name: 0 for name in slots}
+        reads, total = 0, 0.0
+        while not stop.is_set():
+            start = time.perf_counter()
+            snapshot = {name: slot.read() for name, slot in slots.items()}
+            total += time.perf_counter() - start
+            reads += 1
+            for name, (seq, value) in snapshot.items():
+                if seq and seq != value:
+                    errors.append(f"{name}: sequence {seq} carries value {value}")
+                if seq < last_seen[name]:
+                    errors.append(f"{name}: sequence went backwards {last_seen[name]} -> {seq}")
+                last_seen[name] = seq
+        read_stats.append((reads, total))
+
+    threads = [threading.Thread(target=writer, args=(i, slot))
+               for i, slot in enumerate(slots.values())]
+    threads += [threading.Thread(target=reader) for _ in range(num_readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise AssertionError(f"{len(errors)} slot consistency errors, first: {errors[0]}")
+
+    reads = sum(r for r, _ in read_stats)
+    return {
+        'writers': num_writers,
+        'readers': num_readers,
+        'publishes_per_s': sum(published) / duration,
+        'reads_per_s': reads / duration,
+        'mean_read_all_slots_us': sum(t for _, t in read_stats) / max(reads, 1) * 1e6,
+    }
+
+
+def bench_mixed_fleet(num_egos: int = 10, num_background: int = 500, ticks: int = 50,
+                      points_per_ego: int = 10000) -> Dict[str, float]:
+    """Per-tick V2V state cost for sensor-equipped egos plus kinematics-only background traffic"""
+    from datetime import datetime
+    import numpy as np
+    from .communication import Communication
+    from .data_structures import PointCloudData, VehicleState
+    from .utils.fleet_state import build_kinematic_states, fan_out_other_vehicles
+    from .utils.point_cloud_merger import PointCloudMerger
+
+    rng = np.random.default_rng(0)
+    communication = Communication()
+    merger = PointCloudMerger(max_point_age=1.0)
+    background_ids = list(range(num_egos + 1, num_egos + num_background + 1))
+
+    def ego_state(vehicle_id: int) -> VehicleState:
+        cloud = PointCloudData(
+            points=rng.uniform(-50, 50, (points_per_ego, 3)).astype(np.float32),
+            timestamps=np.full(points_per_ego, time.time(), dtype=np.float32),
+            tags=rng.integers(0, 23, points_per_ego).astype(np.int32),
+            source_vehicle=vehicle_id
+        )
+        return VehicleState(
+            vehicle_id=vehicle_id, timestamp=datetime.now(),
+            location=tuple(rng.uniform(-200, 200, 3)), rotation=(0.0, 0.0, 0.0),
+            velocity=(10.0, 0.0, 0.0), speed=36.0, sensor_data={}, other_vehicles={},
+            point_cloud_cache={'semantic_lidar': cloud}
+        )
+
+    timings = {'background_states': 0.0, 'fan_out': 0.0, 'broadcast': 0.0, 'merge': 0.0}
+    for _ in range(ticks):
+        ego_states = {vid: ego_state(vid) for vid in range(1, num_egos + 1)}
+        kinematics = rng.uniform(-200, 200, (num_background, 9))
+
+        start = time.perf_counter()
+        background_states = build_kinematic_states(
+            background_ids, kinematics[:, 0:3], kinematics[:, 3:6], kinematics[:, 6:9], datetime.now()
+        )
+        timings['background_states'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        fan_out_other_vehicles(ego_states, {**ego_states, **background_states})
+        timings['fan_out'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for state in background_states.values():
+            communication.broadcast_vehicle_state(state)
+        for state in ego_states.values():
+            communication.broadcast_vehicle_state(state)
+        timings['broadcast'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for state in ego_states.values():
+            state.combined_point_cloud = merger.merge_point_clouds(state, state.other_vehicles)
+        timings['merge'] += time.perf_counter() - start
+
+    results = {'egos': num_egos, 'background': num_background}
+    results.update({f"{name}_ms_per_tick": total / ticks * 1000 for name, total in timings.items()})
+    results['total_ms_per_tick'] = sum(timings.values()) / ticks * 1000
+    return results
+
+
+def bench_hazard_engine(num_vehicles: int = 200, iterations: int = 200) -> Dict[str, float]:
+    """Hazard engine tick cost for a fleet packed into a dense urban area"""
+    from datetime import datetime
+    import numpy as np
+    from .data_structures import VehicleState
+    from .hazard_engine import HazardEngine
+
+    rng = np.random.default_rng(0)
+    engine = HazardEngine()
+    positions = rng.uniform(-300, 300, (num_vehicles, 2))
+    headings = rng.uniform(-180, 180, num_vehicles)
+    speeds = rng.uniform(0, 20, num_vehicles)
+    velocities = np.stack([np.cos(np.radians(headings)), np.sin(np.radians(headings))], axis=1) * speeds[:, None]
+    states = {
+        vid: VehicleState(
+            vehicle_id=vid, timestamp=datetime.now(),
+            location=(positions[i, 0], positions[i, 1], 0.0), rotation=(0.0, headings[i], 0.0),
+            velocity=(velocities[i, 0], velocities[i, 1], 0.0), speed=speeds[i] * 3.6,
+            sensor_data={'imu': {'accelerometer': {'x': -6.0 if i % 20 == 0 else 0.0, 'y': 0.0, 'z': 9.8}}},
+            other_vehicles={}
+        )
+        for i, vid in enumerate(range(1, num_vehicles + 1))
+    }
+
+    timings, alert_count = [], 0
+    for _ in range(iterations):
+        alerts = engine.update(states, dt=0.05)
+        timings.append(engine.last_update_ms)
+        alert_count = sum(len(a) for a in alerts.values())
+
+    pruned = HazardEngine(prune_threshold=0)
+    pruned_timings = []
+    for _ in range(iterations):
+        pruned.update(states, dt=0.05)
+        pruned_timings.append(pruned.last_update_ms)
+
+    return {
+        'vehicles': num_vehicles,
+        'alerts_per_tick': alert_count,
+        'mean_ms': float(np.mean(timings)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'grid_pruned_mean_ms': float(np.mean(pruned_timings)),
+    }
+
+
+def bench_trajectory_prediction(num_vehicles: int = 1000, steps: int = 50,
+                                iterations: int = 100) -> Dict[str, float]:
+    """CTRV rollout cost for a large fleet, from VehicleStates and from raw arrays"""
+    from datetime import datetime
+    import numpy as np
+    from .data_structures import VehicleState
+    from .hazard_engine import HazardEngine
+    from .trajectory_predictor import TrajectoryPredictor, predict_ctrv
+
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-300, 300, (num_vehicles, 2))
+    headings = rng.uniform(-180, 180, num_vehicles)
+    speeds = rng.uniform(0, 20, num_vehicles)
+    yaw_rates = rng.normal(0, 0.2, num_vehicles)
+    velocities = np.stack([np.cos(np.radians(headings)), np.sin(np.radians(headings))], axis=1) * speeds[:, None]
+    states = {
+        vid: VehicleState(
+            vehicle_id=vid, timestamp=datetime.now(),
+            location=(positions[i, 0], positions[i, 1], 0.0), rotation=(0.0, headings[i], 0.0),
+            velocity=(velocities[i, 0], velocities[i, 1], 0.0), speed=speeds[i] * 3.6,
+            sensor_data={'imu': {'accelerometer': {'x': 0.0, 'y': 0.0, 'z': 9.8},
+                                 'gyroscope': {'x': 0.0, 'y': 0.0, 'z': yaw_rates[i]}}},
+            other_vehicles={}
+        )
+        for i, vid in enumerate(range(1, num_vehicles + 1))
+    }
+
+    predictor = TrajectoryPredictor(steps=steps, step_time=0.1, budget_ms=float('inf'))
+    update_timings = []
+    for frame in range(iterations):
+        predictor.update(states, frame, dt=0.05)
+        update_timings.append(predictor.last_update_ms)
+
+    kernel_timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        predict_ctrv(positions, velocities, yaw_rates, predictor.times)
+        kernel_timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        predictor.update(states, iterations - 1, dt=0.05)
+    cached_ms = (time.perf_counter() - start) * 1000 / iterations
+
+    # Hazard checks along predicted paths for the default 200 vehicle fleet
+    subset = dict(list(states.items())[:200])
+    hazard_predictor = TrajectoryPredictor(steps=steps, step_time=0.1)
+    engine = HazardEngine(use_predictions=True)
+    hazard_timings = []
+    for frame in range(iterations):
+        engine.update(subset, 0.05, hazard_predictor.update(subset, frame, dt=0.05))
+        hazard_timings.append(engine.last_update_ms)
+
+    return {
+        'vehicles': num_vehicles,
+        'steps': steps,
+        'update_mean_ms': float(np.mean(update_timings)),
+        'update_p99_ms': float(np.percentile(update_timings, 99)),
+        'kernel_mean_ms': float(np.mean(kernel_timings)),
+        'cached_lookup_ms': cached_ms,
+        'hazard_with_predictions_200_mean_ms': float(np.mean(hazard_timings)),
+    }
+
+
+def bench_hazard_map(num_events: int = 200000, num_queries: int = 2000,
+                     map_size: float = 5000.0) -> Dict[str, float]:
+    """Hazard tile map insert and corridor query cost over a long run on a large map"""
+    import numpy as np
+    from .utils.hazard_map import HazardTileMap, COLLISION, LANE_INVASION
+
+    rng = np.random.default_rng(0)
+    hazard_map = HazardTileMap(max_tiles=2048, max_events=32768)
+    locations = rng.uniform(0, map_size, (num_events, 2)).tolist()
+    kinds = np.where(rng.random(num_events) < 0.2, COLLISION, LANE_INVASION).tolist()
+
+    # One event per 10 ms of simulation time
+    start = time.perf_counter()
+    for i, ((x, y), kind) in enumerate(zip(locations, kinds)):
+        hazard_map.insert(kind, x, y, i * 0.01, i % 100)
+    insert_us = (time.perf_counter() - start) * 1e6 / num_events
+
+    now = num_events * 0.01
+    starts = rng.uniform(0, map_size, (num_queries, 2))
+    headings = rng.uniform(-np.pi, np.pi, num_queries)
+    steps = np.arange(41)[None, :, None] * 0.1 * 15.0  # 4 s at 15 m/s
+    paths = starts[:, None, :] + steps * np.stack([np.cos(headings), np.sin(headings)], axis=1)[:, None, :]
+
+    timings, found = [], 0
+    for path in paths:
+        query_start = time.perf_counter()
+        found += len(hazard_map.query_corridor(path, 10.0, now))
+        timings.append((time.perf_counter() - query_start) * 1000)
+
+    return {
+        'events_inserted': num_events,
+        'insert_mean_us': insert_us,
+        'corridor_query_mean_ms': float(np.mean(timings)),
+        'corridor_query_p99_ms': float(np.percentile(timings, 99)),
+        'hazards_per_query': found / num_queries,
+        **hazard_map.stats(),
+    }
+
+
+def bench_traffic_flow(num_vehicles: int = 500, ticks: int = 2000, tick_rate: float = 0.05,
+                       resolve_cost_us: float = 50.0) -> Dict[str, float]:
+    """Per-tick traffic flow analytics cost with a simulated waypoint query cost on cache misses"""
+    import numpy as np
+    from .utils.traffic_flow import TrafficFlowAnalytics, CachedSegmentLookup
+
+    def resolve(x, y, z):
+        # Manhattan grid of 100 m blocks standing in for carla.Map.get_waypoint
+        deadline = time.perf_counter() + resolve_cost_us / 1e6
+        while time.perf_counter() < deadline:
+            pass
+        if abs(y % 100.0 - 50.0) < abs(x % 100.0 - 50.0):
+            return int(x // 100) * 1000 + int(y // 100), 1
+        return int(y // 100) * 1000 + int(x // 100) + 500, 2
+
+    rng = np.random.default_rng(0)
+    analytics = TrafficFlowAnalytics(CachedSegmentLookup(resolve), tick_rate)
+    ids = list(range(num_vehicles))
+    positions = np.zeros((num_vehicles, 3))
+    positions[:, :2] = rng.uniform(0, 1000, (num_vehicles, 2))
+    velocities = rng.choice([-1, 1], (num_vehicles, 1)) * np.eye(2)[rng.integers(0, 2, num_vehicles)] * 12.0
+    speeds = np.full(num_vehicles, 12.0 * 3.6)
+
+    timings = []
+    for _ in range(ticks):
+        positions[:, :2] = (positions[:, :2] + velocities * tick_rate) % 1000
+        start = time.perf_counter()
+        analytics.update(ids, positions, speeds)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    warm = timings[ticks // 2:]
+    lookup = analytics.lookup
+    return {
+        'vehicles': num_vehicles,
+        'tick_budget_ms': tick_rate * 1000,
+        'mean_ms': float(np.mean(timings)),
+        'warm_mean_ms': float(np.mean(warm)),
+        'warm_p99_ms': float(np.percentile(warm, 99)),
+        'max_ms': float(np.max(timings)),
+        'cache_hit_rate': lookup.hits / (lookup.hits + lookup.misses),
+        'segments': len(analytics.segment_keys),
+    }
+
+
+def bench_object_sharing(num_vehicles: int = 10, points_per_frame: int = 5000, num_cars: int = 60,
+                         ticks: int = 20) -> Dict[str, float]:
+    """Bytes shared and merge time for object lists against raw semantic lidar points"""
+    from datetime import datetime
+    import numpy as np
+    from .data_structures import PointCloudData, VehicleState
+    from .utils.object_clustering import ObjectClusterer
+    from .utils.point_cloud_merger import PointCloudMerger
+    from .utils.sensor_decoder import SEMANTIC_LIDAR_DTYPE
+
+    rng = np.random.default_rng(0)
+    cars = rng.uniform(-100, 100, (num_cars, 2))
+    walls = [(-100.0, y) for y in np.linspace(-100, 100, 9)]
+    locations = rng.uniform(-60, 60, (num_vehicles, 2))
+
+    def scan(location, frame):
+        # Ground, nearby car boxes and building walls in the sensor frame (CARLA 0.9.14+ tags)
+        near = cars[np.linalg.norm(cars - location, axis=1) < 50]
+        n_cars = len(near) * 60
+        n_walls = points_per_frame // 5
+        n_ground = points_per_frame - n_cars - n_walls
+        car_points = (near[:, None, :] + rng.uniform([-2.2, -1.0], [2.2, 1.0], (len(near), 60, 2))).reshape(-1, 2)
+        wall_points = np.c_[np.full(n_walls, walls[0][0]), rng.uniform(-100, 100, n_walls)]
+        ground = location + rng.uniform(-50, 50, (n_ground, 2))
+        xy = np.concatenate([ground, car_points, wall_points]) - location
+        z = np.concatenate([np.zeros(n_ground), rng.uniform(0, 1.5, n_cars), rng.uniform(0, 10, n_walls)])
+        tags = np.concatenate([np.full(n_ground, 1), np.full(n_cars, 14), np.full(n_walls, 3)])
+        return PointCloudData(points=np.c_[xy, z].astype(np.float32),
+                              timestamps=np.full(len(z), time.time(), dtype=np.float32),
+                              tags=tags.astype(np.int32), frame=frame)
+
+    def vehicle_state(vehicle_id, frame):
+        location = locations[vehicle_id - 1]
+        cloud = scan(location, frame)
+        cloud.source_vehicle = vehicle_id
+        transform = np.eye(4, dtype=np.float32)
+        transform[:2, 3] = location
+        return VehicleState(
+            vehicle_id=vehicle_id, timestamp=datetime.now(),
+            location=(location[0], location[1], 0.0), rotation=(0.0, 0.0, 0.0),
+            velocity=(0.0, 0.0, 0.0), speed=0.0, sensor_data={}, other_vehicles={},
+            transform_matrix=transform, point_cloud_cache={'semantic_lidar': cloud}
+        )
+
+    merger = PointCloudMerger(max_point_age=10.0)
+    clusterer = ObjectClusterer()
+    raw_bytes = object_bytes = fused_count = 0
+    raw_time = cluster_time = fuse_time = 0.0
+    for frame in range(ticks):
+        states = {vid: vehicle_state(vid, frame) for vid in range(1, num_vehicles + 1)}
+        raw_bytes += sum(len(s.point_cloud_cache['semantic_lidar'].points) for s in states.values()) \
+            * SEMANTIC_LIDAR_DTYPE.itemsize
+
+        start = time.perf_counter()
+        for vid, state in states.items():
+            merger.merge_point_clouds(state, {o: s for o, s in states.items() if o != vid})
+        raw_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        object_lists = [clusterer.cluster(s.point_cloud_cache['semantic_lidar'], s.transform_matrix)
+                        for s in states.values()]
+        cluster_time += time.perf_counter() - start
+        object_bytes += sum(o.objects.nbytes for o in object_lists)
+
+        start = time.perf_counter()
+        fused = clusterer.fuse(object_lists)
+        fuse_time += time.perf_counter() - start
+        fused_count = len(fused.objects)
+
+    return {
+        'vehicles': num_vehicles,
+        'raw_kb_per_tick': raw_bytes / ticks / 1024,
+        'object_kb_per_tick': object_bytes / ticks / 1024,
+        'raw_merge_ms_per_tick': raw_time / ticks * 1000,
+        'cluster_ms_per_tick': cluster_time / ticks * 1000,
+        'fuse_ms_per_tick': fuse_time / ticks * 1000,
+        'fused_objects': fused_count,
+    }
+
+
+def bench_voxel_map(num_vehicles: int = 10, points_per_frame: int = 30000, ticks: int = 400,
+                    speed: float = 15.0, tick_rate: float = 0.05) -> Dict[str, float]:
+    """Voxel world map integration, eviction and radius query cost for a fleet driving out and back"""
+    import shutil
+    import tempfile
+    import numpy as np
+    from .utils.voxel_world_map import VoxelWorldMap
+
+    rng = np.random.default_rng(0)
+    store_dir = tempfile.mkdtemp(prefix='voxel_map_')
+    # A small resident cap forces tiles to be paged out and back in on the return leg
+    voxel_map = VoxelWorldMap(store_dir, max_resident_tiles=64, evict_distance=150.0)
+    lanes = np.c_[np.zeros(num_vehicles), np.arange(num_vehicles) * 4.0]
+
+    def scan(position):
+        # Returns from the road surface and building facades either side of the road
+        n_walls = points_per_frame // 3
+        ground = np.c_[position + rng.uniform(-50, 50, (points_per_frame - n_walls, 2)),
+                       rng.normal(0.0, 0.05, points_per_frame - n_walls)]
+        walls = np.c_[position[0] + rng.uniform(-50, 50, n_walls),
+                      rng.choice([-10.0, 50.0], n_walls), rng.uniform(0, 5.5, n_walls)]
+        return np.concatenate([ground, walls]).astype(np.float32)
+
+    integrate_ms, evict_ms, query_ms = [], [], []
+    try:
+        for tick in range(ticks):
+            # Drive out for half the run and back along the same road for the rest
+            distance = speed * tick_rate * (tick if tick < ticks // 2 else ticks - tick)
+            positions = lanes + (distance, 0.0)
+            clouds = [scan(position) for position in positions]
+            start = time.perf_counter()
+            for vid, cloud in enumerate(clouds):
+                voxel_map.integrate(cloud, vid, tick)
+            integrate_ms.append((time.perf_counter() - start) * 1000 / num_vehicles)
+
+            start = time.perf_counter()
+            voxel_map.evict([(*p, 0.0) for p in positions])
+            evict_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            occupied, _ = voxel_map.occupied_within((*positions[0], 0.0), 50.0)
+            query_ms.append((time.perf_counter() - start) * 1000)
+        voxel_map.close()
+        stats = voxel_map.stats()
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    return {
+        'vehicles': num_vehicles,
+        'points_per_frame': points_per_frame,
+        'integrate_ms_per_cloud': float(np.mean(integrate_ms)),
+        'evict_ms_per_tick': float(np.mean(evict_ms)),
+        'query_50m_mean_ms': float(np.mean(query_ms)),
+        'query_50m_p99_ms': float(np.percentile(query_ms, 99)),
+        'voxels_in_last_query': len(occupied),
+        **stats,
+    }
+
+
+def bench_spatial_index(num_vehicles: int = 10, total_points: int = 200000, frames: int = 50) -> Dict[str, float]:
+    """Per-frame obstacle index build plus nearest, corridor and box queries for every ego"""
+    import numpy as np
+    from .utils.spatial_index import SpatialIndex
+
+    rng = np.random.default_rng(0)
+    per_vehicle = total_points // num_vehicles
+    positions = np.c_[rng.uniform(-150, 150, (num_vehicles, 2)), np.zeros(num_vehicles)]
+    yaws = rng.uniform(-180, 180, num_vehicles)
+
+    def scan(position):
+        # Half ground returns, half obstacles standing up to 4 m within lidar range
+        ground = np.c_[position[:2] + rng.uniform(-50, 50, (per_vehicle // 2, 2)),
+                       rng.normal(0.0, 0.05, per_vehicle // 2)]
+        rest = per_vehicle - len(ground)
+        obstacles = np.c_[position[:2] + rng.uniform(-50, 50, (rest, 2)), rng.uniform(0.3, 4.0, rest)]
+        return np.concatenate([ground, obstacles]).astype(np.float32)
+
+    build_ms, query_ms = [], []
+    for _ in range(frames):
+        cloud = np.concatenate([scan(p) for p in positions])
+        start = time.perf_counter()
+        index = SpatialIndex(cloud)
+        build_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        for position, yaw in zip(positions, yaws):
+            z_range = (position[2] + 0.3, position[2] + 3.0)
+            index.nearest(position, 50.0, z_range)
+            index.obstacle_distance_ahead(position, yaw, z_range=z_range)
+            index.query_box(position - (5.0, 5.0, 0.0), position + (5.0, 5.0, 3.0))
+        query_ms.append((time.perf_counter() - start) * 1000 / num_vehicles)
+
+    # The index is built once per frame and shared, so its cost splits across the egos
+    per_ego = np.array(build_ms) / num_vehicles + np.array(query_ms)
+    return {
+        'egos': num_vehicles,
+        'points': len(cloud),
+        'build_ms': float(np.mean(build_ms)),
+        'queries_ms_per_ego': float(np.mean(query_ms)),
+        'total_ms_per_ego': float(np.mean(per_ego)),
+        'total_ms_per_ego_p99': float(np.percentile(per_ego, 99)),
+    }
+
+
+def bench_log_writer(num_vehicles: int = 20, ticks: int = 500, max_file_size_mb: float = 0.25) -> Dict[str, float]:
+    """Tick-thread cost of queueing state log entries and the writer thread's drain rate"""
+    import os
+    import shutil
+    import tempfile
+    import numpy as np
+    from .utils.log_writer import LogWriter
+
+    log_dir = tempfile.mkdtemp(prefix='log_writer_')
+    writer = LogWriter(max_file_size=int(max_file_size_mb * 1024 * 1024), queue_size=num_vehicles * ticks)
+    entry = {
+        "timestamp": "20240101_000000",
+        "own_data": {"vehicle_id": 0, "location": {"x": 1.0, "y": 2.0, "z": 0.0}, "speed": 30.0,
+                     "sensors": {"imu": {"accelerometer": {"x": 0.1, "y": 0.0, "z": 9.8}}}},
+        "other_vehicles": {str(i): {"location": {"x": float(i), "y": 0.0, "z": 0.0}, "speed": 20.0,
+                                    "relative_distance": float(i)} for i in range(num_vehicles)},
+    }
+    paths = [os.path.join(log_dir, f"vehicle_{i}", "state_log.ndjson") for i in range(num_vehicles)]
+
+    tick_ms = []
+    try:
+        start_all = time.perf_counter()
+        for _ in range(ticks):
+            start = time.perf_counter()
+            for path in paths:
+                writer.write(path, entry)
+            tick_ms.append((time.perf_counter() - start) * 1000)
+        writer.close()
+        drain_s = time.perf_counter() - start_all
+        files = sum(len(os.listdir(os.path.dirname(path))) for path in paths)
+        total_mb = sum(os.path.getsize(os.path.join(os.path.dirname(p), f))
+                       for p in paths for f in os.listdir(os.path.dirname(p))) / (1024 * 1024)
+    finally:
+        writer.close()
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    return {
+        'entries': writer.written,
+        'dropped': writer.dropped,
+        'queue_ms_per_tick': float(np.mean(tick_ms)),
+        'entries_per_s': writer.written / drain_s,
+        'on_disk_mb': total_mb,
+        'files_after_rotation': files,
+        'rotated_compression_ratio': writer.raw_bytes / writer.compressed_bytes if writer.compressed_bytes else 0.0,
+    }
+
+
+def bench_pointcloud_sink(num_vehicles: int = 10, points_per_frame: int = 30000, ticks: int = 100,
+                          tick_rate: float = 0.05, formats: tuple = ('npy',),
+                          max_files_per_vehicle: int = 50) -> Dict[str, float]:
+    """Tick-thread cost of submitting point cloud frames, with frames dropped when writers lag"""
+    import os
+    import shutil
+    import tempfile
+    import numpy as np
+    from .data_structures import PointCloudData
+    from .utils.pointcloud_sink import PointCloudSink
+
+    rng = np.random.default_rng(0)
+    log_dir = tempfile.mkdtemp(prefix='pointcloud_sink_')
+    sink = PointCloudSink(log_dir, formats, max_files_per_vehicle)
+    points = rng.uniform(-50, 50, (points_per_frame, 3)).astype(np.float32)
+
+    submit_ms = []
+    try:
+        for tick in range(ticks):
+            start = time.perf_counter()
+            for vid in range(num_vehicles):
+                cloud = PointCloudData(points, np.empty(0, dtype=np.float32), source_vehicle=vid, frame=tick)
+                sink.submit(vid, 'lidar', cloud)
+            elapsed = time.perf_counter() - start
+            submit_ms.append(elapsed * 1000)
+            # Leave the writers the rest of the tick, as the simulation would
+            time.sleep(max(0.0, tick_rate - elapsed))
+        sink.close()
+        files = max(len(os.listdir(os.path.join(log_dir, f"vehicle_{vid}", "pointcloud")))
+                    for vid in range(num_vehicles))
+    finally:
+        sink.close()
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    return {
+        'frames': num_vehicles * ticks,
+        'written': sink.written,
+        'dropped': sink.dropped,
+        'submit_ms_per_tick': float(np.mean(submit_ms)),
+        'submit_ms_per_tick_max': float(np.max(submit_ms)),
+        'max_files_per_vehicle_on_disk': files,
+    }
+
+
+def bench_trajectory_store(rows: int = 100000, chunk_rows: int = 16384) -> Dict[str, float]:
+    """Frame range query on the columnar store against scanning the equivalent NDJSON log"""
+    import json
+    import os
+    import shutil
+    import tempfile
+    import numpy as np
+    from .utils.trajectory_store import TrajectoryStore, TrajectoryStoreWriter
+
+    root = tempfile.mkdtemp(prefix='trajectory_store_')
+    try:
+        writer = TrajectoryStoreWriter(os.path.join(root, 'store'), chunk_rows)
+        log_path = os.path.join(root, 'state_log.ndjson')
+        with open(log_path, 'w') as f:
+            for frame in range(rows):
+                f.write(json.dumps({"frame": frame, "own_data": {"speed": frame % 120 * 1.0}}) + '\n')
+        start = time.perf_counter()
+        for frame in range(rows):
+            writer.append(2, frame, frame * 0.05, (frame, 0.0, 0.0), (0.0, 0.0, 0.0), (1.0, 0.0, 0.0),
+                          frame % 120 * 1.0)
+        writer.flush()
+        write_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        speeds = [entry["own_data"]["speed"] for entry in map(json.loads, open(log_path))
+                  if 1000 <= entry["frame"] <= 2000]
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        columns = TrajectoryStore(os.path.join(root, 'store')).query(2, ['speed'], frames=(1000, 2000))
+        query_ms = (time.perf_counter() - start) * 1000
+        assert np.array_equal(columns['speed'], np.asarray(speeds, dtype=np.float32))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        'rows': rows,
+        'columnar_write_s': write_s,
+        'ndjson_scan_ms': scan_ms,
+        'columnar_query_ms': query_ms,
+        'rows_returned': len(columns['speed']),
+    }
+
+
+def bench_frame_log(fleet_sizes: tuple = (10, 50, 100), frames: int = 20,
+                    mixed_fleet: tuple = (2, 500)) -> Dict[str, float]:
+    """Bytes and serialization time per frame of the frame log against per-vehicle entries
+
+    Runs every fleet size with all vehicles as egos, plus a mixed fleet of
+    a few egos among many background vehicles.
+    """
+    import json
+    import numpy as np
+    from .utils.frame_log import build_frame_record, vehicle_view
+
+    rng = np.random.default_rng(0)
+    results: Dict[str, float] = {}
+    # (egos, vehicles in total, result name)
+    cases = [(n, n, f'{n}_vehicles') for n in fleet_sizes]
+    num_egos, num_background = mixed_fleet
+    cases.append((num_egos, num_egos + num_background, f'{num_egos}_egos_{num_background}_background'))
+    for num_egos, n, name in cases:
+        vehicles = {
+            vid: {
+                "location": {"x": float(x), "y": float(y), "z": 0.0},
+                "rotation": {"pitch": 0.0, "yaw": float(yaw), "roll": 0.0},
+                "velocity": {"x": 10.0, "y": 0.0, "z": 0.0},
+                "speed": 36.0,
+                "sensors": {"imu": {"accelerometer": {"x": 0.1, "y": 0.0, "z": 9.8},
+                                    "gyroscope": {"x": 0.0, "y": 0.0, "z": 0.01}},
+                            "lidar": {"num_points": 30000, "timestamp": 12.3}},
+            }
+            for vid, (x, y, yaw) in enumerate(rng.uniform(-200, 200, (n, 3)))
+        }
+        egos = list(vehicles)[:num_egos]
+
+        frame_bytes = vehicle_bytes = 0
+        frame_ms = vehicle_ms = 0.0
+        for frame in range(frames):
+            start = time.perf_counter()
+            frame_bytes += len(json.dumps(build_frame_record(frame, "20240101_000000", vehicles, egos)))
+            frame_ms += (time.perf_counter() - start) * 1000
+
+            # The per-vehicle layout is exactly what the reader rebuilds from a frame record
+            record = build_frame_record(frame, "20240101_000000", vehicles, egos)
+            entries = [vehicle_view(record, vid) for vid in egos]
+            start = time.perf_counter()
+            vehicle_bytes += sum(len(json.dumps(entry)) for entry in entries)
+            vehicle_ms += (time.perf_counter() - start) * 1000
+
+        results[f'{name}_frame_kb'] = frame_bytes / frames / 1024
+        results[f'{name}_per_vehicle_kb'] = vehicle_bytes / frames / 1024
+        results[f'{name}_frame_ms'] = frame_ms / frames
+        results[f'{name}_per_vehicle_ms'] = vehicle_ms / frames
+    return results
+
+
+def bench_blackbox(num_vehicles: int = 100, num_egos: int = 10, points_per_frame: int = 30000,
+                   ticks: int = 600, tick_rate: float = 0.05, trigger_tick: int = 300) -> Dict[str, float]:
+    """Per-tick black box recording cost and the tick-thread cost of a triggered capture"""
+    import os
+    import shutil
+    import tempfile
+    from datetime import datetime
+    import numpy as np
+    from .data_structures import PointCloudData, VehicleState
+    from .utils.blackbox_recorder import BlackBoxRecorder, load_capture
+
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp(prefix='blackbox_')
+    recorder = BlackBoxRecorder(directory, tick_rate)
+    cloud = PointCloudData(rng.uniform(-50, 50, (points_per_frame, 3)).astype(np.float32),
+                           np.empty(0, dtype=np.float32))
+    states = {
+        vid: VehicleState(vid, datetime.now(), (vid * 5.0, 0.0, 0.0), (0.0, 0.0, 0.0), (10.0, 0.0, 0.0),
+                          36.0, {}, {}, point_cloud_cache={'lidar': cloud} if vid < num_egos else {})
+        for vid in range(num_vehicles)
+    }
+    egos = {vid: states[vid] for vid in range(num_egos)}
+
+    record_ms, capture_ms = [], 0.0
+    try:
+        for tick in range(ticks):
+            egos[0].sensor_events = ['collision'] if tick == trigger_tick else []
+            start = time.perf_counter()
+            recorder.record(tick, tick * tick_rate, states, egos)
+            elapsed = (time.perf_counter() - start) * 1000
+            if tick == trigger_tick + recorder.post_ticks:
+                capture_ms = elapsed
+            else:
+                record_ms.append(elapsed)
+        recorder.close()
+        captures = [name for name in os.listdir(directory) if name.endswith('.npz')]
+        capture = load_capture(os.path.join(directory, captures[0])) if captures else None
+    finally:
+        recorder.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        'memory_mb': recorder.memory_bytes / (1024 * 1024),
+        'record_ms_per_tick': float(np.mean(record_ms)),
+        'record_ms_p99': float(np.percentile(record_ms, 99)),
+        'capture_ms_on_tick': capture_ms,
+        'captures_written': recorder.captures_written,
+        'captured_ticks': len(capture['frames']) if capture else 0,
+    }
+
+
+def bench_log_reader(entries: int = 5000, other_vehicles: int = 20) -> Dict[str, float]:
+    """Peak memory and throughput of streaming a legacy JSON array log against json.load"""
+    import json
+    import os
+    import tempfile
+    import tracemalloc
+    from .utils.log_reader import EntryFilter, LogStats, iter_entries
+
+    def entry(i: int) -> dict:
+        return {
+            "timestamp": "20240101_000000",
+            "frame": i,
+            "own_data": {"vehicle_id": 1, "location": {"x": i * 0.5, "y": 0.0, "z": 0.0},
+                         "velocity": {"x": 10.0, "y": 0.0, "z": 0.0}, "speed": float(i % 80),
+                         "sensors": {"collision": i % 500 == 0}},
+            "other_vehicles": {str(v): {"location": {"x": float(v), "y": 0.0, "z": 0.0}, "speed": 30.0,
+                                        "relative_distance": float(v), "sensors": {}}
+                               for v in range(other_vehicles)},
+        }
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state_log.json")
+        # Written the way the old logger did: an indented array
+        with open(path, 'w') as f:
+            f.write("[\n")
+            f.write(",\n".join(json.dumps(entry(i), indent=4) for i in range(entries)))
+            f.write("\n]")
+        size_mb = os.path.getsize(path) / 1e6
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(path) as f:
+            loaded = len(json.load(f))
+        load_s = time.perf_counter() - start
+        _, load_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        entry_filter = EntryFilter(min_speed=40.0)
+        stats = LogStats()
+        for e in iter_entries(path):
+            if entry_filter.matches(e):
+                stats.add(1, e)
+        stream_s = time.perf_counter() - start
+        _, stream_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Appending runs closed the array after each one, leaving '],' between them
+        appended_path = os.path.join(directory, "appended_state_log.json")
+        with open(appended_path, 'w') as f:
+            f.write("[\n")
+            f.write("\n],\n".join(json.dumps(entry(i), indent=4) for i in range(0, entries, entries // 10 or 1)))
+            f.write("\n]\n]")
+        appended = sum(1 for _ in iter_entries(appended_path))
+        assert appended == len(range(0, entries, entries // 10 or 1)), appended
+
+    # The checked-in sample logs have the same shape
+    sample_path = os.path.join(os.path.dirname(__file__), '..', 'logs', 'vehicle_1', 'state_log.json')
+    sample = sum(1 for _ in iter_entries(sample_path)) if os.path.exists(sample_path) else 0
+
+    return {
+        'file_mb': size_mb,
+        'entries': loaded,
+        'appended_log_entries': appended,
+        'sample_log_entries': sample,
+        'matched': stats.vehicles[1].entries if stats.vehicles else 0,
+        'json_load_mb_per_s': size_mb / load_s,
+        'stream_mb_per_s': size_mb / stream_s,
+        'json_load_peak_mb': load_peak / 1e6,
+        'stream_peak_mb': stream_peak / 1e6,
+    }
+
+
+def bench_point_raster(point_counts: tuple = (10000, 100000, 500000), clouds: int = 5,
+                       size: int = 600, repeats: int = 5) -> Dict[str, float]:
+    """Frame time of splatting clouds into the numpy raster against per-point QPointF drawing"""
+    import numpy as np
+    from .utils.point_raster import PointRaster, to_screen
+
+    try:
+        from PySide6.QtCore import QPointF
+        from PySide6.QtGui import QColor, QImage, QPainter, QPen
+    except ImportError:
+        QPointF = None
+
+    rng = np.random.default_rng(0)
+    colors = [(0, 255, 0, 100), (255, 100, 0, 100), (100, 100, 255, 100), (255, 255, 0, 100), (255, 0, 255, 100)]
+    results: Dict[str, float] = {}
+    for n in point_counts:
+        # n points per frame split across the ego and other vehicles, within the 60 m view
+        frame = [rng.uniform(-30, 30, (n // clouds, 3)).astype(np.float32) for _ in range(clouds)]
+        raster = PointRaster(size, size)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            raster.clear()
+            for points, color in zip(frame, colors):
+                raster.draw_points(to_screen(points, (size / 2, size / 2), 10), color)
+        results[f'{n}_raster_ms'] = (time.perf_counter() - start) * 1000 / repeats
+
+        if QPointF is not None:
+            # The previous draw_point_cloud, painting onto an offscreen image
+            image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                painter = QPainter(image)
+                painter.setRenderHint(QPainter.Antialiasing)
+                for points, color in zip(frame, colors):
+                    screen_points = to_screen(points, (size / 2, size / 2), 10)
+                    painter.setPen(QPen(QColor(*color), 2))
+                    for i in range(0, len(screen_points), 1000):
+                        painter.drawPoints([QPointF(float(x), float(y)) for x, y in screen_points[i:i + 1000]])
+                painter.end()
+            results[f'{n}_qpointf_ms'] = (time.perf_counter() - start) * 1000 / repeats
+        else:
+            # Without Qt, time only the Python-side loop the old path ran before any painting
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for points in frame:
+                    screen_points = to_screen(points, (size / 2, size / 2), 10)
+                    for i in range(0, len(screen_points), 1000):
+                        [(float(x), float(y)) for x, y in screen_points[i:i + 1000]]
+            results[f'{n}_per_point_loop_ms'] = (time.perf_counter() - start) * 1000 / repeats
+    return results
+
+
+def _channel_reader(name: str, results) -> None:
+    """Spawned reader for bench_frame_channel: polls at 30 Hz and verifies every frame it gets"""
+    import hashlib
+    from .utils.frame_channel import FrameChannel
+
+    channel = FrameChannel.attach(name)
+    frames = torn = 0
+    while not channel.writer_closed:
+        message = channel.read()
+        if message is not None:
+            frame, payload = message
+            frames += 1
+            # Each payload ends with the digest of the rest, a torn copy fails the check
+            torn += hashlib.sha1(payload[:-20]).digest() != payload[-20:]
+        time.sleep(1 / 30)
+    channel.close()
+    results.put((frames, torn))
+
+
+def bench_frame_channel(num_egos: int = 10, points_per_frame: int = 30000, ticks: int = 100,
+                        tick_rate: float = 0.05) -> Dict[str, float]:
+    """Simulation-side cost of publishing dashboard frames and what a slower reader receives"""
+    import hashlib
+    import multiprocessing
+    import pickle
+    from datetime import datetime
+    import numpy as np
+    from .data_structures import PointCloudData, VehicleState
+    from .dashboard_process import dashboard_snapshot
+    from .utils.frame_channel import FrameChannel
+
+    rng = np.random.default_rng(0)
+    states = {}
+    for vid in range(num_egos):
+        cloud = PointCloudData(points=rng.uniform(-50, 50, (points_per_frame, 3)).astype(np.float32),
+                               timestamps=np.zeros(points_per_frame, dtype=np.float32), source_vehicle=vid)
+        states[vid] = VehicleState(vehicle_id=vid, timestamp=datetime.now(), location=(vid * 5.0, 0.0, 0.0),
+                                   rotation=(0.0, 0.0, 0.0), velocity=(10.0, 0.0, 0.0), speed=36.0,
+                                   sensor_data={'collision': None}, other_vehicles={},
+                                   point_cloud_cache={'lidar': cloud})
+    for vid, state in states.items():
+        state.other_vehicles = {other: s for other, s in states.items() if other != vid}
+
+    channel = FrameChannel.create(64 * 1024 * 1024)
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    reader = context.Process(target=_channel_reader, args=(channel.name, results), daemon=True)
+    reader.start()
+    time.sleep(1.0)  # let the reader import before publishing
+
+    publish_ms = []
+    size = 0
+    for frame in range(ticks):
+        start = time.perf_counter()
+        payload = pickle.dumps(dashboard_snapshot(states), protocol=pickle.HIGHEST_PROTOCOL)
+        payload += hashlib.sha1(payload).digest()  # for the reader's torn-frame check only
+        channel.write(payload, frame)
+        elapsed = time.perf_counter() - start
+        publish_ms.append(elapsed * 1000)
+        size = len(payload)
+        time.sleep(max(0.0, tick_rate - elapsed))
+
+    channel.close_writer()
+    frames, torn = results.get(timeout=10)
+    reader.join(5)
+    channel.close()
+    return {
+        'frame_mb': size / 1e6,
+        'publish_mean_ms': float(np.mean(publish_ms)),
+        'publish_p99_ms': float(np.percentile(publish_ms, 99)),
+        'frames_published': ticks,
+        'frames_read': frames,
+        'torn_frames_delivered': torn,
+    }
+
+
+class _FakeWorld:
+    """Stands in for carla.World in bench_batch_runner, and for its snapshots
+
+    Vehicles drive along parallel lanes 4 m apart at 10 m/s. Vehicle 0
+    brakes hard once over several ticks, vehicle 1 is missing from the
+    snapshots for a while and vehicle 2 collides once.
+    """
+
+    def __init__(self, num_vehicles: int, tick_rate: float):
+        self.num_vehicles = num_vehicles
+        self.tick_rate = tick_rate
+        self.frame = 0
+        self.x = [0.0] * num_vehicles
+        self.speeds = [10.0] * num_vehicles
+
+    def tick(self) -> int:
+        self.frame += 1
+        if 40 <= self.frame < 50:
+            self.speeds[0] = max(0.0, self.speeds[0] - 8.0 * self.tick_rate)
+        for i in range(self.num_vehicles):
+            self.x[i] += self.speeds[i] * self.tick_rate
+        return self.frame
+
+    def get_snapshot(self) -> '_FakeWorld':
+        return self
+
+    def find(self, vehicle_id: int):
+        from types import SimpleNamespace
+        if vehicle_id == 1 and 20 <= self.frame < 30:
+            return None
+        location = SimpleNamespace(x=self.x[vehicle_id], y=vehicle_id * 4.0, z=0.0)
+        velocity = SimpleNamespace(x=self.speeds[vehicle_id], y=0.0, z=0.0)
+        return SimpleNamespace(get_transform=lambda: SimpleNamespace(location=location),
+                               get_velocity=lambda: velocity)
+
+
+class _FakeSensorManager:
+    def __init__(self, world: _FakeWorld):
+        self.world = world
+
+    def get_sensor_sequences(self, vehicle_id: int) -> Dict[str, int]:
+        return {'collision': 1} if vehicle_id == 2 and self.world.frame >= 60 else {}
+
+
+def _fake_scenario(spec, host: str, port: int, config: Dict) -> Dict:
+    """run_fn for bench_batch_runner: collects metrics from a fake world instead of a simulator"""
+    from types import SimpleNamespace
+    from .batch_runner import _collect_metrics
+
+    world = _FakeWorld(spec.num_vehicles, spec.tick_rate)
+    vehicles = [SimpleNamespace(id=i) for i in range(spec.num_vehicles)]
+    metrics = _collect_metrics(world, _FakeSensorManager(world), vehicles, spec)
+    metrics['vehicles_spawned'] = len(vehicles)
+    return metrics
+
+
+def bench_batch_runner(ports: tuple = (2000, 2002), ticks: int = 200) -> Dict[str, float]:
+    """Batch sweep over a worker pool with fake simulators, checking port binding and metrics"""
+    from .batch_runner import expand_sweep, run_batch, summarize
+
+    specs = expand_sweep({'scenarios': ['urban_driving', 'highway'], 'weathers': ['Clear', 'Rain'],
+                          'num_vehicles': [5], 'seeds': [0, 1], 'ticks': ticks, 'tick_rate': 0.05})
+    start = time.perf_counter()
+    results = run_batch(specs, list(ports), {}, run_fn=_fake_scenario)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+
+    assert summary['failed_runs'] == 0, [r.get('error') for r in results]
+    assert {r['port'] for r in results} <= set(ports), {r['port'] for r in results}
+    for result in results:
+        # One braking manoeuvre, the gap between lanes, and nothing from the vehicle that went missing
+        assert result['hard_brake_events'] == 1, result['hard_brake_events']
+        assert abs(result['min_gap_m'] - 4.0) < 1e-6, result['min_gap_m']
+        assert result['collision_events'] == 1, result['collision_events']
+
+    return {
+        'runs': summary['total_runs'],
+        'ports_used': len({r['port'] for r in results}),
+        'wall_time_s': elapsed,
+        'hard_brake_events': sum(a['hard_brake_events'] for a in summary['aggregates'].values()),
+        'min_gap_m': min(a['min_gap_m'] for a in summary['aggregates'].values()),
+    }
+
+
+BENCHMARKS: Dict[str, Callable[[], Dict[str, float]]] = {
+    'sensor_slots': stress_sensor_slots,
+    'mixed_fleet': bench_mixed_fleet,
+    'hazard_engine': bench_hazard_engine,
+    'trajectory_prediction': bench_trajectory_prediction,
+    'hazard_map': bench_hazard_map,
+    'traffic_flow': bench_traffic_flow,
+    'object_sharing': bench_object_sharing,
+    'voxel_map': bench_voxel_map,
+    'spatial_index': bench_spatial_index,
+    'log_writer': bench_log_writer,
+    'pointcloud_sink': bench_pointcloud_sink,
+    'trajectory_store': bench_trajectory_store,
+    'frame_log': bench_frame_log,
+    'blackbox': bench_blackbox,
+    'log_reader': bench_log_reader,
+    'point_raster': bench_point_raster,
+    'frame_channel': bench_frame_channel,
+    'batch_runner': bench_batch_runner,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run simulation micro-benchmarks")
+    parser.add_argument('names', nargs='*',
+                        help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    for name in args.names or BENCHMARKS:
+        results = BENCHMARKS[name]()
+        print(f"{name}:")
+        for key, value in results.items():
+            print(f"  {key}: {value:.3f}" if isinstance(value, float) else f"  {key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
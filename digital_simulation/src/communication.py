@@ -1,9 +1,11 @@
-from typing import Dict
+from typing import Dict, List
 from .data_structures import VehicleState
 
 class Communication:
     def __init__(self):
         self.vehicle_states: Dict[int, VehicleState] = {}
+        self.alerts: Dict[int, List] = {}
+        self.road_hazards: Dict[int, List] = {}
 
     def broadcast_vehicle_state(self, state: VehicleState):
         """Store vehicle state for V2V communication"""
@@ -14,4 +16,20 @@ class Communication:
         return {
             vid: state for vid, state in self.vehicle_states.items()
             if vid != vehicle_id
-        }
\ No newline at end of file
+        }
+
+    def publish_alerts(self, alerts: Dict[int, List]):
+        """Replace the current hazard alerts, keyed by recipient vehicle and sorted by priority"""
+        self.alerts = alerts
+
+    def get_alerts(self, vehicle_id: int) -> List:
+        """Get hazard alerts addressed to a vehicle, most urgent first"""
+        return self.alerts.get(vehicle_id, [])
+
+    def publish_road_hazards(self, hazards: Dict[int, List]):
+        """Replace the current hazard map query results, keyed by vehicle"""
+        self.road_hazards = hazards
+
+    def get_road_hazards(self, vehicle_id: int) -> List:
+        """Get mapped road hazards along a vehicle's corridor, strongest first"""
+        return self.road_hazards.get(vehicle_id, [])
\ No newline at end of file
@@ -4,21 +4,33 @@ from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import QTimer, QUrl
 from PySide6.QtMultimedia import QSoundEffect
 from .gui.dashboard_window import DashboardWindow
+from .gui.fleet_dashboard import FleetDashboardWindow
 from .data_structures import VehicleState, V2VNetwork, PointCloudData
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 import logging
 import signal
 from datetime import datetime
 import numpy as np
 
 class DashboardApplication:
-    def __init__(self, simulation_manager=None):
+    def __init__(self, simulation_manager=None,
+                 frame_source: Optional[Callable[[], Optional[Dict[int, VehicleState]]]] = None,
+                 refresh_hz: float = 10.0, layout: str = 'grid', grid_columns: int = 2,
+                 background_hz: float = 2.0, focus_vehicle: Optional[int] = None):
         logging.basicConfig(level=logging.INFO)
         self.app = QApplication(sys.argv)
-        self.dashboards: Dict[int, DashboardWindow] = {}
+        self.dashboards: Dict[int, DashboardWindow] = {}  # windows, or panels of the fleet window
         self.closed_dashboard_ids = set()  # Track closed dashboard IDs
         self.v2v_network = V2VNetwork()
         self.simulation_manager = simulation_manager
+        # Returns the newest vehicle states, or None when nothing new arrived (dashboard process)
+        self.frame_source = frame_source
+        
+        # One window for the whole fleet (grid or tabs), or a window per vehicle (windows)
+        self.fleet_window = None
+        if layout != 'windows':
+            self.fleet_window = FleetDashboardWindow(layout, grid_columns, background_hz, focus_vehicle,
+                                                     self.on_dashboard_closed)
         
         # Initialize collision sound
         self.collision_sound = QSoundEffect()
@@ -31,15 +43,16 @@ class DashboardApplication:
         self.collision_sound.setVolume(1.0)
         self.collision_played = set()
         
-        # Setup update timer
+        # Setup update timer; a simulation manager instead pushes each tick's states itself
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_dashboards)
-        self.update_timer.start(100)  # 10 Hz update rate
+        if not simulation_manager:
+            self.update_timer.start(int(1000 / refresh_hz))
         
         signal.signal(signal.SIGINT, self.signal_handler)
         
-        # Only create test data if no simulation manager is provided
-        if not simulation_manager:
+        # Only create test data if no simulation manager or frame source is provided
+        if not simulation_manager and not frame_source:
             self._create_test_data()
     
     def _create_test_data(self):
@@ -91,39 +104,38 @@ class DashboardApplication:
             state.other_vehicles = other_vehicles
             self.v2v_network.update_vehicle_state(vid, state)
     
-    def update_dashboards(self):
-        """Update dashboards with batch processing and caching"""
+    def update_dashboards(self, vehicle_states: Optional[Dict[int, VehicleState]] = None):
+        """Update dashboards with the given tick's states, or the frame source's newest frame"""
         try:
-            # Cache vehicle states to avoid repeated lookups
-            vehicle_states = {}
-            
-            if self.simulation_manager:
-                vehicle_states = self.simulation_manager._update_vehicle_states()
-                if vehicle_states:
-                    for vehicle_id, state in vehicle_states.items():
-                        self.v2v_network.update_vehicle_state(vehicle_id, state)
+            if vehicle_states is not None:
+                # States the simulation loop already computed for this tick
+                for vehicle_id, state in vehicle_states.items():
+                    self.v2v_network.update_vehicle_state(vehicle_id, state)
+            elif self.frame_source:
+                vehicle_states = self.frame_source()
+                if vehicle_states is None:
+                    return  # No new frame since the last update
             
             all_states = vehicle_states or self.v2v_network.get_all_vehicle_states()
             
             if all_states:
                 # Only create dashboards for vehicles that haven't been closed
                 new_dashboards = {
-                    vid: DashboardWindow(vid, self.on_dashboard_closed)
+                    vid: self._create_dashboard(vid)
                     for vid in all_states
                     if vid not in self.dashboards and vid not in self.closed_dashboard_ids
                 }
                 
-                # Show new dashboards
-                for dashboard in new_dashboards.values():
-                    dashboard.show()
-                
                 # Update dashboard dictionary
                 self.dashboards.update(new_dashboards)
                 
-                # Update existing dashboards
-                for vehicle_id, dashboard in self.dashboards.items():
-                    if vehicle_id in all_states:
-                        dashboard.update_state(all_states[vehicle_id])
+                # The fleet window renders only visible panels, at full rate for the focus vehicle
+                if self.fleet_window:
+                    self.fleet_window.update_states(all_states)
+                else:
+                    for vehicle_id, dashboard in self.dashboards.items():
+                        if vehicle_id in all_states:
+                            dashboard.update_state(all_states[vehicle_id])
                     
         except Exception as e:
             logging.error(f"Error updating dashboards: {e}")
@@ -133,9 +145,24 @@ class DashboardApplication:
         for vehicle_id, state in vehicle_states.items():
             if vehicle_id not in self.dashboards:
                 logging.info(f"Creating dashboard for vehicle {vehicle_id}")
-                dashboard = DashboardWindow(vehicle_id, self.on_dashboard_closed)
-                dashboard.show()
-                self.dashboards[vehicle_id] = dashboard
+                self.dashboards[vehicle_id] = self._create_dashboard(vehicle_id)
+    
+    def _create_dashboard(self, vehicle_id: int):
+        """Add a vehicle's panel to the fleet window, or open its own window"""
+        if self.fleet_window:
+            panel = self.fleet_window.add_vehicle(vehicle_id)
+            self.fleet_window.show()
+            return panel
+        dashboard = DashboardWindow(vehicle_id, self.on_dashboard_closed)
+        dashboard.show()
+        return dashboard
+    
+    def visible_vehicle_ids(self) -> List[int]:
+        """Vehicles whose dashboard is on screen"""
+        if self.fleet_window:
+            return self.fleet_window.visible_vehicle_ids()
+        return [vehicle_id for vehicle_id, dashboard in self.dashboards.items()
+                if dashboard.isVisible() and not dashboard.isMinimized()]
     
     def on_dashboard_closed(self, vehicle_id: int):
         """Handle dashboard window closure"""
@@ -185,13 +212,16 @@ class DashboardApplication:
             if hasattr(self, 'app'):
                 self.app.processEvents()
             
-            # Cleanup dashboards
-            if hasattr(self, 'dashboards'):
-                for dashboard in self.dashboards.values():
+            # Cleanup dashboards; closing one removes it from self.dashboards
+            if getattr(self, 'fleet_window', None):
+                self.fleet_window.cleanup()
+                self.fleet_window.close()
+            elif hasattr(self, 'dashboards'):
+                for dashboard in list(self.dashboards.values()):
                     if dashboard is not None:
                         dashboard.cleanup()
                         dashboard.close()
-                self.dashboards.clear()
+            self.dashboards.clear()
             
             # Process events one final time and quit
             if hasattr(self, 'app'):
@@ -0,0 +1,177 @@
+"""Dashboards in their own process, fed through shared memory.
+
+The simulation publishes a slim copy of each tick's ego states into a
+FrameChannel and carries on; the dashboard process polls the channel on
+its own Qt timer and renders whichever frame is newest. The dashboard
+reports back which vehicle dashboards are visible or closed through a
+second, small channel.
+"""
+import logging
+import math
+import multiprocessing
+import pickle
+from dataclasses import replace
+from typing import Dict, Optional, Set
+import numpy as np
+from .data_structures import VehicleState, PointCloudData
+from .utils.frame_channel import FrameChannel
+from .utils.sensor_decoder import decode_sensor_data
+
+# Sensor summaries the dashboard widgets read from sensor_data
+_DASHBOARD_SENSORS = ('collision', 'imu')
+
+
+def dashboard_snapshot(vehicle_states: Dict[int, VehicleState], max_points: int = 20000,
+                       cloud_sensor: str = 'lidar') -> Dict[int, VehicleState]:
+    """Copies of the ego states with only what the dashboards draw, safe to pickle
+
+    Raw CARLA measurements are decoded or left out and each point cloud is
+    decimated to max_points. A vehicle seen by several egos is copied once
+    and shared, so pickling stores it once.
+    """
+    slim: Dict[int, VehicleState] = {}
+
+    def copy(state: VehicleState) -> VehicleState:
+        key = id(state)
+        if key not in slim:
+            sensor_data = {}
+            for sensor_type in _DASHBOARD_SENSORS:
+                data = state.sensor_data.get(sensor_type)
+                if data is not None and not isinstance(data, dict):
+                    data = decode_sensor_data(sensor_type, data, state.vehicle_id)
+                if data is not None:
+                    sensor_data[sensor_type] = data
+            clouds = {}
+            cloud = state.point_cloud_cache.get(cloud_sensor)
+            if cloud is not None and len(cloud.points):
+                stride = max(1, math.ceil(len(cloud.points) / max_points))
+                clouds[cloud_sensor] = PointCloudData(
+                    points=np.ascontiguousarray(cloud.points[::stride], dtype=np.float32),
+                    timestamps=np.empty(0, dtype=np.float32),
+                    source_vehicle=cloud.source_vehicle,
+                    frame=cloud.frame,
+                    sensor_timestamp=cloud.sensor_timestamp
+                )
+            slim[key] = replace(state, sensor_data=sensor_data, other_vehicles={}, point_cloud_cache=clouds,
+                                combined_point_cloud=None, detected_objects=None, sensor_events=[])
+        return slim[key]
+
+    snapshot = {}
+    for seq_id, state in vehicle_states.items():
+        ego = snapshot[seq_id] = copy(state)
+        ego.other_vehicles = {other_id: copy(other) for other_id, other in state.other_vehicles.items()}
+    return snapshot
+
+
+class DashboardProcess:
+    """Simulation-side handle of the dashboard process"""
+
+    def __init__(self, shared_memory_mb: float = 64, refresh_hz: float = 20.0, max_points: int = 20000,
+                 status_hz: float = 4.0, layout: str = 'grid', grid_columns: int = 2,
+                 background_hz: float = 2.0, focus_vehicle: Optional[int] = None):
+        self.max_points = max_points
+        self.frames = FrameChannel.create(int(shared_memory_mb * 1024 * 1024))
+        self.status = FrameChannel.create(64 * 1024)
+        self.visible: Set[int] = set()
+        self.closed: Set[int] = set()
+        self.published = 0
+
+        # Spawn rather than fork, Qt must not inherit the simulation's threads and sockets
+        context = multiprocessing.get_context('spawn')
+        self.process = context.Process(
+            target=run_dashboards,
+            args=(self.frames.name, self.status.name, refresh_hz, status_hz,
+                  dict(layout=layout, grid_columns=grid_columns, background_hz=background_hz,
+                       focus_vehicle=focus_vehicle)),
+            name="dashboards",
+            daemon=True
+        )
+        self.process.start()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'DashboardProcess':
+        return cls(**{k: v for k, v in config.items() if k not in ('enabled', 'mode')})
+
+    @property
+    def dropped(self) -> int:
+        return self.frames.dropped
+
+    def publish(self, frame: int, vehicle_states: Dict[int, VehicleState]) -> bool:
+        """Hand this tick's ego states to the dashboards without waiting for them"""
+        if not vehicle_states or not self.process.is_alive():
+            return False
+        try:
+            payload = pickle.dumps(dashboard_snapshot(vehicle_states, self.max_points),
+                                   protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logging.error(f"Error serializing dashboard frame {frame}: {e}")
+            return False
+        if self.frames.write(payload, frame):
+            self.published += 1
+            return True
+        return False
+
+    def poll_status(self) -> Set[int]:
+        """Refresh visible and closed dashboards; returns vehicles whose dashboard closed since the last poll"""
+        message = self.status.read()
+        if message is None:
+            return set()
+        status = pickle.loads(message[1])
+        newly_closed = set(status['closed']) - self.closed
+        self.visible = set(status['visible'])
+        self.closed = set(status['closed'])
+        return newly_closed
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Ask the dashboards to quit, wait for them and free the shared memory"""
+        self.frames.close_writer()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            logging.warning("Dashboard process did not exit, terminating it")
+            self.process.terminate()
+            self.process.join(1.0)
+        self.frames.close()
+        self.status.close()
+
+
+def run_dashboards(frames_name: str, status_name: str, refresh_hz: float, status_hz: float,
+                   view_options: Dict) -> int:
+    """Dashboard process entry point: render frames from the channel until the simulation closes it"""
+    # Qt is only needed in this process
+    from PySide6.QtCore import QTimer
+    from .dashboard_app import DashboardApplication
+
+    logging.basicConfig(level=logging.INFO)
+    frames = FrameChannel.attach(frames_name)
+    status = FrameChannel.attach(status_name)
+    parent = multiprocessing.parent_process()
+
+    def next_frame() -> Optional[Dict[int, VehicleState]]:
+        message = frames.read()
+        if message is None:
+            return None
+        try:
+            return pickle.loads(message[1])
+        except Exception as e:
+            logging.error(f"Error decoding dashboard frame {message[0]}: {e}")
+            return None
+
+    app = DashboardApplication(frame_source=next_frame, refresh_hz=refresh_hz, **view_options)
+
+    def report_status() -> None:
+        if frames.writer_closed or (parent is not None and not parent.is_alive()):
+            app.cleanup()
+            return
+        status.write(pickle.dumps({'visible': app.visible_vehicle_ids(),
+                                   'closed': sorted(app.closed_dashboard_ids)}))
+
+    status_timer = QTimer()
+    status_timer.timeout.connect(report_status)
+    status_timer.start(int(1000 / status_hz))
+
+    try:
+        return app.run()
+    finally:
+        status_timer.stop()
+        frames.close()
+        status.close()
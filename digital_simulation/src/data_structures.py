@@ -16,6 +16,15 @@ class PointCloudData:
     timestamps: npt.NDArray[np.float32]  # N timestamps
     tags: Optional[npt.NDArray[np.int32]] = None  # N semantic tags (if semantic lidar)
     source_vehicle: int = -1  # vehicle_id of source
+    frame: int = -1  # simulator frame the measurement was taken in
+    sensor_timestamp: float = 0.0  # simulation time of the measurement
+
+@dataclass
+class ObjectList:
+    objects: npt.NDArray  # structured array of OBJECT_DTYPE rows in world coordinates
+    source_vehicle: int = -1  # vehicle_id of source, -1 once fused
+    frame: int = -1  # simulator frame of the newest contributing measurement
+    sensor_timestamp: float = 0.0
 
 @dataclass
 class CombinedPointCloud:
@@ -38,6 +47,15 @@ class VehicleState:
     transform_matrix: npt.NDArray[np.float32] = field(default_factory=lambda: np.eye(4, dtype=np.float32))
     point_cloud_cache: Dict[str, PointCloudData] = field(default_factory=dict)
     combined_point_cloud: Optional[CombinedPointCloud] = None
+    sensor_lod: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # effective sensor resolution
+    hazard_alerts: List[Any] = field(default_factory=list)  # HazardAlerts for this vehicle, most urgent first
+    predicted_trajectory: Optional[npt.NDArray[np.float32]] = None  # Kx2 predicted world (x, y) positions
+    sensor_events: List[str] = field(default_factory=list)  # event sensor types that fired since last tick
+    road_hazards: List[Any] = field(default_factory=list)  # RoadHazards along the route corridor, strongest first
+    traffic_flow: Optional[Any] = None  # SegmentFlow of the road segment the vehicle is on
+    detected_objects: Optional[ObjectList] = None  # objects clustered from this vehicle's semantic lidar
+    fused_objects: Optional[ObjectList] = None  # objects fused from every vehicle's detections
+    obstacle_distance: Optional[float] = None  # m to the nearest lidar point in the lane ahead, inf if clear
 
 class V2VNetwork:
     def __init__(self):
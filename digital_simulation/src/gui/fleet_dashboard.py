@@ -0,0 +1,191 @@
+import time
+from typing import Callable, Dict, List, Optional, Set
+from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
+                             QTabWidget, QScrollArea, QComboBox, QLabel)
+from .dashboard_window import VehiclePanel
+from .styles import apply_styles
+from ..data_structures import VehicleState
+
+class FleetDashboardWindow(QMainWindow):
+    """One window with a panel per vehicle, laid out as tabs or a scrolling grid
+
+    Only panels that are actually on screen are rendered: a background tab,
+    a grid cell scrolled out of view or a minimized window keeps just the
+    newest state and catches up when it shows again. The focus vehicle is
+    updated on every frame, the other visible panels at background_hz.
+    """
+
+    def __init__(self, layout: str = 'grid', columns: int = 2, background_hz: float = 2.0,
+                 focus_vehicle: Optional[int] = None,
+                 on_close_callback: Optional[Callable[[int], None]] = None):
+        super().__init__()
+        self.layout_mode = layout
+        self.columns = max(1, columns)
+        self.background_interval = 1.0 / background_hz if background_hz > 0 else float('inf')
+        self.focus_vehicle = focus_vehicle
+        self.on_close_callback = on_close_callback
+        self.panels: Dict[int, VehiclePanel] = {}
+        self._latest: Dict[int, VehicleState] = {}  # newest state per vehicle, shown or not
+        self._stale: Set[int] = set()  # panels that missed frames while hidden
+        self._last_render: Dict[int, float] = {}
+        self.rendered = 0
+        self.skipped = 0
+        self.setWindowTitle("Fleet Dashboard")
+        self.setup_ui()
+        apply_styles(self)
+
+    def setup_ui(self):
+        """Setup the focus selector and the tab or grid container"""
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+
+        # Focus selector
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("Focus vehicle:"))
+        self.focus_selector = QComboBox()
+        self.focus_selector.currentIndexChanged.connect(self._on_focus_selected)
+        toolbar.addWidget(self.focus_selector)
+        toolbar.addStretch()
+        layout.addLayout(toolbar)
+
+        if self.layout_mode == 'tabs':
+            self.tabs = QTabWidget()
+            self.tabs.setTabsClosable(True)
+            self.tabs.tabCloseRequested.connect(self._on_tab_close)
+            # The tab being looked at is the natural focus
+            self.tabs.currentChanged.connect(self._on_tab_changed)
+            layout.addWidget(self.tabs)
+        else:
+            self.grid_container = QWidget()
+            self.grid = QGridLayout(self.grid_container)
+            scroll = QScrollArea()
+            scroll.setWidgetResizable(True)
+            scroll.setWidget(self.grid_container)
+            layout.addWidget(scroll)
+
+        self.setMinimumSize(1200, 800)
+
+    def add_vehicle(self, vehicle_id: int) -> VehiclePanel:
+        """Create the panel of a vehicle"""
+        panel = VehiclePanel(vehicle_id, compact=self.layout_mode != 'tabs')
+        self.panels[vehicle_id] = panel
+        if self.focus_vehicle is None:
+            self.focus_vehicle = vehicle_id
+
+        # Adding the first tab or item would otherwise move the focus to it
+        selectors = [self.focus_selector] + ([self.tabs] if self.layout_mode == 'tabs' else [])
+        for selector in selectors:
+            selector.blockSignals(True)
+        if self.layout_mode == 'tabs':
+            self.tabs.addTab(panel, f"Vehicle {vehicle_id}")
+            if vehicle_id == self.focus_vehicle:
+                self.tabs.setCurrentWidget(panel)
+        else:
+            index = len(self.panels) - 1
+            self.grid.addWidget(panel, index // self.columns, index % self.columns)
+        self.focus_selector.addItem(f"Vehicle {vehicle_id}", vehicle_id)
+        self.focus_selector.setCurrentIndex(self.focus_selector.findData(self.focus_vehicle))
+        for selector in selectors:
+            selector.blockSignals(False)
+        return panel
+
+    def remove_vehicle(self, vehicle_id: int):
+        """Drop a vehicle's panel and tell the application its dashboard closed"""
+        panel = self.panels.pop(vehicle_id, None)
+        if panel is None:
+            return
+        panel.cleanup()
+        if self.layout_mode == 'tabs':
+            self.tabs.removeTab(self.tabs.indexOf(panel))
+        else:
+            self.grid.removeWidget(panel)
+            self._relayout_grid()
+        panel.deleteLater()
+        self.focus_selector.removeItem(self.focus_selector.findData(vehicle_id))
+        self._latest.pop(vehicle_id, None)
+        self._last_render.pop(vehicle_id, None)
+        self._stale.discard(vehicle_id)
+        if self.focus_vehicle == vehicle_id:
+            self.focus_vehicle = next(iter(self.panels), None)
+        if self.on_close_callback:
+            self.on_close_callback(vehicle_id)
+
+    def _relayout_grid(self):
+        for index, panel in enumerate(self.panels.values()):
+            self.grid.addWidget(panel, index // self.columns, index % self.columns)
+
+    def is_panel_visible(self, vehicle_id: int) -> bool:
+        """True if any part of the vehicle's panel is on screen"""
+        panel = self.panels.get(vehicle_id)
+        if panel is None or not self.isVisible() or self.isMinimized():
+            return False
+        return panel.isVisible() and not panel.visibleRegion().isEmpty()
+
+    def visible_vehicle_ids(self) -> List[int]:
+        return [vehicle_id for vehicle_id in self.panels if self.is_panel_visible(vehicle_id)]
+
+    def update_states(self, states: Dict[int, VehicleState]):
+        """Render the states that are on screen and due, keep the rest for later"""
+        now = time.monotonic()
+        visible = set(self.visible_vehicle_ids())
+        for vehicle_id in self.panels:
+            if vehicle_id in states:
+                self._latest[vehicle_id] = states[vehicle_id]
+            elif vehicle_id not in self._stale:
+                continue  # Nothing new to show
+            state = self._latest.get(vehicle_id)
+            if state is None:
+                continue
+            if vehicle_id not in visible:
+                # Catch up as soon as the panel is visible again
+                self._stale.add(vehicle_id)
+                self.skipped += 1
+                continue
+            due = now - self._last_render.get(vehicle_id, float('-inf')) >= self.background_interval
+            if vehicle_id != self.focus_vehicle and vehicle_id not in self._stale and not due:
+                self.skipped += 1
+                continue
+            self._render(vehicle_id, state, now)
+
+    def _render(self, vehicle_id: int, state: VehicleState, now: float):
+        self.panels[vehicle_id].update_state(state)
+        self._stale.discard(vehicle_id)
+        self._last_render[vehicle_id] = now
+        self.rendered += 1
+
+    def set_focus_vehicle(self, vehicle_id: Optional[int]):
+        self.focus_vehicle = vehicle_id
+        # Show the focus vehicle's newest state right away
+        state = self._latest.get(vehicle_id)
+        if state is not None and self.is_panel_visible(vehicle_id):
+            self._render(vehicle_id, state, time.monotonic())
+
+    def _on_focus_selected(self, index: int):
+        vehicle_id = self.focus_selector.itemData(index)
+        if vehicle_id is None or vehicle_id == self.focus_vehicle:
+            return
+        if self.layout_mode == 'tabs' and vehicle_id in self.panels:
+            self.tabs.setCurrentWidget(self.panels[vehicle_id])
+        self.set_focus_vehicle(vehicle_id)
+
+    def _on_tab_changed(self, index: int):
+        panel = self.tabs.widget(index)
+        if panel is not None:
+            self.focus_selector.setCurrentIndex(self.focus_selector.findData(panel.vehicle_id))
+
+    def _on_tab_close(self, index: int):
+        panel = self.tabs.widget(index)
+        if panel is not None:
+            self.remove_vehicle(panel.vehicle_id)
+
+    def cleanup(self):
+        """Cleanup panel resources"""
+        for panel in self.panels.values():
+            panel.cleanup()
+
+    def closeEvent(self, event):
+        """Closing the fleet window closes every vehicle's dashboard"""
+        for vehicle_id in list(self.panels):
+            self.remove_vehicle(vehicle_id)
+        super().closeEvent(event)
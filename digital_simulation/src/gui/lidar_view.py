@@ -1,10 +1,43 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from PySide6.QtWidgets import QWidget
-from PySide6.QtGui import QPainter, QColor, QPen
+from PySide6.QtGui import QPainter, QColor, QPen, QPolygonF, QImage, QPixmap
 from PySide6.QtCore import Qt, QPointF, QTimer
 import numpy as np
 from ..data_structures import VehicleState, PointCloudData
+from ..utils.point_raster import PointRaster, to_screen
+
+@dataclass
+class PaintStats:
+    paints: int = 0
+    skipped_updates: int = 0  # update_state calls that changed no layer
+    coalesced_updates: int = 0  # update_state calls folded into an already scheduled repaint
+    static_rebuilds: int = 0
+    point_rebuilds: int = 0
+    recent_ms: deque = field(default_factory=lambda: deque(maxlen=120))
+
+    def as_dict(self) -> dict:
+        recent = list(self.recent_ms)
+        return {
+            'paints': self.paints,
+            'skipped_updates': self.skipped_updates,
+            'coalesced_updates': self.coalesced_updates,
+            'static_rebuilds': self.static_rebuilds,
+            'point_rebuilds': self.point_rebuilds,
+            'mean_paint_ms': sum(recent) / len(recent) if recent else 0.0,
+            'max_paint_ms': max(recent) if recent else 0.0,
+        }
 
 class LidarView(QWidget):
+    """Top-down ego view drawn from cached layers
+
+    The background and grid are kept in a pixmap rebuilt only on resize,
+    and the point clouds in a raster rebuilt only when a cloud's source
+    frame or the ego pose changes. Vehicles, objects and predictions are
+    drawn on top on every paint. Updates that change nothing are dropped
+    and the rest are coalesced to at most one paint per display refresh.
+    """
     def __init__(self):
         super().__init__()
         self.setMinimumSize(600, 600)
@@ -13,6 +46,22 @@ class LidarView(QWidget):
         self.center_offset = (300, 300)  # center point offset
         self._painter = None
         self.collision_timers = {}  # Store timers for each vehicle's collision
+        # Point clouds are splatted into a numpy layer that a QImage wraps without copying
+        self.point_raster = PointRaster(0, 0)
+        self._point_image = None
+        self._points_drawn = False
+        self._static_layer = None
+        # Keys of the layers as last painted; a layer is dirty when its key changes
+        self._static_key = None
+        self._points_key = None
+        self._painted_key = None
+        self.paint_stats = PaintStats()
+        self._repaint_pending = False
+        self._last_paint = 0.0
+        self._min_paint_interval = None  # seconds, from the display refresh rate once shown
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.timeout.connect(self._repaint_now)
         
     def cleanup(self):
         """Cleanup resources before destruction"""
@@ -20,22 +69,31 @@ class LidarView(QWidget):
         for timer in self.collision_timers.values():
             timer.stop()
         self.collision_timers.clear()
+        self._repaint_timer.stop()
         
         if hasattr(self, '_painter') and self._painter and self._painter.isActive():
             self._painter.end()
             self._painter = None
         self.state = None
+        self._point_image = None
+        self._static_layer = None
+        self._static_key = self._points_key = self._painted_key = None
     
     def closeEvent(self, event):
         """Handle widget close event"""
         self.cleanup()
         super().closeEvent(event)
+
+    def resizeEvent(self, event):
+        """Keep the ego vehicle at the centre of the view at any size"""
+        self.center_offset = (self.width() // 2, self.height() // 2)
+        super().resizeEvent(event)
     
     def update_state(self, state: VehicleState):
         """Update view with new vehicle state"""
         if not self.state:
             self.state = state
-            self.update()
+            self.request_repaint()
             return
 
         # Check for new collisions
@@ -57,51 +115,105 @@ class LidarView(QWidget):
             self.clear_collision(vehicle_id)
 
         self.state = state
-        self.update()
+        self.request_repaint()
     
     def clear_collision(self, vehicle_id):
         """Clear collision visualization for a vehicle"""
         if vehicle_id in self.collision_timers:
             self.collision_timers[vehicle_id].stop()
             del self.collision_timers[vehicle_id]
-            self.update()  # Trigger repaint
+            self.request_repaint()  # Trigger repaint
+
+    def request_repaint(self):
+        """Schedule a paint if any layer changed, at most one per display refresh"""
+        if not self.state or self._frame_key() == self._painted_key:
+            self.paint_stats.skipped_updates += 1
+            return
+        if self._repaint_pending:
+            self.paint_stats.coalesced_updates += 1
+            return
+        self._repaint_pending = True
+        if self._min_paint_interval is None and self.screen() is not None:
+            refresh_rate = self.screen().refreshRate()
+            self._min_paint_interval = 1.0 / refresh_rate if refresh_rate > 0 else 1.0 / 60
+        wait = (self._min_paint_interval or 0.0) - (time.perf_counter() - self._last_paint)
+        if wait > 0:
+            self._repaint_timer.start(int(wait * 1000) + 1)
+        else:
+            self.update()
+
+    def _repaint_now(self):
+        self.update()
+
+    def _static_layer_key(self):
+        return (self.width(), self.height(), self.center_offset, self.scale, self.devicePixelRatioF())
+
+    def _point_layer_key(self):
+        """Source frames of the drawn clouds plus the ego pose they are projected with"""
+        sources = []
+        for state in (self.state, *self.state.other_vehicles.values()):
+            cloud = getattr(state, 'point_cloud_cache', {}).get('lidar')
+            if cloud is not None:
+                # Clouds without a simulator frame fall back to the identity of their points
+                sources.append((state.vehicle_id, cloud.frame if cloud.frame >= 0 else id(cloud.points)))
+        return (tuple(sources), tuple(self.state.location), tuple(self.state.rotation), self._static_layer_key())
+
+    def _frame_key(self):
+        """Everything a paint depends on; unchanged means the widget already shows this frame"""
+        return (self._point_layer_key(), self.state.timestamp, frozenset(self.collision_timers))
     
     def paintEvent(self, event):
+        self._repaint_pending = False
         if not self.state:
             return
+        start = time.perf_counter()
             
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         
-        # Draw background
-        painter.fillRect(self.rect(), QColor(40, 40, 40))
+        # Background and grid from the cached pixmap
+        static_key = self._static_layer_key()
+        if static_key != self._static_key or self._static_layer is None:
+            self._static_layer = self.render_static_layer()
+            self._static_key = static_key
+            self.paint_stats.static_rebuilds += 1
+        painter.drawPixmap(0, 0, self._static_layer)
         
-        # Draw grid
-        self.draw_grid(painter)
+        # Point clouds from the raster layer, re-rasterized only for new clouds or a moved ego
+        points_key = self._point_layer_key()
+        if points_key != self._points_key:
+            self._points_drawn = self.rasterize_point_clouds(self.collect_point_clouds())
+            self._points_key = points_key
+            self.paint_stats.point_rebuilds += 1
+        if self._points_drawn:
+            painter.drawImage(0, 0, self._point_image)
         
-        # Draw own vehicle's point cloud
-        if self.state.point_cloud_cache and 'lidar' in self.state.point_cloud_cache:
-            self.draw_point_cloud(painter, self.state.point_cloud_cache['lidar'], QColor(0, 255, 0, 100))
+        painter.setRenderHint(QPainter.Antialiasing)
         
-        # Draw other vehicles' point clouds
-        if self.state.other_vehicles:
-            for other in self.state.other_vehicles.values():
-                if hasattr(other, 'point_cloud_cache') and other.point_cloud_cache and 'lidar' in other.point_cloud_cache:
-                    transformed_cloud = self.transform_point_cloud(
-                        other.point_cloud_cache['lidar'],
-                        other.location,
-                        other.rotation,
-                        self.state.location,
-                        self.state.rotation
-                    )
-                    # Draw with different color for each vehicle
-                    color = self.get_vehicle_color(other.vehicle_id)
-                    self.draw_point_cloud(painter, transformed_cloud, color)
+        # Draw fused V2V object detections
+        self.draw_objects(painter)
+        
+        # Draw predicted paths underneath the vehicles
+        self.draw_predictions(painter)
         
         # Draw vehicles
         self.draw_vehicles(painter)
         
         painter.end()
+        self._painted_key = self._frame_key()
+        self._last_paint = time.perf_counter()
+        self.paint_stats.paints += 1
+        self.paint_stats.recent_ms.append((self._last_paint - start) * 1000)
+
+    def render_static_layer(self) -> QPixmap:
+        """Background and grid at device resolution"""
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(QColor(40, 40, 40))
+        painter = QPainter(pixmap)
+        self.draw_grid(painter)
+        painter.end()
+        return pixmap
     
     def draw_grid(self, painter):
         """Draw coordinate grid"""
@@ -116,29 +228,81 @@ class LidarView(QWidget):
             # Horizontal lines
             y = self.center_offset[1] + i * self.scale
             painter.drawLine(0, y, self.width(), y)
+
+    def collect_point_clouds(self):
+        """Own and other vehicles' lidar clouds in the ego frame, with their colours"""
+        clouds = []
+        if self.state.point_cloud_cache and 'lidar' in self.state.point_cloud_cache:
+            clouds.append((self.state.point_cloud_cache['lidar'], QColor(0, 255, 0, 100)))
+        if self.state.other_vehicles:
+            for other in self.state.other_vehicles.values():
+                if hasattr(other, 'point_cloud_cache') and other.point_cloud_cache and 'lidar' in other.point_cloud_cache:
+                    transformed_cloud = self.transform_point_cloud(
+                        other.point_cloud_cache['lidar'],
+                        other.location,
+                        other.rotation,
+                        self.state.location,
+                        self.state.rotation
+                    )
+                    # Draw with different color for each vehicle
+                    clouds.append((transformed_cloud, self.get_vehicle_color(other.vehicle_id)))
+        return clouds
     
-    def draw_point_cloud(self, painter, point_cloud, color):
-        """Draw lidar point cloud with batch rendering"""
-        if point_cloud is None or not hasattr(point_cloud, 'points') or len(point_cloud.points) == 0:
-            return
-            
-        points = point_cloud.points
-        screen_points = np.zeros((len(points), 2), dtype=np.float32)
-        
-        # Vectorized transformation
-        screen_points[:, 0] = self.center_offset[0] + points[:, 0] * self.scale
-        screen_points[:, 1] = self.center_offset[1] - points[:, 1] * self.scale
-        
-        # Set pen once
-        painter.setPen(QPen(color, 2))
-        
-        # Draw points in batches using QPointF array
-        BATCH_SIZE = 1000
-        for i in range(0, len(screen_points), BATCH_SIZE):
-            batch = screen_points[i:i + BATCH_SIZE]
-            points_array = [QPointF(float(x), float(y)) for x, y in batch]
-            painter.drawPoints(points_array)
+    def rasterize_point_clouds(self, clouds) -> bool:
+        """Splat (point_cloud, color) pairs into the raster layer; returns True if anything was drawn"""
+        if self.point_raster.resize(self.width(), self.height()) or self._point_image is None:
+            raster = self.point_raster.buffer
+            self._point_image = QImage(raster.data, raster.shape[1], raster.shape[0],
+                                       raster.strides[0], QImage.Format_RGBA8888_Premultiplied)
+        self.point_raster.clear()
+        drawn = False
+        for point_cloud, color in clouds:
+            if point_cloud is None or not hasattr(point_cloud, 'points') or len(point_cloud.points) == 0:
+                continue
+            screen_points = to_screen(point_cloud.points, self.center_offset, self.scale)
+            drawn = self.point_raster.draw_points(screen_points, color.getRgb()) > 0 or drawn
+        return drawn
     
+    def draw_objects(self, painter):
+        """Draw fused object bounding boxes in the ego frame, brighter when seen by several vehicles"""
+        fused = self.state.fused_objects
+        if fused is None or len(fused.objects) == 0:
+            return
+
+        objects = fused.objects
+        half = objects['size'][:, :2] * 0.5
+        signs = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1)], dtype=np.float32)
+        corners = objects['center'][:, None, :2] + signs[None, :, :] * half[:, None, :]
+
+        ego_yaw = np.radians(self.state.rotation[1])
+        cos_ego, sin_ego = np.cos(-ego_yaw), np.sin(-ego_yaw)
+        rel = corners - np.asarray(self.state.location[:2], dtype=np.float32)
+        screen_x = self.center_offset[0] + (rel[..., 0] * cos_ego - rel[..., 1] * sin_ego) * self.scale
+        screen_y = self.center_offset[1] - (rel[..., 0] * sin_ego + rel[..., 1] * cos_ego) * self.scale
+
+        painter.setBrush(Qt.NoBrush)
+        for xs, ys, observers in zip(screen_x.tolist(), screen_y.tolist(), objects['observers'].tolist()):
+            painter.setPen(QPen(QColor(255, 255, 255, 220 if observers > 1 else 110), 1))
+            painter.drawPolygon(QPolygonF([QPointF(x, y) for x, y in zip(xs, ys)]))
+
+    def draw_predictions(self, painter):
+        """Draw predicted trajectories of the ego and other vehicles in the ego frame"""
+        states = [self.state, *self.state.other_vehicles.values()]
+        paths = [s.predicted_trajectory for s in states if s.predicted_trajectory is not None]
+        if not paths:
+            return
+
+        # Transform every predicted point to screen coordinates in one pass
+        ego_yaw = np.radians(self.state.rotation[1])
+        cos_ego, sin_ego = np.cos(-ego_yaw), np.sin(-ego_yaw)
+        world = np.stack(paths) - np.asarray(self.state.location[:2], dtype=np.float32)
+        screen_x = self.center_offset[0] + (world[..., 0] * cos_ego - world[..., 1] * sin_ego) * self.scale
+        screen_y = self.center_offset[1] - (world[..., 0] * sin_ego + world[..., 1] * cos_ego) * self.scale
+
+        painter.setPen(QPen(QColor(0, 200, 255, 120), 1, Qt.DashLine))
+        for xs, ys in zip(screen_x.tolist(), screen_y.tolist()):
+            painter.drawPolyline([QPointF(x, y) for x, y in zip(xs, ys)])
+
     def draw_vehicles(self, painter):
         """Draw vehicle positions"""
         if not self.state:
@@ -38,7 +38,11 @@ class VehicleInfoWidget(QWidget):
             'location': self.create_info_label("Location (x, y, z)"),
             'rotation': self.create_info_label("Rotation (p, y, r)"),
             'other_vehicles': self.create_info_label("Other Vehicles"),
-            'nearest_vehicle': self.create_info_label("Nearest Vehicle")
+            'nearest_vehicle': self.create_info_label("Nearest Vehicle"),
+            'obstacle': self.create_info_label("Obstacle Ahead"),
+            'hazard': self.create_info_label("Top Hazard"),
+            'road_hazards': self.create_info_label("Road Hazards Ahead"),
+            'traffic_flow': self.create_info_label("Segment Flow")
         }
         
         # Add labels to grid
@@ -122,17 +126,54 @@ class VehicleInfoWidget(QWidget):
         
         # Find nearest vehicle
         if other_vehicles_count > 0:
-            nearest_distance = float('inf')
-            nearest_id = None
-            for other in state.other_vehicles.values():
-                dx = other.location[0] - state.location[0]
-                dy = other.location[1] - state.location[1]
-                distance = np.sqrt(dx*dx + dy*dy)
-                if distance < nearest_distance:
-                    nearest_distance = distance
-                    nearest_id = other.vehicle_id
+            others = list(state.other_vehicles.values())
+            offsets = np.array([other.location[:2] for other in others], dtype=np.float64)
+            offsets -= state.location[:2]
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+            nearest = int(np.argmin(distances))
             self.labels['nearest_vehicle'][1].setText(
-                f"ID: {nearest_id} ({nearest_distance:.1f}m)"
+                f"ID: {others[nearest].vehicle_id} ({distances[nearest]:.1f}m)"
             )
         else:
             self.labels['nearest_vehicle'][1].setText("None")
+
+        distance = state.obstacle_distance
+        if distance is None:
+            self.labels['obstacle'][1].setText("-")
+        elif np.isfinite(distance):
+            self.labels['obstacle'][1].setText(f"{distance:.1f}m")
+        else:
+            self.labels['obstacle'][1].setText("Clear")
+
+        # Show the most urgent V2V hazard alert
+        if state.hazard_alerts:
+            alert = state.hazard_alerts[0]
+            kind = "Collision risk" if alert.kind == 'collision_risk' else "Sudden stop"
+            self.labels['hazard'][1].setText(
+                f"{kind}: V{alert.other_id} in {alert.time_to_collision:.1f}s ({alert.distance:.1f}m)"
+            )
+        else:
+            self.labels['hazard'][1].setText("None")
+
+        # Summarize mapped collision and lane invasion spots along the route
+        if state.road_hazards:
+            collisions = sum(1 for hazard in state.road_hazards if hazard.event.kind == 'collision')
+            nearest = min(
+                np.hypot(h.event.x - state.location[0], h.event.y - state.location[1])
+                for h in state.road_hazards
+            )
+            self.labels['road_hazards'][1].setText(
+                f"{collisions} collision, {len(state.road_hazards) - collisions} lane invasion "
+                f"(nearest {nearest:.0f}m)"
+            )
+        else:
+            self.labels['road_hazards'][1].setText("None")
+
+        flow = state.traffic_flow
+        if flow:
+            self.labels['traffic_flow'][1].setText(
+                f"Road {flow.road_id} lane {flow.lane_id}: {flow.density:.1f} veh, "
+                f"{flow.mean_speed:.0f} km/h, {flow.throughput:.0f} veh/min"
+            )
+        else:
+            self.labels['traffic_flow'][1].setText("-")
@@ -0,0 +1,265 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import numpy.typing as npt
+from .data_structures import VehicleState
+from .trajectory_predictor import TrajectoryPrediction
+
+COLLISION_RISK = 'collision_risk'
+SUDDEN_STOP = 'sudden_stop'
+
+# Half of the 8-neighbourhood plus the cell itself, so each cell pair is visited once
+_HALF_NEIGHBOURS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+@dataclass
+class HazardAlert:
+    kind: str  # COLLISION_RISK or SUDDEN_STOP
+    vehicle_id: int  # vehicle receiving the alert
+    other_id: int  # vehicle causing the hazard
+    time_to_collision: float  # seconds, inf if the paths never come within the collision radius
+    distance: float  # current distance in meters
+    cpa_distance: float  # distance at the closest point of approach
+    priority: float  # seconds until the hazard matters, lower is more urgent
+
+
+def imu_longitudinal_acceleration(sensor_data: Dict[str, Any]) -> float:
+    """Forward acceleration in m/s^2 from decoded or raw IMU data, 0 if unavailable"""
+    imu = sensor_data.get('imu')
+    if imu is None:
+        return 0.0
+    if isinstance(imu, dict):
+        return float(imu.get('accelerometer', {}).get('x', 0.0))
+    return float(imu.accelerometer.x)
+
+
+class HazardEngine:
+    """All-pairs time-to-collision and closest-point-of-approach hazard detection"""
+
+    def __init__(self, horizon: float = 4.0, collision_radius: float = 2.5,
+                 sudden_stop_deceleration: float = 4.0, sudden_stop_radius: float = 50.0,
+                 sudden_stop_max_heading: float = 30.0, sudden_stop_lateral: float = 3.5,
+                 prune_threshold: int = 128, budget_ms: float = 1.0, use_predictions: bool = False):
+        self.horizon = horizon
+        self.collision_radius = collision_radius
+        self.sudden_stop_deceleration = sudden_stop_deceleration
+        self.sudden_stop_radius = sudden_stop_radius
+        self.sudden_stop_min_heading_cos = float(np.cos(np.radians(sudden_stop_max_heading)))
+        self.sudden_stop_lateral = sudden_stop_lateral
+        self.prune_threshold = prune_threshold
+        self.budget_ms = budget_ms
+        self.use_predictions = use_predictions
+
+        self.last_update_ms = 0.0
+        self.over_budget_count = 0
+        self._previous_speeds: Dict[int, float] = {}
+        self._triu_cache: Dict[int, Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'HazardEngine':
+        return cls(**{k: v for k, v in config.items() if k != 'enabled'})
+
+    def update(self, states: Dict[int, VehicleState], dt: float,
+               prediction: Optional[TrajectoryPrediction] = None) -> Dict[int, List[HazardAlert]]:
+        """Compute prioritized alerts per recipient vehicle for one tick
+
+        With use_predictions set and a prediction for the same fleet, collision
+        risk is checked along the predicted trajectories instead of straight lines.
+        """
+        start_time = time.perf_counter()
+        if not states:
+            return {}
+
+        n = len(states)
+        values = list(states.values())
+        ids = np.fromiter(states.keys(), dtype=np.int64, count=n)
+        positions = np.array([s.location for s in values], dtype=np.float64)[:, :2]
+        velocities = np.array([s.velocity for s in values], dtype=np.float64)[:, :2]
+        yaw = np.radians(np.array([s.rotation[1] for s in values], dtype=np.float64))
+        speeds = np.array([s.speed for s in values], dtype=np.float64) / 3.6
+        accel = np.array([imu_longitudinal_acceleration(s.sensor_data) if s.sensor_data else 0.0
+                          for s in values], dtype=np.float64)
+
+        previous = np.array([self._previous_speeds.get(vid, s) for vid, s in zip(ids.tolist(), speeds.tolist())])
+        deceleration = np.maximum(-accel, (previous - speeds) / dt if dt > 0 else 0.0)
+        self._previous_speeds = dict(zip(ids.tolist(), speeds.tolist()))
+
+        trajectories = None
+        if self.use_predictions and prediction is not None:
+            trajectories = self._prediction_rows(ids, prediction)
+
+        alerts: Dict[int, List[HazardAlert]] = {}
+        self._collision_alerts(ids, positions, velocities, alerts, trajectories)
+        self._sudden_stop_alerts(ids, positions, velocities, yaw, deceleration, alerts)
+        for recipient_alerts in alerts.values():
+            recipient_alerts.sort(key=lambda alert: alert.priority)
+
+        self.last_update_ms = (time.perf_counter() - start_time) * 1000
+        if self.last_update_ms > self.budget_ms:
+            self.over_budget_count += 1
+            if self.over_budget_count % 100 == 1:
+                logging.warning(f"Hazard engine took {self.last_update_ms:.2f} ms for {n} vehicles "
+                                f"(budget {self.budget_ms} ms)")
+        return alerts
+
+    def candidate_pairs(self, positions: npt.NDArray[np.float64],
+                        max_speed: float) -> Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+        """Index pairs (i, j) that could come within the collision radius inside the horizon"""
+        n = len(positions)
+        if n <= self.prune_threshold:
+            if n not in self._triu_cache:
+                self._triu_cache[n] = np.triu_indices(n, 1)
+            return self._triu_cache[n]
+
+        # Two vehicles can close at most 2 * max_speed * horizon within the horizon
+        cell_size = 2 * max_speed * self.horizon + self.collision_radius
+        cells = np.floor(positions / cell_size).astype(np.int64)
+        cells -= cells.min(axis=0)
+        width = int(cells[:, 1].max()) + 3
+        keys = (cells[:, 0] + 1) * width + cells[:, 1] + 1
+
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        first, second = [], []
+        for dx, dy in _HALF_NEIGHBOURS:
+            targets = keys + dx * width + dy
+            lo = np.searchsorted(sorted_keys, targets, side='left')
+            hi = np.searchsorted(sorted_keys, targets, side='right')
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # Expand each [lo, hi) range into explicit partner indices
+            i = np.repeat(np.arange(n), counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            j = order[np.repeat(lo, counts) + offsets]
+            if (dx, dy) == (0, 0):
+                keep = i < j
+                i, j = i[keep], j[keep]
+            first.append(i)
+            second.append(j)
+
+        if not first:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        return np.concatenate(first), np.concatenate(second)
+
+    def _prediction_rows(self, ids, prediction: TrajectoryPrediction):
+        """Trajectories within the horizon in ids order, or None if some vehicle is missing"""
+        steps = int(np.searchsorted(prediction.times, self.horizon, side='right'))
+        if steps == 0:
+            return None
+        if np.array_equal(prediction.vehicle_ids, ids):
+            return prediction.times[:steps], prediction.trajectories[:, :steps]
+        rows = [prediction.rows.get(vehicle_id) for vehicle_id in ids.tolist()]
+        if None in rows:
+            return None
+        return prediction.times[:steps], prediction.trajectories[rows, :steps]
+
+    def _collision_alerts(self, ids, positions, velocities, alerts: Dict[int, List[HazardAlert]],
+                          trajectories=None) -> None:
+        x, y = positions[:, 0].astype(np.float32), positions[:, 1].astype(np.float32)
+        vx, vy = velocities[:, 0].astype(np.float32), velocities[:, 1].astype(np.float32)
+        speed = np.sqrt(vx * vx + vy * vy)
+        i, j = self.candidate_pairs(positions, float(speed.max()))
+        if len(i) == 0:
+            return
+
+        # The relative speed of a pair is at most the sum of its speeds, so this bound needs
+        # no relative velocity and drops most distant pairs before the exact check below
+        px, py = x[j] - x[i], y[j] - y[i]
+        pp = px * px + py * py
+        bound = (speed[i] + speed[j]) * self.horizon + self.collision_radius
+        near = pp <= bound * bound
+        i, j, px, py, pp = (a[near] for a in (i, j, px, py, pp))
+
+        rvx, rvy = vx[j] - vx[i], vy[j] - vy[i]
+        vv = rvx * rvx + rvy * rvy
+
+        # Pairs further apart than they can close within the horizon are dropped early
+        reach = np.sqrt(vv) * self.horizon + self.collision_radius
+        near = pp <= reach * reach
+        i, j, px, py, rvx, rvy, pp, vv = (a[near] for a in (i, j, px, py, rvx, rvy, pp, vv))
+        if len(i) == 0:
+            return
+        if trajectories is not None:
+            self._trajectory_collision_alerts(ids, i, j, np.sqrt(pp), trajectories, alerts)
+            return
+
+        pv = px * rvx + py * rvy
+        moving = vv > 1e-9
+        t_cpa = np.zeros_like(pv)
+        np.divide(-pv, vv, out=t_cpa, where=moving)
+        np.clip(t_cpa, 0.0, self.horizon, out=t_cpa)
+        cx, cy = px + rvx * t_cpa, py + rvy * t_cpa
+        d_cpa = np.sqrt(cx * cx + cy * cy)
+
+        risk = d_cpa < self.collision_radius
+        if not risk.any():
+            return
+        i, j, pp, pv, vv, d_cpa, moving = (a[risk] for a in (i, j, pp, pv, vv, d_cpa, moving))
+
+        # First time the distance shrinks to the collision radius: vv t^2 + 2 pv t + pp - r^2 = 0
+        r2 = self.collision_radius ** 2
+        discriminant = np.maximum(pv * pv - vv * (pp - r2), 0.0)
+        ttc = np.full_like(pv, np.inf)
+        np.divide(-pv - np.sqrt(discriminant), vv, out=ttc, where=moving)
+        ttc = np.where(pp <= r2, 0.0, np.maximum(ttc, 0.0))
+
+        within = ttc <= self.horizon
+        distance = np.sqrt(pp)
+        for a, b, t, d, c in zip(ids[i[within]].tolist(), ids[j[within]].tolist(), ttc[within].tolist(),
+                                 distance[within].tolist(), d_cpa[within].tolist()):
+            alerts.setdefault(a, []).append(HazardAlert(COLLISION_RISK, a, b, t, d, c, t))
+            alerts.setdefault(b, []).append(HazardAlert(COLLISION_RISK, b, a, t, d, c, t))
+
+    def _trajectory_collision_alerts(self, ids, i, j, distance, trajectories,
+                                     alerts: Dict[int, List[HazardAlert]]) -> None:
+        """Collision risk from the first predicted step where a pair comes within the collision radius"""
+        times, paths = trajectories
+        gaps = paths[j] - paths[i]
+        gap_sq = np.einsum('pkd,pkd->pk', gaps, gaps)
+        d_cpa = np.sqrt(gap_sq.min(axis=1))
+
+        r2 = self.collision_radius ** 2
+        inside = gap_sq < r2
+        risk = inside.any(axis=1) | (distance < self.collision_radius)
+        if not risk.any():
+            return
+        ttc = np.where(distance[risk] < self.collision_radius, 0.0, times[inside[risk].argmax(axis=1)])
+
+        for a, b, t, d, c in zip(ids[i[risk]].tolist(), ids[j[risk]].tolist(), ttc.tolist(),
+                                 distance[risk].tolist(), d_cpa[risk].tolist()):
+            alerts.setdefault(a, []).append(HazardAlert(COLLISION_RISK, a, b, t, d, c, t))
+            alerts.setdefault(b, []).append(HazardAlert(COLLISION_RISK, b, a, t, d, c, t))
+
+    def _sudden_stop_alerts(self, ids, positions, velocities, yaw, deceleration,
+                            alerts: Dict[int, List[HazardAlert]]) -> None:
+        braking = np.flatnonzero(deceleration > self.sudden_stop_deceleration)
+        if len(braking) == 0:
+            return
+
+        # Warn vehicles following each braking vehicle in its lane, ranked by time to close the gap.
+        # Only vehicles behind and within the radius are candidates; the lane filters run on those.
+        offsets = positions[None, :, :] - positions[braking, None, :]
+        heading = np.stack([np.cos(yaw[braking]), np.sin(yaw[braking])], axis=1)
+        behind = np.einsum('bnk,bk->bn', offsets, heading) < 0  # also excludes the braking vehicle
+        near = np.einsum('bnk,bnk->bn', offsets, offsets) < self.sudden_stop_radius ** 2
+        b, n = np.nonzero(behind & near)
+        if len(b) == 0:
+            return
+
+        offset, heading, source = offsets[b, n], heading[b], braking[b]
+        lateral = np.abs(offset[:, 0] * heading[:, 1] - offset[:, 1] * heading[:, 0])
+        same_direction = np.cos(yaw[n] - yaw[source]) > self.sudden_stop_min_heading_cos
+        closing = np.einsum('pk,pk->p', velocities[n] - velocities[source], heading)
+        affected = same_direction & (closing > 0) & (lateral < self.sudden_stop_lateral)
+
+        distance = np.sqrt(np.einsum('pk,pk->p', offset[affected], offset[affected]))
+        for gap, speed, source_id, recipient in zip(distance.tolist(), closing[affected].tolist(),
+                                                    ids[source[affected]].tolist(), ids[n[affected]].tolist()):
+            alerts.setdefault(recipient, []).append(HazardAlert(
+                SUDDEN_STOP, recipient, source_id, gap / speed, gap, gap, gap / max(speed, 1.0)
+            ))
@@ -12,17 +12,28 @@ from .utils.logger import VehicleLogger
 from .utils.config_loader import load_config
 from .scenario_manager import ScenarioType, ScenarioConfig
 from .communication import Communication
+from .hazard_engine import HazardEngine
+from .trajectory_predictor import TrajectoryPredictor
 from .dashboard_app import DashboardApplication
+from .dashboard_process import DashboardProcess
 import keyboard
 import numpy as np
 import numpy.typing as npt
 from datetime import datetime
 from .utils.point_cloud_merger import PointCloudMerger
+from .utils.object_clustering import ObjectClusterer
+from .utils.voxel_world_map import VoxelWorldMap
+from .utils.spatial_index import SpatialIndex
+from .utils.sensor_decoder import POINT_CLOUD_SENSORS
+from .utils.fleet_state import build_kinematic_states, fan_out_other_vehicles
+from .utils.hazard_map import HazardTileMap, COLLISION, LANE_INVASION
+from .utils.traffic_flow import TrafficFlowAnalytics
+from .utils.blackbox_recorder import BlackBoxRecorder
 from .vehicle_controller import VehicleController
 
 @dataclass
 class SimulationConfig:
-    num_vehicles: int
+    num_vehicles: int  # sensor-equipped ego vehicles with dashboards
     tick_rate: float
     control_mode: str = "autopilot"  # Default to autopilot mode
     port: int = 2000
@@ -31,6 +42,8 @@ class SimulationConfig:
     weather: str = 'Clear'
     time_of_day: str = 'Noon'
     traffic_density: float = 0.5
+    batch_spawn: bool = False  # spawn vehicles and sensors with batched RPCs
+    num_background_vehicles: int = 0  # sensorless traffic manager vehicles, kinematics-only V2V
 
     @classmethod
     def from_dict(cls, config: Dict[str, Any]) -> 'SimulationConfig':
@@ -54,6 +67,8 @@ class SimulationConfig:
         """Validate configuration values"""
         if self.num_vehicles < 1:
             raise ValueError("num_vehicles must be at least 1")
+        if self.num_background_vehicles < 0:
+            raise ValueError("num_background_vehicles must not be negative")
         if not 0.016 <= self.tick_rate <= 0.1:
             raise ValueError("tick_rate must be between 0.016 and 0.1")
         if self.port < 0:
@@ -88,6 +103,10 @@ class SimulationManager:
         
         # Set up world settings
         self._setup_world()
+        snapshot = self.world.get_snapshot()
+        self.frame = snapshot.frame
+        # Simulation time of this episode; CARLA's frame counter runs on across episodes
+        self.sim_time = snapshot.timestamp.elapsed_seconds
         
         # Initialize components
         self._init_components()
@@ -100,8 +119,17 @@ class SimulationManager:
         # Register interrupt handler
         signal.signal(signal.SIGINT, self.signal_handler)
         
-        # Initialize dashboard
-        self.dashboard_app = DashboardApplication(self)
+        # Initialize dashboards, in their own process unless configured inline
+        dashboard_config = self.config.get('dashboard', {})
+        self.dashboard_app = None
+        self.dashboard_process = None
+        if dashboard_config.get('mode', 'process') == 'process':
+            self.dashboard_process = DashboardProcess.from_config(dashboard_config)
+        else:
+            self.dashboard_app = DashboardApplication(self, **{
+                k: v for k, v in dashboard_config.items()
+                if k in ('layout', 'grid_columns', 'background_hz', 'focus_vehicle')
+            })
 
     def _setup_world(self):
         """Configure world settings"""
@@ -112,10 +140,54 @@ class SimulationManager:
 
     def _init_components(self):
         """Initialize all component managers"""
+        self.carla_map = self.world.get_map()
         self.vehicle_manager = VehicleManager(self.world, self.client)
-        self.sensor_manager = SensorManager(self.world, self.config)
+        self.sensor_manager = SensorManager(self.world, self.config, self.client)
         self.communication = Communication()
+
+        # Share either compact object lists or raw semantic lidar points between vehicles
+        perception_config = self.config.get('perception', {})
+        share_objects = perception_config.get('share', 'objects') == 'objects'
+        self.object_clusterer = ObjectClusterer.from_config(perception_config) if share_objects else None
+        self.share_raw_points = not share_objects
         self.point_cloud_merger = PointCloudMerger(max_point_age=1.0)
+
+        voxel_config = self.config.get('voxel_map', {})
+        self.voxel_map = None
+        if voxel_config.get('enabled', False):
+            store_dir = os.path.normpath(os.path.join(
+                os.path.dirname(__file__), '..', voxel_config.get('directory', 'cache/voxel_map'),
+                os.path.basename(self.carla_map.name)
+            ))
+            self.voxel_map = VoxelWorldMap.from_config(store_dir, voxel_config)
+            self.voxel_map_sensor = voxel_config.get('sensor', 'lidar')
+
+        obstacle_config = self.config.get('obstacles', {})
+        self.obstacle_config = obstacle_config if obstacle_config.get('enabled', False) else None
+        self.obstacle_index: Optional[SpatialIndex] = None
+
+        hazard_config = self.config.get('hazards', {})
+        self.hazard_engine = (HazardEngine.from_config(hazard_config)
+                              if hazard_config.get('enabled', False) else None)
+        hazard_map_config = dict(self.config.get('hazard_map', {}))
+        self.corridor_width = hazard_map_config.pop('corridor_width', 10.0)
+        self.hazard_map = (HazardTileMap.from_config(hazard_map_config)
+                           if hazard_map_config.get('enabled', False) else None)
+        self._event_sequences: Dict[int, Dict[str, int]] = {}
+        flow_config = self.config.get('traffic_flow', {})
+        self.traffic_flow = (TrafficFlowAnalytics.from_config(self._resolve_segment, self.sim_config.tick_rate,
+                                                              flow_config)
+                             if flow_config.get('enabled', False) else None)
+        blackbox_config = self.config.get('blackbox', {})
+        self.blackbox = None
+        if blackbox_config.get('enabled', False):
+            blackbox_dir = os.path.normpath(os.path.join(
+                os.path.dirname(__file__), '..', blackbox_config.get('directory', 'logs/blackbox')
+            ))
+            self.blackbox = BlackBoxRecorder.from_config(blackbox_dir, self.sim_config.tick_rate, blackbox_config)
+        prediction_config = self.config.get('prediction', {})
+        self.trajectory_predictor = (TrajectoryPredictor.from_config(prediction_config)
+                                     if prediction_config.get('enabled', False) else None)
         
         if self.config['logging']['enabled']:
             self.vehicle_logger = VehicleLogger(self.config)
@@ -180,9 +252,10 @@ class SimulationManager:
             # Initialize vehicle controller
             self.vehicle_controller = VehicleController(self.world, self.vehicle_manager, self)
             
-            # Set initial autopilot state based on control mode
-            for vehicle in vehicles:
-                vehicle.set_autopilot(self.sim_config.control_mode == "autopilot")
+            # Set initial autopilot state based on control mode (the batched spawn already did)
+            if not self.sim_config.batch_spawn:
+                for vehicle in vehicles:
+                    vehicle.set_autopilot(self.sim_config.control_mode == "autopilot")
             
             # Create initial vehicle states and update dashboards
             initial_states = self._update_vehicle_states()
@@ -193,8 +266,11 @@ class SimulationManager:
             
             # Main simulation loop
             while self.running:
+                tick_start = time.perf_counter()
+
                 # Update world
-                self.world.tick()
+                self.frame = self.world.tick()
+                self.sim_time = self.world.get_snapshot().timestamp.elapsed_seconds
                 
                 # Update spectator camera
                 self._update_spectator()
@@ -206,9 +282,16 @@ class SimulationManager:
                 
                 # Update vehicle states and dashboards
                 vehicle_states = self._update_vehicle_states()
-                if self.dashboard_app:
-                    self.dashboard_app.update_dashboards()
+                if self.dashboard_process:
+                    # Never waits on rendering, the dashboards pick up the newest frame
+                    self.dashboard_process.publish(self.frame, vehicle_states)
+                    for seq_id in self.dashboard_process.poll_status():
+                        self._on_dashboard_closed(seq_id)
+                elif self.dashboard_app:
+                    self.dashboard_app.update_dashboards(vehicle_states)
                     self.dashboard_app.app.processEvents()
+
+                self._update_sensor_lod(vehicle_states, time.perf_counter() - tick_start)
             
             return True
             
@@ -220,16 +303,57 @@ class SimulationManager:
 
     def _init_vehicles(self):
         """Initialize vehicles and attach sensors"""
-        vehicles = self.vehicle_manager.spawn_vehicles(
-            self.sim_config.num_vehicles
-        )
+        start_time = time.perf_counter()
+        if self.sim_config.batch_spawn:
+            vehicles = self.vehicle_manager.spawn_vehicles_batch(
+                self.sim_config.num_vehicles,
+                autopilot=self.sim_config.control_mode == "autopilot"
+            )
+        else:
+            vehicles = self.vehicle_manager.spawn_vehicles(
+                self.sim_config.num_vehicles
+            )
+        spawn_time = time.perf_counter() - start_time
         
         if not vehicles:
             logging.error("Failed to spawn any vehicles")
             return []
         
-        for vehicle in vehicles:
-            self.sensor_manager.attach_sensors(vehicle)
+        if self.sim_config.batch_spawn:
+            num_sensors = self.sensor_manager.attach_sensors_batch([
+                (vehicle, self.vehicle_manager.get_sequential_id(vehicle.id))
+                for vehicle in vehicles
+            ])
+        else:
+            for vehicle in vehicles:
+                self.sensor_manager.attach_sensors(
+                    vehicle, self.vehicle_manager.get_sequential_id(vehicle.id)
+                )
+            num_sensors = sum(len(self.sensor_manager.sensors.get(v.id, [])) for v in vehicles)
+
+        if self.sim_config.num_background_vehicles:
+            background = self.vehicle_manager.spawn_background_vehicles(
+                self.sim_config.num_background_vehicles
+            )
+            logging.info(f"Spawned {len(background)} background vehicles")
+        total_time = time.perf_counter() - start_time
+
+        self.startup_stats = {
+            'num_vehicles': len(vehicles),
+            'num_sensors': num_sensors,
+            'num_background_vehicles': len(self.vehicle_manager.get_background_vehicles()),
+            'batched': self.sim_config.batch_spawn,
+            'vehicle_spawn_s': spawn_time,
+            'sensor_spawn_s': total_time - spawn_time,
+            'total_s': total_time,
+            'ms_per_vehicle': total_time / len(vehicles) * 1000
+        }
+        logging.info(
+            f"Startup: {len(vehicles)} vehicles, {num_sensors} sensors in {total_time:.2f}s "
+            f"(vehicles {spawn_time:.2f}s, sensors {total_time - spawn_time:.2f}s, "
+            f"{self.startup_stats['ms_per_vehicle']:.1f} ms/vehicle, "
+            f"{'batched' if self.sim_config.batch_spawn else 'sequential'})"
+        )
         return vehicles
 
     def _print_vehicle_controls(self):
@@ -262,24 +386,219 @@ class SimulationManager:
                 vehicle_states[seq_id] = state
                 other_vehicles_cache[seq_id] = state
         
+        # Background traffic only contributes kinematics
+        background_states = self._create_background_states()
+        other_vehicles_cache.update(background_states)
+        
         # Second pass: Update other_vehicles efficiently
+        fan_out_other_vehicles(vehicle_states, other_vehicles_cache)
+        if self.object_clusterer:
+            self._update_objects(vehicle_states)
         for state in vehicle_states.values():
-            state.other_vehicles = {
-                vid: vstate for vid, vstate in other_vehicles_cache.items() 
-                if vid != state.vehicle_id
-            }
-            
-            if self.point_cloud_merger:
+            if self.share_raw_points:
                 state.combined_point_cloud = self.point_cloud_merger.merge_point_clouds(
                     state, state.other_vehicles
                 )
+        if self.voxel_map:
+            self._update_voxel_map(vehicle_states)
+        if self.obstacle_config:
+            self._update_obstacles(vehicle_states)
+        
+        # Predictions and hazard alerts cover the whole fleet before egos are logged
+        prediction = None
+        if self.trajectory_predictor:
+            prediction = self.trajectory_predictor.update(
+                other_vehicles_cache, self.frame, self.sim_config.tick_rate
+            )
+            for seq_id, state in other_vehicles_cache.items():
+                state.predicted_trajectory = prediction.get(seq_id)
+
+        if self.hazard_engine:
+            alerts = self.hazard_engine.update(other_vehicles_cache, self.sim_config.tick_rate, prediction)
+            self.communication.publish_alerts(alerts)
+            for seq_id, state in vehicle_states.items():
+                state.hazard_alerts = alerts.get(seq_id, [])
+        if self.hazard_map or self.blackbox:
+            self._update_sensor_events(vehicle_states)
+        if self.hazard_map:
+            self._update_hazard_map(vehicle_states)
+        if self.traffic_flow:
+            self._update_traffic_flow(vehicle_states, other_vehicles_cache)
+        if self.blackbox:
+            self.blackbox.record(self.frame, self.sim_time, other_vehicles_cache, vehicle_states)
         
         # Batch process communications and logging
+        for state in background_states.values():
+            self.communication.broadcast_vehicle_state(state)
         if vehicle_states:
             self._batch_process_vehicle_states(vehicle_states)
         
         return vehicle_states
 
+    def _create_background_states(self) -> Dict[int, VehicleState]:
+        """Create kinematics-only states for background traffic from one world snapshot"""
+        background = self.vehicle_manager.get_background_vehicles()
+        if not background:
+            return {}
+
+        snapshot = self.world.get_snapshot()
+        seq_ids, kinematics = [], []
+        for seq_id, vehicle in background.items():
+            actor_snapshot = snapshot.find(vehicle.id)
+            if actor_snapshot is None:
+                continue
+            transform = actor_snapshot.get_transform()
+            velocity = actor_snapshot.get_velocity()
+            seq_ids.append(seq_id)
+            kinematics.append((
+                transform.location.x, transform.location.y, transform.location.z,
+                transform.rotation.pitch, transform.rotation.yaw, transform.rotation.roll,
+                velocity.x, velocity.y, velocity.z
+            ))
+
+        if not kinematics:
+            return {}
+        kinematics = np.asarray(kinematics, dtype=np.float64)
+        return build_kinematic_states(
+            seq_ids, kinematics[:, 0:3], kinematics[:, 3:6], kinematics[:, 6:9], datetime.now()
+        )
+
+    def _update_objects(self, vehicle_states: Dict[int, VehicleState]):
+        """Cluster each ego's semantic lidar frame and fuse the object lists shared over V2V"""
+        for state in vehicle_states.values():
+            cloud = state.point_cloud_cache.get('semantic_lidar')
+            if cloud is not None:
+                state.detected_objects = self.object_clusterer.cluster(cloud, state.transform_matrix)
+
+        fused = self.object_clusterer.fuse(state.detected_objects for state in vehicle_states.values())
+        for state in vehicle_states.values():
+            state.fused_objects = fused
+
+    def _update_voxel_map(self, vehicle_states: Dict[int, VehicleState]):
+        """Integrate each ego's newest world-frame cloud and page out tiles away from the fleet"""
+        for seq_id, state in vehicle_states.items():
+            cloud = self.point_cloud_merger.world_points(state, self.voxel_map_sensor)
+            if cloud is not None:
+                self.voxel_map.integrate(cloud.points, seq_id, cloud.frame)
+        self.voxel_map.evict(state.location for state in vehicle_states.values())
+
+    def _update_obstacles(self, vehicle_states: Dict[int, VehicleState]):
+        """Index this tick's fleet-wide cloud once and query the corridor ahead of every ego"""
+        config = self.obstacle_config
+        # In raw sharing mode every ego's combined cloud already holds the whole fleet's points
+        combined = next((s.combined_point_cloud for s in vehicle_states.values()
+                         if s.combined_point_cloud is not None), None)
+        if combined is not None:
+            points = combined.points
+        else:
+            parts = []
+            for state in vehicle_states.values():
+                cloud = self.point_cloud_merger.world_points(state, config.get('sensor', 'lidar'))
+                if cloud is not None:
+                    # world_points hands out a reused buffer, so keep a copy
+                    parts.append(cloud.points.copy())
+            points = np.concatenate(parts) if parts else np.empty((0, 3), dtype=np.float32)
+
+        self.obstacle_index = SpatialIndex(points, config.get('cell_size', 2.0))
+        for state in vehicle_states.values():
+            z = state.location[2]
+            state.obstacle_distance = self.obstacle_index.obstacle_distance_ahead(
+                state.location, state.rotation[1],
+                length=config.get('corridor_length', 50.0),
+                half_width=config.get('corridor_half_width', 1.2),
+                start=config.get('start_offset', 2.5),
+                z_range=(z + config.get('min_height', 0.3), z + config.get('max_height', 3.0))
+            )
+
+    def occupied_voxels_near(self, vehicle_id: int, radius: float = 50.0, min_count: int = 1):
+        """Voxel centres and hit counts from the world map within radius of a vehicle"""
+        state = self.communication.vehicle_states.get(vehicle_id)
+        if self.voxel_map is None or state is None:
+            return None
+        return self.voxel_map.occupied_within(state.location, radius, min_count)
+
+    def _update_sensor_events(self, vehicle_states: Dict[int, VehicleState]):
+        """Set each ego's collision and lane invasion events that fired since the last tick"""
+        vehicles = self.vehicle_manager.vehicles
+        for seq_id, state in vehicle_states.items():
+            if seq_id not in vehicles:
+                continue
+            # A new sequence number in an event sensor slot means it fired since the last tick
+            sequences = self.sensor_manager.get_sensor_sequences(vehicles[seq_id].id)
+            previous = self._event_sequences.get(seq_id, {})
+            state.sensor_events = [
+                kind for kind in (COLLISION, LANE_INVASION)
+                if sequences.get(kind, 0) > previous.get(kind, 0)
+            ]
+            self._event_sequences[seq_id] = sequences
+
+    def _update_hazard_map(self, vehicle_states: Dict[int, VehicleState]):
+        """Record new collision and lane invasion events and query each ego's route corridor"""
+        sim_time = self.sim_time
+        road_hazards = {}
+        for seq_id, state in vehicle_states.items():
+            for kind in state.sensor_events:
+                self.hazard_map.insert(kind, state.location[0], state.location[1], sim_time, seq_id)
+
+            path = [state.location[:2]]
+            if state.predicted_trajectory is not None:
+                path.extend(state.predicted_trajectory.tolist())
+            state.road_hazards = self.hazard_map.query_corridor(path, self.corridor_width, sim_time)
+            road_hazards[seq_id] = state.road_hazards
+
+        self.communication.publish_road_hazards(road_hazards)
+
+    def _resolve_segment(self, x: float, y: float, z: float):
+        """Road and lane id of the driving lane nearest to a world position"""
+        waypoint = self.carla_map.get_waypoint(carla.Location(x=x, y=y, z=z), project_to_road=True,
+                                               lane_type=carla.LaneType.Driving)
+        return (waypoint.road_id, waypoint.lane_id) if waypoint else None
+
+    def _update_traffic_flow(self, vehicle_states: Dict[int, VehicleState],
+                             all_states: Dict[int, VehicleState]):
+        """Add this tick's fleet positions to the segment analytics and attach each ego's segment flow"""
+        states = list(all_states.values())
+        self.traffic_flow.update(
+            list(all_states.keys()),
+            np.array([s.location for s in states], dtype=np.float64).reshape(-1, 3),
+            np.array([s.speed for s in states], dtype=np.float64)
+        )
+        for seq_id, state in vehicle_states.items():
+            state.traffic_flow = self.traffic_flow.vehicle_flow(seq_id)
+
+    def _update_sensor_lod(self, vehicle_states: Dict[int, VehicleState], tick_time: float):
+        """Feed tick timing, open dashboards and vehicle positions to the sensor LOD controller"""
+        if self.sensor_manager.lod_controller is None:
+            return
+
+        vehicles = self.vehicle_manager.vehicles
+        positions = {
+            vehicles[seq_id].id: state.location
+            for seq_id, state in vehicle_states.items() if seq_id in vehicles
+        }
+        if self.dashboard_process:
+            open_dashboards = self.dashboard_process.visible
+        else:
+            open_dashboards = self.dashboard_app.visible_vehicle_ids() if self.dashboard_app else []
+        watched = [vehicles[seq_id].id for seq_id in open_dashboards if seq_id in vehicles]
+        # Every ego sees the whole fleet, so one ego's view holds the background traffic as well
+        neighbours = []
+        if vehicle_states:
+            first = next(iter(vehicle_states.values()))
+            neighbours = [state.location for seq_id, state in first.other_vehicles.items()
+                          if seq_id not in vehicle_states]
+        self.sensor_manager.update_lod(tick_time, self.sim_config.tick_rate, watched, positions, neighbours)
+
+    def _on_dashboard_closed(self, seq_id: int):
+        """Stop following or controlling a vehicle whose dashboard was closed in the dashboard process"""
+        logging.info(f"Dashboard for vehicle {seq_id} closed")
+        if self.following_vehicle_id == seq_id:
+            self.following_vehicle_id = None
+        controller = getattr(self, 'vehicle_controller', None)
+        if (controller and controller.controlled_vehicle and
+                self.vehicle_manager.get_sequential_id(controller.controlled_vehicle.id) == seq_id):
+            controller.controlled_vehicle = None
+
     def _batch_process_vehicle_states(self, vehicle_states):
         """
         Process multiple vehicle states in batch for efficient communication and logging.
@@ -296,8 +615,7 @@ class SimulationManager:
             self.communication.broadcast_vehicle_state(state)
         
         if hasattr(self, 'vehicle_logger') and self.vehicle_logger:
-            for seq_id, state in messages:
-                self.vehicle_logger.log_vehicle_data(seq_id, state, state.other_vehicles)
+            self.vehicle_logger.log_frame(self.frame, vehicle_states)
 
     def _create_vehicle_state(self, vehicle: carla.Vehicle, seq_id: int, 
                             transform: Optional[carla.Transform] = None) -> VehicleState:
@@ -330,7 +648,8 @@ class SimulationManager:
             sensor_data=sensor_data,
             other_vehicles={},
             transform_matrix=transform_matrix,
-            point_cloud_cache=point_cloud_cache
+            point_cloud_cache=point_cloud_cache,
+            sensor_lod=self.sensor_manager.get_sensor_lod(vehicle.id)
         )
 
     def _get_rotation_matrix(self, rotation: carla.Rotation) -> npt.NDArray[np.float32]:
@@ -360,50 +679,21 @@ class SimulationManager:
         return R_yaw @ R_pitch @ R_roll
 
     def _process_point_clouds(self, vehicle_id: int, sensor_data: dict) -> dict:
-        """Process point cloud data from sensors"""
-        point_cloud_cache = {}
-        
-        # Process each sensor that provides point cloud data
-        for sensor_type, data in sensor_data.items():
-            if sensor_type in ['lidar', 'semantic_lidar']:
-                if data is not None and hasattr(data, 'raw_data'):
-                    # Convert raw data to point cloud format
-                    point_cloud = self._convert_point_cloud_data(
-                        data.raw_data,
-                        vehicle_id,
-                        sensor_type
-                    )
-                    point_cloud_cache[sensor_type] = point_cloud
-        
-        return point_cloud_cache
-
-    def _convert_point_cloud_data(self, raw_data, vehicle_id: int, sensor_type: str) -> PointCloudData:
-        """Convert raw sensor data to point cloud format"""
-        # Convert raw data to numpy array
-        data_array = np.frombuffer(raw_data, dtype=np.float32).reshape([-1, 4])
-        
-        # Extract points (x, y, z)
-        points = data_array[:, :3]
-        
-        # Create timestamps array
-        timestamps = np.full(len(points), time.time(), dtype=np.float32)
-        
-        # Extract tags for semantic lidar, None for regular lidar
-        tags = data_array[:, 3].astype(np.int32) if sensor_type == 'semantic_lidar' else None
-        
-        return PointCloudData(
-            points=points,
-            timestamps=timestamps,
-            tags=tags,
-            source_vehicle=vehicle_id
-        )
+        """Collect decoded point clouds from sensor data"""
+        return {
+            sensor_type: data
+            for sensor_type, data in sensor_data.items()
+            if sensor_type in POINT_CLOUD_SENSORS and isinstance(data, PointCloudData)
+        }
 
     def cleanup(self):
         """Cleanup simulation resources"""
         try:
             # First cleanup dashboard
-            if hasattr(self, 'dashboard_app') and self.dashboard_app:
+            if getattr(self, 'dashboard_app', None):
                 self.dashboard_app.cleanup()
+            if getattr(self, 'dashboard_process', None):
+                self.dashboard_process.close()
             
             # Then cleanup other components
             if hasattr(self, 'sensor_manager'):
@@ -414,6 +704,14 @@ class SimulationManager:
             
             if hasattr(self, 'vehicle_logger'):
                 self.vehicle_logger.cleanup()
+
+            # Save a capture still waiting for its post-trigger window
+            if getattr(self, 'blackbox', None):
+                self.blackbox.close()
+            
+            # Persist the voxel map so the next run starts from it
+            if getattr(self, 'voxel_map', None):
+                self.voxel_map.close()
             
             # Reset world settings
             if hasattr(self, 'world'):
@@ -1,10 +1,12 @@
 import carla
+import os
 import random
-from typing import List, Dict
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
 import logging
+from .utils.map_topology_cache import MapTopologyCache, MapTopology
 
 class ScenarioType(Enum):
     URBAN_DRIVING = "urban_driving"
@@ -22,11 +24,16 @@ class ScenarioConfig:
     traffic_density: float  # 0.0 to 1.0
 
 class ScenarioManager:
-    def __init__(self, world: carla.World, vehicle_manager, sensor_manager):
+    def __init__(self, world: carla.World, vehicle_manager, sensor_manager,
+                 cache_dir: Optional[str] = None):
         self.world = world
         self.vehicle_manager = vehicle_manager
         self.sensor_manager = sensor_manager
         self.active_scenario = None
+        self.topology_cache = MapTopologyCache(cache_dir or os.path.join(
+            os.path.dirname(__file__), '..', 'cache', 'maps'
+        ))
+        self._map: Optional[carla.Map] = None
         
         # Define weather presets
         self.weather_presets = {
@@ -54,10 +61,10 @@ class ScenarioManager:
         
     def _setup_urban_scenario(self, config: ScenarioConfig):
         """Setup an urban driving scenario with optimized spawning"""
-        # Pre-filter spawn points once
-        spawn_points = np.array(self.world.get_map().get_spawn_points())
-        urban_mask = np.array([self._is_urban_location(p) for p in spawn_points])
-        urban_points = spawn_points[urban_mask]
+        # Spawn point classification comes from the per-map topology cache
+        spawn_points = self._get_map().get_spawn_points()
+        urban_mask = self.get_topology().urban_spawn_mask
+        urban_points = [point for point, urban in zip(spawn_points, urban_mask) if urban]
         
         if len(urban_points) < config.num_vehicles:
             logging.warning(f"Only {len(urban_points)} urban spawn points available for {config.num_vehicles} vehicles")
@@ -71,7 +78,7 @@ class ScenarioManager:
         # Batch configure traffic manager
         tm = self.vehicle_manager.traffic_manager
         tm.global_percentage_speed_difference(10.0)
-        tm.global_distance_to_leading_vehicle(5.0)
+        tm.set_global_distance_to_leading_vehicle(5.0)
         
         # Only set individual parameters when needed
         for vehicle in vehicles:
@@ -79,15 +86,13 @@ class ScenarioManager:
     
     def _setup_highway_scenario(self, config: ScenarioConfig):
         """Setup a highway scenario with optimized spawning"""
-        spawn_points = self.world.get_map().get_spawn_points()
-        
         # Batch spawn vehicles
         vehicles = self.vehicle_manager.spawn_vehicles(config.num_vehicles)
         
         # Batch configure traffic manager
         tm = self.vehicle_manager.traffic_manager
         tm.global_percentage_speed_difference(-10.0)
-        tm.global_distance_to_leading_vehicle(10.0)
+        tm.set_global_distance_to_leading_vehicle(10.0)
         
         # Only set individual parameters when needed
         for vehicle in vehicles:
@@ -108,16 +113,22 @@ class ScenarioManager:
             tm.distance_to_leading_vehicle(vehicle, 3.0)
             tm.set_desired_speed(vehicle, 20.0)
     
-    def _is_urban_location(self, transform: carla.Transform) -> bool:
-        """Check if a location is in an urban area"""
-        # This is a simple implementation - could be made more sophisticated
-        waypoint = self.world.get_map().get_waypoint(transform.location)
-        return waypoint.lane_type == carla.LaneType.Driving and waypoint.road_id < 100
-    
+    def _get_map(self) -> carla.Map:
+        """Fetch the OpenDRIVE map once per scenario manager"""
+        if self._map is None:
+            self._map = self.world.get_map()
+        return self._map
+
+    def get_topology(self) -> MapTopology:
+        """Get cached spawn point classification and junction waypoints for the current map"""
+        return self.topology_cache.get(self._get_map())
+
     def _find_intersections(self) -> List[carla.Transform]:
         """Find intersection points in the map"""
-        waypoints = self.world.get_map().generate_waypoints(2.0)
-        return [w.transform for w in waypoints if w.is_intersection]
+        return [
+            carla.Transform(carla.Location(x=x, y=y, z=z), carla.Rotation(pitch=pitch, yaw=yaw, roll=roll))
+            for x, y, z, pitch, yaw, roll in self.get_topology().intersections.tolist()
+        ]
     
     def cleanup_scenario(self):
         """Clean up the current scenario"""
@@ -1,10 +1,11 @@
 import carla
 import logging
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
-from queue import Queue
-from threading import Lock
 import weakref
+from .utils.sensor_slot import SensorSlot
+from .utils.sensor_decoder import decode_sensor_data
+from .utils.sensor_lod import LidarLODController
 
 @dataclass
 class SensorConfig:
@@ -14,16 +15,26 @@ class SensorConfig:
     transform: carla.Transform = carla.Transform()
 
 class SensorManager:
-    def __init__(self, world: carla.World, config: Dict):
+    def __init__(self, world: carla.World, config: Dict, client: Optional[carla.Client] = None):
         self.world = world
+        self.client = client
         self.blueprint_library = world.get_blueprint_library()
         self.sensors: Dict[int, List[carla.Sensor]] = {}
-        self.sensor_data: Dict[int, Dict[str, Queue]] = {}
-        self._data_locks: Dict[int, Lock] = {}
-        self.max_queue_size = 10
+        self.sensor_data: Dict[int, Dict[str, SensorSlot]] = {}
+        self._vehicles: Dict[int, carla.Vehicle] = {}
+        self._sensors_by_type: Dict[int, Dict[str, carla.Sensor]] = {}
+        self._frame_skip: Dict[int, int] = {}
+        self._source_ids: Dict[int, int] = {}
+        self._decoded_cache: Dict[int, Dict[str, Tuple[int, Any]]] = {}
+        # Decode measurements on the CARLA callback threads instead of the tick loop
+        self.eager_decode = bool(config['sensors'].get('eager_decode', False))
         
         self.sensor_configs = self._parse_sensor_configs(config['sensors'])
 
+        lod_config = config['sensors']['lidar'].get('lod', {})
+        self.lod_controller = (LidarLODController.from_config(config['sensors']['lidar'])
+                               if lod_config.get('enabled', False) else None)
+
     def _parse_sensor_configs(self, config: Dict) -> Dict[str, SensorConfig]:
         """Parse sensor configurations from config file"""
         sensor_types = {
@@ -40,6 +51,13 @@ class SensorManager:
                 'rotation_frequency': str(config['lidar']['rotation_frequency']),
                 'channels': str(config['lidar']['channels']),
                 'range': str(config['lidar']['range'])
+            }),
+            'semantic_lidar': ('sensor.lidar.ray_cast_semantic', {
+                'points_per_second': str(config['semantic_lidar']['points_per_second']),
+                'rotation_frequency': str(config['semantic_lidar'].get(
+                    'rotation_frequency', config['lidar']['rotation_frequency'])),
+                'channels': str(config['semantic_lidar']['channels']),
+                'range': str(config['semantic_lidar']['range'])
             })
         }
         
@@ -52,14 +70,12 @@ class SensorManager:
             for sensor_type, (blueprint_id, attributes) in sensor_types.items()
         }
 
-    def attach_sensors(self, vehicle: carla.Vehicle) -> None:
-        """Attach configured sensors to vehicle"""
+    def attach_sensors(self, vehicle: carla.Vehicle, source_id: Optional[int] = None) -> None:
+        """Attach configured sensors to vehicle, tagging decoded data with source_id"""
         if vehicle.id in self.sensors:
             return
 
-        self.sensors[vehicle.id] = []
-        self._data_locks[vehicle.id] = Lock()
-        self.sensor_data[vehicle.id] = {}
+        self._register_vehicle(vehicle, source_id)
 
         for sensor_type, config in self.sensor_configs.items():
             if not config.enabled:
@@ -69,61 +85,231 @@ class SensorManager:
                 sensor = self._spawn_sensor(vehicle, config)
                 if sensor:
                     self.sensors[vehicle.id].append(sensor)
+                    self._sensors_by_type[vehicle.id][sensor_type] = sensor
                     self._setup_sensor_callback(sensor, vehicle.id, sensor_type)
             except Exception as e:
                 logging.error(f"Failed to attach {sensor_type} to vehicle {vehicle.id}: {e}")
 
-    def _spawn_sensor(self, vehicle: carla.Vehicle, config: SensorConfig) -> Optional[carla.Sensor]:
+    def attach_sensors_batch(self, vehicles: List[Tuple[carla.Vehicle, Optional[int]]]) -> int:
+        """Attach configured sensors to many vehicles with a single batched RPC
+
+        Takes (vehicle, source_id) pairs and returns the number of sensors attached.
+        Falls back to per-vehicle spawning when no client is available.
+        """
+        vehicles = [(vehicle, source_id) for vehicle, source_id in vehicles if vehicle.id not in self.sensors]
+        if self.client is None:
+            for vehicle, source_id in vehicles:
+                self.attach_sensors(vehicle, source_id)
+            return sum(len(self.sensors.get(vehicle.id, [])) for vehicle, _ in vehicles)
+
+        requests = []
+        batch = []
+        for vehicle, source_id in vehicles:
+            self._register_vehicle(vehicle, source_id)
+            for sensor_type, config in self.sensor_configs.items():
+                if not config.enabled:
+                    continue
+                try:
+                    bp = self._make_blueprint(config)
+                except Exception as e:
+                    logging.error(f"Error creating sensor {config.type}: {e}")
+                    continue
+                requests.append((vehicle.id, sensor_type))
+                batch.append(carla.command.SpawnActor(bp, config.transform, vehicle.id))
+
+        if not batch:
+            return 0
+
+        do_tick = self.world.get_settings().synchronous_mode
+        spawned = []
+        for (vehicle_id, sensor_type), response in zip(requests, self.client.apply_batch_sync(batch, do_tick)):
+            if response.error:
+                logging.error(f"Failed to attach {sensor_type} to vehicle {vehicle_id}: {response.error}")
+            else:
+                spawned.append((vehicle_id, sensor_type, response.actor_id))
+
+        actors = {actor.id: actor for actor in self.world.get_actors([actor_id for _, _, actor_id in spawned])}
+        attached = 0
+        for vehicle_id, sensor_type, actor_id in spawned:
+            sensor = actors.get(actor_id)
+            if sensor is None:
+                continue
+            self.sensors[vehicle_id].append(sensor)
+            self._sensors_by_type[vehicle_id][sensor_type] = sensor
+            self._setup_sensor_callback(sensor, vehicle_id, sensor_type)
+            attached += 1
+        return attached
+
+    def _register_vehicle(self, vehicle: carla.Vehicle, source_id: Optional[int]) -> None:
+        """Create the per-vehicle bookkeeping for a vehicle about to get sensors"""
+        self.sensors[vehicle.id] = []
+        self.sensor_data[vehicle.id] = {}
+        self._vehicles[vehicle.id] = vehicle
+        self._sensors_by_type[vehicle.id] = {}
+        self._decoded_cache[vehicle.id] = {}
+        self._source_ids[vehicle.id] = source_id if source_id is not None else vehicle.id
+
+    def _make_blueprint(self, config: SensorConfig,
+                        overrides: Optional[Dict[str, str]] = None) -> carla.ActorBlueprint:
+        """Build a sensor blueprint with configured attributes"""
+        bp = self.blueprint_library.find(config.type)
+        for attr, value in {**config.attributes, **(overrides or {})}.items():
+            bp.set_attribute(attr, value)
+        return bp
+
+    def _spawn_sensor(self, vehicle: carla.Vehicle, config: SensorConfig,
+                      overrides: Optional[Dict[str, str]] = None) -> Optional[carla.Sensor]:
         """Spawn a sensor with given configuration"""
         try:
-            bp = self.blueprint_library.find(config.type)
-            for attr, value in config.attributes.items():
-                bp.set_attribute(attr, value)
+            bp = self._make_blueprint(config, overrides)
             return self.world.spawn_actor(bp, config.transform, attach_to=vehicle)
         except Exception as e:
             logging.error(f"Error spawning sensor {config.type}: {e}")
             return None
 
     def _setup_sensor_callback(self, sensor: carla.Sensor, vehicle_id: int, sensor_type: str) -> None:
-        """Setup sensor data callback with thread safety"""
+        """Setup sensor data callback publishing into a lock-free latest-value slot"""
         if vehicle_id not in self.sensor_data:
             self.sensor_data[vehicle_id] = {}
         if sensor_type not in self.sensor_data[vehicle_id]:
-            self.sensor_data[vehicle_id][sensor_type] = Queue(maxsize=self.max_queue_size)
+            self.sensor_data[vehicle_id][sensor_type] = SensorSlot()
+
+        # Bind the slot directly so the callback never touches shared dicts
+        slot = self.sensor_data[vehicle_id][sensor_type]
+        if self.eager_decode:
+            source_id = self._source_ids.get(vehicle_id, vehicle_id)
+
+            def publish(data):
+                try:
+                    slot.publish(decode_sensor_data(sensor_type, data, source_id))
+                except Exception as e:
+                    logging.error(f"Error decoding {sensor_type} data for vehicle {vehicle_id}: {e}")
+        else:
+            publish = slot.publish
+
+        if sensor_type != 'lidar' or self.lod_controller is None:
+            sensor.listen(publish)
+            return
+
+        # Drop lidar frames according to the vehicle's current level of detail
+        frames = [0]
 
         def callback(data):
-            with self._data_locks[vehicle_id]:
-                queue = self.sensor_data[vehicle_id][sensor_type]
-                if queue.full():
-                    queue.get()
-                queue.put(data)
+            frames[0] += 1
+            if frames[0] % (self._frame_skip.get(vehicle_id, 0) + 1) == 0:
+                publish(data)
 
         sensor.listen(callback)
 
+    def update_lod(self, tick_time: float, tick_budget: float, watched_ids: List[int],
+                   positions: Dict[int, Tuple[float, float, float]],
+                   neighbours: Optional[List[Tuple[float, float, float]]] = None) -> None:
+        """Adapt lidar level of detail per vehicle (ids are CARLA actor ids)
+
+        Only vehicles with a lidar get a level; the others among positions and
+        the neighbours (background traffic) still count for proximity.
+        """
+        if self.lod_controller is None:
+            return
+
+        tracked = {vid: loc for vid, loc in positions.items() if 'lidar' in self._sensors_by_type.get(vid, {})}
+        others = [loc for vid, loc in positions.items() if vid not in tracked] + list(neighbours or [])
+        for change in self.lod_controller.update(tick_time, tick_budget, watched_ids, tracked, others):
+            self._apply_lidar_level(change.vehicle_id, change.old_level, change.new_level, change.reason)
+
+    def _apply_lidar_level(self, vehicle_id: int, old_level: int, new_level: int, reason: str) -> None:
+        """Switch a vehicle's lidar to another level, respawning it only if the resolution changes"""
+        levels = self.lod_controller.levels
+        old, new = levels[old_level], levels[new_level]
+
+        if not old.same_resolution(new):
+            sensor = self._spawn_sensor(self._vehicles[vehicle_id], self.sensor_configs['lidar'], {
+                'points_per_second': str(new.points_per_second),
+                'channels': str(new.channels)
+            })
+            if sensor is None:
+                # Keep the controller in sync with the sensor that is actually running
+                self.lod_controller.vehicle_levels[vehicle_id] = old_level
+                return
+
+            old_sensor = self._sensors_by_type[vehicle_id]['lidar']
+            try:
+                old_sensor.stop()
+                old_sensor.destroy()
+            except Exception as e:
+                logging.error(f"Error destroying lidar of vehicle {vehicle_id}: {e}")
+            self.sensors[vehicle_id] = [sensor if s is old_sensor else s for s in self.sensors[vehicle_id]]
+            self._sensors_by_type[vehicle_id]['lidar'] = sensor
+            self._setup_sensor_callback(sensor, vehicle_id, 'lidar')
+
+        self._frame_skip[vehicle_id] = new.frame_skip
+        logging.info(
+            f"Lidar LOD vehicle {self._source_ids.get(vehicle_id, vehicle_id)}: level {old_level} -> {new_level} "
+            f"({new.points_per_second} pts/s, {new.channels} channels, 1 of every {new.frame_skip + 1} frames, "
+            f"{new.effective_points_per_second:.0f} effective pts/s) - {reason}"
+        )
+
+    def get_sensor_lod(self, vehicle_id: int) -> Dict[str, Dict]:
+        """Get the effective sensor resolution currently in use for a vehicle"""
+        if self.lod_controller is None or 'lidar' not in self._sensors_by_type.get(vehicle_id, {}):
+            return {}
+        level = self.lod_controller.vehicle_levels.get(vehicle_id, 0)
+        return {'lidar': self.lod_controller.level_info(level)}
+
     def get_sensor_data(self, vehicle_id: int) -> Dict:
-        """Get latest sensor data for vehicle"""
-        if vehicle_id not in self.sensor_data:
+        """Get latest decoded sensor data for vehicle without blocking on sensor callbacks"""
+        slots = self.sensor_data.get(vehicle_id)
+        if not slots:
             return {}
 
-        with self._data_locks[vehicle_id]:
-            return {
-                sensor_type: queue.queue[-1]
-                for sensor_type, queue in self.sensor_data[vehicle_id].items()
-                if not queue.empty()
-            }
+        latest = {}
+        for sensor_type, slot in list(slots.items()):
+            seq, data = slot.read()
+            if not seq:
+                continue
+            if not self.eager_decode:
+                data = self._decode_once(vehicle_id, sensor_type, seq, data)
+            if data is not None:
+                latest[sensor_type] = data
+        return latest
+
+    def _decode_once(self, vehicle_id: int, sensor_type: str, seq: int, data) -> Any:
+        """Decode a measurement on the calling thread, reusing the result until a new one arrives"""
+        cache = self._decoded_cache.setdefault(vehicle_id, {})
+        cached = cache.get(sensor_type)
+        if cached and cached[0] == seq:
+            return cached[1]
+
+        try:
+            decoded = decode_sensor_data(sensor_type, data, self._source_ids.get(vehicle_id, vehicle_id))
+        except Exception as e:
+            logging.error(f"Error decoding {sensor_type} data for vehicle {vehicle_id}: {e}")
+            decoded = None
+        cache[sensor_type] = (seq, decoded)
+        return decoded
+
+    def get_sensor_sequences(self, vehicle_id: int) -> Dict[str, int]:
+        """Get sequence number of the latest measurement per sensor (0 if none received yet)"""
+        slots = self.sensor_data.get(vehicle_id)
+        if not slots:
+            return {}
+        return {sensor_type: slot.sequence for sensor_type, slot in list(slots.items())}
 
     def cleanup(self) -> None:
         """Cleanup all sensors safely"""
         for vehicle_id in list(self.sensors.keys()):
-            with self._data_locks[vehicle_id]:
-                for sensor in self.sensors[vehicle_id]:
-                    if sensor and sensor.is_alive:
-                        try:
-                            sensor.stop()
-                            sensor.destroy()
-                        except Exception as e:
-                            logging.error(f"Error destroying sensor: {e}")
+            for sensor in self.sensors[vehicle_id]:
+                if sensor and sensor.is_alive:
+                    try:
+                        sensor.stop()
+                        sensor.destroy()
+                    except Exception as e:
+                        logging.error(f"Error destroying sensor: {e}")
         
         self.sensors.clear()
         self.sensor_data.clear()
-        self._data_locks.clear()
+        self._vehicles.clear()
+        self._sensors_by_type.clear()
+        self._frame_skip.clear()
+        self._decoded_cache.clear()
+        self._source_ids.clear()
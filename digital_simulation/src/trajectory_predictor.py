@@ -0,0 +1,146 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import numpy as np
+import numpy.typing as npt
+from .data_structures import VehicleState
+
+
+@dataclass
+class TrajectoryPrediction:
+    frame: int
+    vehicle_ids: npt.NDArray[np.int64]  # N ids, in fleet dict order
+    times: npt.NDArray[np.float32]  # K step times in seconds from now
+    trajectories: npt.NDArray[np.float32]  # NxKx2 predicted (x, y) positions
+    rows: Dict[int, int]  # vehicle_id -> row in trajectories
+
+    def get(self, vehicle_id: int) -> Optional[npt.NDArray[np.float32]]:
+        """Kx2 trajectory for one vehicle, None if it was not predicted"""
+        row = self.rows.get(vehicle_id)
+        return None if row is None else self.trajectories[row]
+
+
+def imu_yaw_rate(sensor_data: Dict[str, Any]) -> Optional[float]:
+    """Yaw rate in rad/s from decoded or raw IMU data, None if unavailable"""
+    imu = sensor_data.get('imu')
+    if imu is None:
+        return None
+    if isinstance(imu, dict):
+        gyroscope = imu.get('gyroscope')
+        return None if gyroscope is None else float(gyroscope.get('z', 0.0))
+    return float(imu.gyroscope.z)
+
+
+def predict_ctrv(positions: npt.NDArray, velocities: npt.NDArray, yaw_rates: npt.NDArray,
+                 times: npt.NDArray[np.float32], min_yaw_rate: float = 1e-3) -> npt.NDArray[np.float32]:
+    """Roll out constant turn rate and velocity motion for all vehicles at once
+
+    Vehicles turning slower than min_yaw_rate fall back to constant velocity,
+    which is also the limit of the CTRV model as the yaw rate goes to zero.
+    Returns an NxKx2 float32 array.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    velocities = np.asarray(velocities, dtype=np.float32)
+    yaw_rates = np.asarray(yaw_rates, dtype=np.float32)
+    n, k = len(positions), len(times)
+    out = np.empty((n, k, 2), dtype=np.float32)
+    if n == 0:
+        return out
+
+    # Constant velocity for everything, then overwrite the turning rows
+    out[:, :, 0] = positions[:, 0:1] + velocities[:, 0:1] * times
+    out[:, :, 1] = positions[:, 1:2] + velocities[:, 1:2] * times
+
+    turning = np.flatnonzero(np.abs(yaw_rates) >= min_yaw_rate)
+    if len(turning):
+        vx, vy = velocities[turning, 0:1], velocities[turning, 1:2]
+        omega = yaw_rates[turning, None]
+        speed = np.sqrt(vx * vx + vy * vy)
+        heading = np.arctan2(vy, vx)
+        phase = heading + omega * times
+        radius = speed / omega
+        out[turning, :, 0] = positions[turning, 0:1] + radius * (np.sin(phase) - np.sin(heading))
+        out[turning, :, 1] = positions[turning, 1:2] + radius * (np.cos(heading) - np.cos(phase))
+    return out
+
+
+class TrajectoryPredictor:
+    """Fleet-wide trajectory rollout, computed once per simulator frame"""
+
+    def __init__(self, steps: int = 40, step_time: float = 0.1, min_yaw_rate: float = 1e-3,
+                 budget_ms: float = 1.0):
+        if steps < 1 or step_time <= 0:
+            raise ValueError("Trajectory prediction needs at least one step of positive length")
+        self.steps = steps
+        self.step_time = step_time
+        self.min_yaw_rate = min_yaw_rate
+        self.budget_ms = budget_ms
+        self.times = (np.arange(1, steps + 1, dtype=np.float32) * np.float32(step_time))
+
+        self.last_update_ms = 0.0
+        self.over_budget_count = 0
+        self._prediction: Optional[TrajectoryPrediction] = None
+        self._previous_yaw: Dict[int, float] = {}
+        self._previous_frame: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'TrajectoryPredictor':
+        return cls(**{k: v for k, v in config.items() if k != 'enabled'})
+
+    @property
+    def horizon(self) -> float:
+        return float(self.times[-1])
+
+    @property
+    def prediction(self) -> Optional[TrajectoryPrediction]:
+        return self._prediction
+
+    def update(self, states: Dict[int, VehicleState], frame: int, dt: float) -> TrajectoryPrediction:
+        """Predict trajectories for every vehicle in states, reusing the result within a frame"""
+        if self._prediction is not None and self._prediction.frame == frame:
+            return self._prediction
+
+        start_time = time.perf_counter()
+        n = len(states)
+        values = list(states.values())
+        ids = np.fromiter(states.keys(), dtype=np.int64, count=n)
+        positions = np.array([s.location for s in values], dtype=np.float32).reshape(n, -1)[:, :2]
+        velocities = np.array([s.velocity for s in values], dtype=np.float32).reshape(n, -1)[:, :2]
+        yaw_rates = self._yaw_rates(ids, values, frame, dt)
+
+        trajectories = predict_ctrv(positions, velocities, yaw_rates, self.times, self.min_yaw_rate)
+        self._prediction = TrajectoryPrediction(
+            frame=frame,
+            vehicle_ids=ids,
+            times=self.times,
+            trajectories=trajectories,
+            rows=dict(zip(ids.tolist(), range(n)))
+        )
+
+        self.last_update_ms = (time.perf_counter() - start_time) * 1000
+        if self.last_update_ms > self.budget_ms:
+            self.over_budget_count += 1
+            if self.over_budget_count % 100 == 1:
+                logging.warning(f"Trajectory prediction took {self.last_update_ms:.2f} ms for {n} vehicles "
+                                f"(budget {self.budget_ms} ms)")
+        return self._prediction
+
+    def _yaw_rates(self, ids, values, frame: int, dt: float) -> npt.NDArray[np.float32]:
+        """IMU gyroscope yaw rate, or the yaw change since the previous frame for sensorless vehicles"""
+        yaws = np.radians(np.array([s.rotation[1] for s in values], dtype=np.float64))
+        imu_rates = [imu_yaw_rate(s.sensor_data) if s.sensor_data else None for s in values]
+        missing = np.array([rate is None for rate in imu_rates], dtype=bool)
+        yaw_rates = np.array([rate or 0.0 for rate in imu_rates], dtype=np.float32)
+
+        elapsed = dt * (frame - self._previous_frame) if self._previous_frame is not None else 0.0
+        if elapsed > 0 and missing.any():
+            rows = np.flatnonzero(missing)
+            previous = np.array([self._previous_yaw.get(vid, np.nan) for vid in ids[rows].tolist()])
+            # Wrap to [-pi, pi) so crossing +-180 degrees is not read as a spin
+            change = (yaws[rows] - previous + np.pi) % (2 * np.pi) - np.pi
+            yaw_rates[rows] = np.nan_to_num(change / elapsed)
+
+        self._previous_yaw = dict(zip(ids.tolist(), yaws.tolist()))
+        self._previous_frame = frame
+        return yaw_rates
@@ -0,0 +1,257 @@
+import json
+import logging
+import math
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import numpy as np
+import numpy.typing as npt
+from ..data_structures import VehicleState
+from .hazard_map import COLLISION, LANE_INVASION
+
+HARD_BRAKE = 'hard_brake'
+
+# Per-vehicle columns kept for every tick: x, y, z, pitch, yaw, roll, vx, vy, vz, speed
+KINEMATICS = ('x', 'y', 'z', 'pitch', 'yaw', 'roll', 'vx', 'vy', 'vz', 'speed')
+
+# Queue item that tells the writer thread to exit
+_STOP = object()
+
+
+@dataclass
+class Trigger:
+    kind: str  # COLLISION, LANE_INVASION or HARD_BRAKE
+    vehicle_id: int
+    frame: int
+    time: float  # simulation time in seconds
+    value: Optional[float] = None  # deceleration in m/s^2 for hard braking
+
+
+@dataclass
+class _Capture:
+    start_tick: int
+    end_tick: int
+    triggers: List[Trigger] = field(default_factory=list)
+
+
+def imu_longitudinal_acceleration(sensor_data: Dict[str, Any]) -> Optional[float]:
+    """Forward acceleration in m/s^2 from decoded or raw IMU data, None if unavailable"""
+    imu = sensor_data.get('imu')
+    if imu is None:
+        return None
+    if isinstance(imu, dict):
+        accelerometer = imu.get('accelerometer')
+        return None if accelerometer is None else float(accelerometer.get('x', 0.0))
+    return float(imu.accelerometer.x)
+
+
+class BlackBoxRecorder:
+    """Keeps the last seconds of fleet state in fixed-size ring buffers and saves them around events
+
+    Every tick stores the kinematics of up to max_vehicles vehicles and a
+    decimated lidar cloud of up to max_clouds egos. A collision, lane
+    invasion or hard braking event opens a capture of pre_seconds before and
+    post_seconds after the trigger; once the post-trigger window has been
+    recorded it is copied out and written to an .npz file by a background
+    thread. Memory use is fixed when the recorder is created.
+    """
+
+    def __init__(self, directory: str, tick_rate: float, pre_seconds: float = 10.0, post_seconds: float = 5.0,
+                 max_vehicles: int = 128, max_clouds: int = 16, cloud_points: int = 1024,
+                 cloud_sensor: str = 'lidar', hard_brake_deceleration: float = 6.0,
+                 hard_brake_seconds: float = 0.1, cooldown_seconds: float = 5.0, max_pending_writes: int = 4):
+        self.directory = directory
+        self.tick_rate = tick_rate
+        self.pre_ticks = max(1, int(round(pre_seconds / tick_rate)))
+        self.post_ticks = max(0, int(round(post_seconds / tick_rate)))
+        self.window = self.pre_ticks + self.post_ticks + 1
+        self.max_vehicles = max_vehicles
+        self.max_clouds = max_clouds
+        self.cloud_points = cloud_points
+        self.cloud_sensor = cloud_sensor
+        self.hard_brake_deceleration = hard_brake_deceleration
+        self.hard_brake_ticks = max(1, int(round(hard_brake_seconds / tick_rate)))
+        self.cooldown_ticks = int(round(cooldown_seconds / tick_rate))
+
+        w = self.window
+        self._frames = np.full(w, -1, dtype=np.int64)
+        self._times = np.zeros(w, dtype=np.float64)
+        self._ids = np.full((w, max_vehicles), -1, dtype=np.int32)
+        self._kinematics = np.zeros((w, max_vehicles, len(KINEMATICS)), dtype=np.float32)
+        # Sensor-frame points in float16, a few cm of error at lidar range
+        self._clouds = np.zeros((w, max_clouds, cloud_points, 3), dtype=np.float16)
+        self._cloud_counts = np.zeros((w, max_clouds), dtype=np.int32)
+        self._cloud_slots: Dict[int, int] = {}  # vehicle_id -> cloud slot
+
+        self.tick = 0
+        self.captures_written = 0
+        self.captures_dropped = 0
+        self._capture: Optional[_Capture] = None
+        self._last_trigger: Dict[tuple, int] = {}  # (vehicle_id, kind) -> tick
+        self._previous_speeds: Dict[int, float] = {}
+        self._braking_ticks: Dict[int, int] = {}  # consecutive ticks above the hard brake deceleration
+
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_pending_writes)
+        self._thread = threading.Thread(target=self._run, name="blackbox-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, directory: str, tick_rate: float, config: Dict) -> 'BlackBoxRecorder':
+        return cls(directory, tick_rate, **{k: v for k, v in config.items() if k not in ('enabled', 'directory')})
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(a.nbytes for a in (self._frames, self._times, self._ids, self._kinematics,
+                                      self._clouds, self._cloud_counts))
+
+    def record(self, frame: int, sim_time: float, states: Dict[int, VehicleState],
+               egos: Dict[int, VehicleState]) -> List[Trigger]:
+        """Store one tick of the fleet and return the events that fired on it
+
+        states covers the whole fleet; egos are checked for triggers and
+        contribute point clouds.
+        """
+        slot = self.tick % self.window
+        self._frames[slot] = frame
+        self._times[slot] = sim_time
+
+        vehicle_ids = list(states.keys())[:self.max_vehicles]
+        n = len(vehicle_ids)
+        self._ids[slot] = -1
+        self._ids[slot, :n] = vehicle_ids
+        if n:
+            values = [states[vid] for vid in vehicle_ids]
+            kinematics = self._kinematics[slot]
+            kinematics[:n, 0:3] = [s.location for s in values]
+            kinematics[:n, 3:6] = [s.rotation for s in values]
+            kinematics[:n, 6:9] = [s.velocity for s in values]
+            kinematics[:n, 9] = [s.speed for s in values]
+
+        self._cloud_counts[slot] = 0
+        for vehicle_id, state in egos.items():
+            self._store_cloud(slot, vehicle_id, state)
+
+        triggers = self._detect(frame, sim_time, egos)
+        if triggers:
+            if self._capture is None:
+                self._capture = _Capture(self.tick - self.pre_ticks, self.tick + self.post_ticks)
+            self._capture.triggers.extend(triggers)
+        if self._capture is not None and self.tick >= self._capture.end_tick:
+            self._submit(self._capture)
+            self._capture = None
+
+        self.tick += 1
+        return triggers
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Save an open capture with whatever post-trigger ticks it has and stop the writer"""
+        if self._capture is not None:
+            self._capture.end_tick = self.tick - 1
+            self._submit(self._capture)
+            self._capture = None
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _store_cloud(self, slot: int, vehicle_id: int, state: VehicleState) -> None:
+        cloud = state.point_cloud_cache.get(self.cloud_sensor)
+        if cloud is None or len(cloud.points) == 0:
+            return
+        index = self._cloud_slots.get(vehicle_id)
+        if index is None:
+            if len(self._cloud_slots) >= self.max_clouds:
+                return
+            index = self._cloud_slots[vehicle_id] = len(self._cloud_slots)
+        # Even stride decimation keeps the scan pattern spread over the whole sweep
+        stride = max(1, math.ceil(len(cloud.points) / self.cloud_points))
+        points = cloud.points[::stride]
+        self._clouds[slot, index, :len(points)] = points
+        self._cloud_counts[slot, index] = len(points)
+
+    def _detect(self, frame: int, sim_time: float, egos: Dict[int, VehicleState]) -> List[Trigger]:
+        triggers = []
+        for vehicle_id, state in egos.items():
+            fired = [(kind, None) for kind in state.sensor_events if kind in (COLLISION, LANE_INVASION)]
+
+            # Prefer the IMU; fall back to the speed drop since the previous tick
+            acceleration = imu_longitudinal_acceleration(state.sensor_data)
+            previous = self._previous_speeds.get(vehicle_id)
+            if acceleration is None and previous is not None:
+                acceleration = (state.speed - previous) / 3.6 / self.tick_rate
+            self._previous_speeds[vehicle_id] = state.speed
+            # A single IMU sample spikes over kerbs and bumps, so the deceleration has to hold
+            if acceleration is not None and -acceleration > self.hard_brake_deceleration:
+                braking = self._braking_ticks[vehicle_id] = self._braking_ticks.get(vehicle_id, 0) + 1
+                if braking >= self.hard_brake_ticks:
+                    fired.append((HARD_BRAKE, -acceleration))
+            else:
+                self._braking_ticks[vehicle_id] = 0
+
+            for kind, value in fired:
+                last = self._last_trigger.get((vehicle_id, kind))
+                if last is not None and self.tick - last < self.cooldown_ticks:
+                    continue
+                self._last_trigger[(vehicle_id, kind)] = self.tick
+                triggers.append(Trigger(kind, vehicle_id, frame, sim_time, value))
+        return triggers
+
+    def _submit(self, capture: _Capture) -> None:
+        """Copy the capture window out of the ring buffers and queue it for writing"""
+        start = max(capture.start_tick, self.tick - self.window + 1, 0)
+        order = np.arange(start, capture.end_tick + 1) % self.window
+        # Copy only the cloud slots and points in use, which keeps the copy on the tick thread short
+        used = len(self._cloud_slots)
+        counts = self._cloud_counts[order, :used]
+        points = int(counts.max()) if counts.size else 0
+        snapshot = {
+            'frames': self._frames[order],
+            'times': self._times[order],
+            'vehicle_ids': self._ids[order],
+            'kinematics': self._kinematics[order],
+            'cloud_owners': np.array(sorted(self._cloud_slots, key=self._cloud_slots.get), dtype=np.int32),
+            'cloud_counts': counts,
+            'clouds': self._clouds[order, :used, :points],
+        }
+        meta = {
+            'triggers': [vars(t) for t in capture.triggers],
+            'trigger_frame': capture.triggers[0].frame,
+            'kinematics_columns': KINEMATICS,
+            'tick_rate': self.tick_rate,
+            'cloud_sensor': self.cloud_sensor,
+        }
+        try:
+            self._queue.put_nowait((snapshot, meta))
+        except queue.Full:
+            self.captures_dropped += 1
+            logging.warning(f"Black box writer is behind, dropped the capture at frame {meta['trigger_frame']}")
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            self._write(*item)
+
+    def _write(self, snapshot: Dict[str, npt.NDArray], meta: Dict) -> None:
+        first = meta['triggers'][0]
+        path = os.path.join(self.directory,
+                            f"event_{meta['trigger_frame']:08d}_{first['kind']}_v{first['vehicle_id']}.npz")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez_compressed(tmp_path, meta=np.array(json.dumps(meta)), **snapshot)
+            os.replace(tmp_path, path)
+            self.captures_written += 1
+            logging.info(f"Black box capture saved to {path}")
+        except Exception as e:
+            logging.error(f"Error writing black box capture {path}: {e}")
+
+
+def load_capture(path: str) -> Dict[str, Any]:
+    """Arrays of a saved capture plus its decoded 'meta' dict"""
+    with np.load(path) as data:
+        capture = {name: data[name] for name in data.files if name != 'meta'}
+        capture['meta'] = json.loads(str(data['meta']))
+    return capture
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Dict, Sequence
+import numpy as np
+import numpy.typing as npt
+from ..data_structures import VehicleState
+
+# Background vehicles carry no point clouds, so they can share one read-only transform
+_IDENTITY = np.eye(4, dtype=np.float32)
+_IDENTITY.setflags(write=False)
+
+
+def build_kinematic_states(vehicle_ids: Sequence[int], locations: npt.NDArray[np.float64],
+                           rotations: npt.NDArray[np.float64], velocities: npt.NDArray[np.float64],
+                           timestamp: datetime) -> Dict[int, VehicleState]:
+    """Build sensorless V2V states for background traffic from Nx3 kinematic arrays"""
+    if len(vehicle_ids) == 0:
+        return {}
+
+    speeds = np.linalg.norm(velocities, axis=1) * 3.6  # m/s to km/h
+    return {
+        vehicle_id: VehicleState(
+            vehicle_id=vehicle_id,
+            timestamp=timestamp,
+            location=location,
+            rotation=rotation,
+            velocity=velocity,
+            speed=speed,
+            sensor_data={},
+            other_vehicles={},
+            transform_matrix=_IDENTITY
+        )
+        for vehicle_id, location, rotation, velocity, speed in zip(
+            vehicle_ids,
+            map(tuple, locations.tolist()),
+            map(tuple, rotations.tolist()),
+            map(tuple, velocities.tolist()),
+            speeds.tolist()
+        )
+    }
+
+
+def fan_out_other_vehicles(ego_states: Dict[int, VehicleState],
+                           all_states: Dict[int, VehicleState]) -> None:
+    """Give every ego a view of all other vehicles; background vehicles get none"""
+    for vehicle_id, state in ego_states.items():
+        others = dict(all_states)
+        others.pop(vehicle_id, None)
+        state.other_vehicles = others
@@ -0,0 +1,100 @@
+import logging
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+# Header words: sequence, payload size, frame, writer closed
+_HEADER_WORDS = 4
+_HEADER_BYTES = _HEADER_WORDS * 8
+
+
+class FrameChannel:
+    """Latest-frame-wins channel over one shared memory block, guarded by a seqlock
+
+    A single writer bumps the sequence to an odd value, copies the payload
+    in and bumps it back to even; it never waits for readers. A reader copies
+    the payload out and keeps it only if the sequence was even and unchanged
+    around the copy. A reader that falls behind sees only the newest frame,
+    and a read that overlaps a write is dropped rather than retried, so the
+    next poll picks up the newer frame instead. Relies on stores becoming
+    visible in program order, as they do on x86.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self._memory = memory
+        self._owner = owner
+        self._header = np.ndarray((_HEADER_WORDS,), dtype=np.int64, buffer=memory.buf)
+        self._data = memory.buf[_HEADER_BYTES:]
+        self.last_sequence = 0
+        self.dropped = 0
+
+    @classmethod
+    def create(cls, capacity: int) -> 'FrameChannel':
+        memory = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + capacity)
+        channel = cls(memory, owner=True)
+        channel._header[:] = 0
+        return channel
+
+    @classmethod
+    def attach(cls, name: str) -> 'FrameChannel':
+        # Processes spawned by the creator share its resource tracker, so attaching
+        # does not make the block outlive or die with this process
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def writer_closed(self) -> bool:
+        return bool(self._header[3])
+
+    def write(self, payload: bytes, frame: int = -1) -> bool:
+        """Publish a payload; returns False and drops it if it does not fit"""
+        size = len(payload)
+        if size > self.capacity:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logging.warning(f"Frame of {size} bytes does not fit the {self.capacity} byte channel, "
+                                f"dropped {self.dropped} so far")
+            return False
+        header = self._header
+        header[0] += 1
+        self._data[:size] = payload
+        header[1] = size
+        header[2] = frame
+        header[0] += 1
+        return True
+
+    def read(self) -> Optional[Tuple[int, bytes]]:
+        """(frame, payload) of the newest frame if it is new since the last read, else None"""
+        header = self._header
+        sequence = int(header[0])
+        if sequence == self.last_sequence or sequence & 1:
+            return None
+        size = int(header[1])
+        frame = int(header[2])
+        payload = bytes(self._data[:size])
+        if int(header[0]) != sequence:
+            return None
+        self.last_sequence = sequence
+        return frame, payload
+
+    def close_writer(self) -> None:
+        """Tell readers no more frames will come"""
+        self._header[3] = 1
+
+    def close(self) -> None:
+        """Release this process's mapping, and remove the block if this process created it"""
+        self._header = None
+        self._data.release()
+        self._memory.close()
+        if self._owner:
+            try:
+                self._memory.unlink()
+            except FileNotFoundError:
+                pass
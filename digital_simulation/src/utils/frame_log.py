@@ -0,0 +1,123 @@
+"""Normalized per-frame fleet log.
+
+Each line of frames.ndjson holds one simulator frame with every vehicle's
+state and sensor summaries written exactly once, instead of each vehicle's
+entry repeating all the others. Distances from each ego to every logged
+vehicle are stored as a compact float16 matrix, or recomputed from
+locations when it is left out.
+FrameLogReader rebuilds the old per-vehicle entries on demand.
+"""
+import base64
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import numpy.typing as npt
+from .log_writer import open_segment, segment_paths
+
+FRAME_LOG_FILE = 'frames.ndjson'
+
+
+def distance_matrix(origins: npt.ArrayLike, locations: npt.ArrayLike) -> npt.NDArray[np.float16]:
+    """3D distances from Mx3 origins to Nx3 locations as float16, good to a few cm at 100 m"""
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+    locations = np.asarray(locations, dtype=np.float64).reshape(-1, 3)
+    diff = origins[:, None, :] - locations[None, :, :]
+    return np.sqrt(np.einsum('ijk,ijk->ij', diff, diff)).astype(np.float16)
+
+
+def encode_matrix(matrix: npt.NDArray[np.float16]) -> str:
+    return base64.b64encode(np.ascontiguousarray(matrix, dtype='<f2').tobytes()).decode('ascii')
+
+
+def decode_matrix(data: str, columns: int) -> npt.NDArray[np.float16]:
+    return np.frombuffer(base64.b64decode(data), dtype='<f2').reshape(-1, columns)
+
+
+def _location(vehicle: dict) -> tuple:
+    return vehicle["location"]["x"], vehicle["location"]["y"], vehicle["location"]["z"]
+
+
+def build_frame_record(frame: int, timestamp: str, vehicles: Dict[int, dict], egos: List[int],
+                       store_distances: bool = True) -> dict:
+    """One frame log line from per-vehicle records keyed by vehicle id"""
+    record = {
+        "timestamp": timestamp,
+        "frame": frame,
+        "egos": egos,
+        "vehicles": {str(vehicle_id): data for vehicle_id, data in vehicles.items()},
+    }
+    if store_distances and vehicles:
+        # Only the egos' rows are read back, background-to-background pairs would dominate the line.
+        # Rows follow egos, columns the order of the vehicles mapping.
+        origins = [_location(vehicles[vehicle_id]) for vehicle_id in egos]
+        record["distances"] = encode_matrix(distance_matrix(origins, [_location(v) for v in vehicles.values()]))
+    return record
+
+
+class FrameLogReader:
+    """Streams a frame log, one frame at a time, across rotated and compressed segments"""
+
+    def __init__(self, path: str):
+        # Accept the log directory as well as the log file itself
+        self.path = os.path.join(path, FRAME_LOG_FILE) if os.path.isdir(path) else path
+
+    def frames(self, first: Optional[int] = None, last: Optional[int] = None) -> Iterator[dict]:
+        # The manifest lets frame ranges skip whole segments without decompressing them
+        for segment in segment_paths(self.path, first, last):
+            with open_segment(segment) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    frame = record.get("frame", -1)
+                    if (first is not None and frame < first) or (last is not None and frame > last):
+                        continue
+                    yield record
+
+    def vehicle_entries(self, vehicle_id: int, first: Optional[int] = None,
+                        last: Optional[int] = None) -> Iterator[dict]:
+        """The vehicle's entries in the per-vehicle layout, for frames it was logged as an ego"""
+        for record in self.frames(first, last):
+            if vehicle_id in record.get("egos", ()):
+                yield vehicle_view(record, vehicle_id)
+
+
+def frame_distances(record: dict, vehicle_id: int) -> npt.NDArray[np.float64]:
+    """Distances from one ego to every vehicle of a frame record, in the order of its vehicles mapping"""
+    vehicles = record["vehicles"]
+    if "distances" in record:
+        matrix = decode_matrix(record["distances"], len(vehicles))
+        # Older records stored the full matrix over all vehicles instead of the ego rows
+        if len(matrix) < len(vehicles):
+            row = record["egos"].index(vehicle_id)
+        else:
+            row = list(vehicles).index(str(vehicle_id))
+        return matrix[row].astype(np.float64)
+    return distance_matrix([_location(vehicles[str(vehicle_id)])],
+                           [_location(v) for v in vehicles.values()])[0].astype(np.float64)
+
+
+def vehicle_view(record: dict, vehicle_id: int) -> dict:
+    """Rebuild the per-vehicle log entry of one ego from a frame record"""
+    key = str(vehicle_id)
+    vehicles = record["vehicles"]
+    row = frame_distances(record, vehicle_id).tolist()
+
+    own_data = {"vehicle_id": vehicle_id, **vehicles[key]}
+    other_vehicles = {
+        other_id: {
+            "location": other["location"],
+            "velocity": other["velocity"],
+            "speed": other["speed"],
+            "relative_distance": distance,
+            "sensors": other.get("sensors", {}),
+        }
+        for (other_id, other), distance in zip(vehicles.items(), row) if other_id != key
+    }
+    return {
+        "timestamp": record["timestamp"],
+        "frame": record["frame"],
+        "own_data": own_data,
+        "other_vehicles": other_vehicles,
+    }
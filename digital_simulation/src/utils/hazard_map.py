@@ -0,0 +1,193 @@
+import math
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import numpy.typing as npt
+
+COLLISION = 'collision'
+LANE_INVASION = 'lane_invasion'
+
+# Initial weight of each event kind before decay
+DEFAULT_EVENT_WEIGHTS = {COLLISION: 1.0, LANE_INVASION: 0.3}
+
+TileKey = Tuple[int, int]
+
+
+@dataclass
+class HazardEvent:
+    kind: str  # COLLISION or LANE_INVASION
+    x: float  # world position in meters
+    y: float
+    time: float  # simulation time in seconds
+    vehicle_id: int  # vehicle that reported the event
+    weight: float = 1.0  # weight at insertion time
+
+
+@dataclass
+class RoadHazard:
+    event: HazardEvent
+    weight: float  # decayed weight at query time
+    distance: float  # distance from the query corridor centreline
+
+
+@dataclass
+class HazardTile:
+    events: List[HazardEvent] = field(default_factory=list)
+    score: float = 0.0  # sum of event weights at last_time
+    last_time: float = 0.0
+
+
+class HazardTileMap:
+    """Grid of decaying road hazard events with LRU eviction
+
+    Events are bucketed by world grid cell. Weights halve every half_life
+    seconds and events below min_weight are dropped when their tile is
+    touched. The least recently used tiles are evicted whenever the map
+    holds more than max_tiles tiles or max_events events in total.
+    """
+
+    def __init__(self, tile_size: float = 50.0, half_life: float = 120.0, min_weight: float = 0.05,
+                 max_tiles: int = 4096, max_events: int = 65536, max_events_per_tile: int = 64,
+                 event_weights: Optional[Dict[str, float]] = None):
+        self.tile_size = tile_size
+        self.half_life = half_life
+        self.min_weight = min_weight
+        self.max_tiles = max_tiles
+        self.max_events = max_events
+        self.max_events_per_tile = max_events_per_tile
+        self.event_weights = {**DEFAULT_EVENT_WEIGHTS, **(event_weights or {})}
+
+        self.tiles: 'OrderedDict[TileKey, HazardTile]' = OrderedDict()
+        self.event_count = 0
+        self.evicted_tiles = 0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'HazardTileMap':
+        return cls(**{k: v for k, v in config.items() if k != 'enabled'})
+
+    def tile_key(self, x: float, y: float) -> TileKey:
+        return (math.floor(x / self.tile_size), math.floor(y / self.tile_size))
+
+    def decay(self, age: float) -> float:
+        return 0.5 ** (age / self.half_life) if age > 0 else 1.0
+
+    def insert(self, kind: str, x: float, y: float, time: float, vehicle_id: int) -> HazardEvent:
+        """Record an event and return it with its initial weight"""
+        event = HazardEvent(kind, x, y, time, vehicle_id, self.event_weights.get(kind, 1.0))
+        key = self.tile_key(x, y)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.tiles[key] = HazardTile(last_time=time)
+        else:
+            self.tiles.move_to_end(key)
+            self._prune(tile, time)
+
+        if len(tile.events) >= self.max_events_per_tile:
+            # Replace the oldest event so busy spots keep their most recent history
+            dropped = tile.events.pop(0)
+            tile.score -= dropped.weight * self.decay(time - dropped.time)
+            self.event_count -= 1
+
+        tile.events.append(event)
+        tile.score += event.weight
+        self.event_count += 1
+        self._evict()
+        return event
+
+    def tile_score(self, key: TileKey, time: float) -> float:
+        """Decayed total weight of one tile, 0 if it is not cached"""
+        tile = self.tiles.get(key)
+        return tile.score * self.decay(time - tile.last_time) if tile else 0.0
+
+    def query_corridor(self, path: npt.ArrayLike, width: float, time: float,
+                       kinds: Optional[Iterable[str]] = None) -> List[RoadHazard]:
+        """Hazards within width meters of a polyline of (x, y) points, strongest first
+
+        Only the tiles the corridor touches are visited.
+        """
+        path = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+        if len(path) == 0 or not self.tiles:
+            return []
+        kinds = set(kinds) if kinds is not None else None
+
+        hazards = []
+        for key in self._corridor_tiles(path, width):
+            tile = self.tiles.get(key)
+            if tile is None:
+                continue
+            self.tiles.move_to_end(key)
+            self._prune(tile, time)
+            if not tile.events:
+                self._remove(key)
+                continue
+
+            events = [e for e in tile.events if kinds is None or e.kind in kinds]
+            if not events:
+                continue
+            points = np.array([(e.x, e.y) for e in events])
+            distances = _distance_to_polyline(points, path)
+            for event, distance in zip(events, distances.tolist()):
+                if distance <= width:
+                    weight = event.weight * self.decay(time - event.time)
+                    hazards.append(RoadHazard(event, weight, distance))
+
+        hazards.sort(key=lambda hazard: -hazard.weight)
+        return hazards
+
+    def query_radius(self, x: float, y: float, radius: float, time: float,
+                     kinds: Optional[Iterable[str]] = None) -> List[RoadHazard]:
+        """Hazards within radius meters of a point, strongest first"""
+        return self.query_corridor([(x, y)], radius, time, kinds)
+
+    def stats(self) -> Dict[str, int]:
+        return {'tiles': len(self.tiles), 'events': self.event_count, 'evicted_tiles': self.evicted_tiles}
+
+    def _corridor_tiles(self, path: npt.NDArray[np.float64], width: float) -> Set[TileKey]:
+        """Tiles overlapping the corridor, from the tiles under each segment padded by the width"""
+        # Sample segments at under one tile spacing so no crossed tile is skipped
+        steps = np.maximum(np.ceil(np.linalg.norm(np.diff(path, axis=0), axis=1) / self.tile_size), 1)
+        samples = [path[:1]]
+        for start, end, count in zip(path[:-1], path[1:], steps.astype(int).tolist()):
+            samples.append(start + (end - start) * (np.arange(1, count + 1)[:, None] / count))
+        cells = np.unique(np.floor(np.concatenate(samples) / self.tile_size).astype(np.int64), axis=0)
+
+        pad = int(math.ceil(width / self.tile_size))
+        offsets = np.arange(-pad, pad + 1)
+        dx, dy = np.meshgrid(offsets, offsets, indexing='ij')
+        padded = (cells[:, None, :] + np.stack([dx.ravel(), dy.ravel()], axis=1)[None, :, :]).reshape(-1, 2)
+        return set(map(tuple, np.unique(padded, axis=0).tolist()))
+
+    def _prune(self, tile: HazardTile, time: float) -> None:
+        """Drop events that decayed below min_weight and bring the tile score up to time"""
+        tile.score *= self.decay(time - tile.last_time)
+        tile.last_time = max(tile.last_time, time)
+        kept = [e for e in tile.events if e.weight * self.decay(time - e.time) >= self.min_weight]
+        if len(kept) != len(tile.events):
+            self.event_count -= len(tile.events) - len(kept)
+            tile.events = kept
+            tile.score = sum(e.weight * self.decay(time - e.time) for e in kept)
+
+    def _remove(self, key: TileKey) -> None:
+        tile = self.tiles.pop(key)
+        self.event_count -= len(tile.events)
+
+    def _evict(self) -> None:
+        while self.tiles and (len(self.tiles) > self.max_tiles or self.event_count > self.max_events):
+            self._remove(next(iter(self.tiles)))
+            self.evicted_tiles += 1
+
+
+def _distance_to_polyline(points: npt.NDArray[np.float64], path: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Distance from each point to the nearest segment of path"""
+    if len(path) == 1:
+        return np.linalg.norm(points - path[0], axis=1)
+    starts, ends = path[:-1], path[1:]
+    segments = ends - starts
+    lengths = np.einsum('sk,sk->s', segments, segments)
+    offsets = points[:, None, :] - starts[None, :, :]
+    t = np.einsum('psk,sk->ps', offsets, segments) / np.where(lengths > 0, lengths, 1.0)
+    np.clip(t, 0.0, 1.0, out=t)
+    closest = starts[None, :, :] + t[..., None] * segments[None, :, :]
+    diff = points[:, None, :] - closest
+    return np.sqrt(np.einsum('psk,psk->ps', diff, diff).min(axis=1))
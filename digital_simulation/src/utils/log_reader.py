@@ -0,0 +1,267 @@
+"""Streaming reader and query CLI for vehicle logs.
+
+Reads the legacy pretty-printed JSON array state_log.json files, NDJSON
+state logs and frame logs, plain or compressed, one entry at a time, so
+memory use does not grow with file size.
+
+Examples:
+    python -m src.utils.log_reader logs/ --vehicle 2 --min-speed 30 --limit 10
+    python -m src.utils.log_reader logs/ --collisions --start 20240101_120000 --stats
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, Sequence, TextIO, Tuple
+from .frame_log import FRAME_LOG_FILE, FrameLogReader, vehicle_view
+from .log_writer import manifest_path, open_segment, segment_paths
+
+DEFAULT_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def iter_json_array(f: TextIO, chunk_size: int = 1024 * 1024,
+                    max_entry_size: int = 64 * 1024 * 1024) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array without loading the whole document
+
+    Older loggers closed the array and appended more entries after it, so a
+    ']' followed by ',' or '{' is read as a separator; only a ']' at the
+    end of the file, or followed by a stray extra ']', ends the array. A
+    truncated trailing entry is logged and skipped; a syntax error fails
+    once max_entry_size characters fail to parse.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    closed = False  # a ']' was read, more entries may still follow it
+    while True:
+        # Skip whitespace between elements
+        while position < len(buffer) and buffer[position] in ' \t\r\n':
+            position += 1
+        if position >= len(buffer):
+            buffer = f.read(chunk_size)
+            position = 0
+            if not buffer:
+                return
+            continue
+        char = buffer[position]
+        if not started:
+            if char != '[':
+                raise ValueError("Log does not start with a JSON array")
+            started = True
+            position += 1
+            continue
+        if closed:
+            if char not in ',{[':
+                return
+            closed = False
+        if char in ',[':
+            position += 1
+            continue
+        if char == ']':
+            closed = True
+            position += 1
+            continue
+        try:
+            entry, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Usually the element continues in the next chunk
+            more = f.read(chunk_size)
+            if not more:
+                logging.warning("Log ends inside an entry, skipping the truncated entry")
+                return
+            if len(buffer) - position > max_entry_size:
+                raise ValueError(f"Malformed log, no complete entry within {max_entry_size} characters")
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+        yield entry
+        position = end
+        # Drop consumed text now and then so the buffer stays about one chunk long
+        if position > chunk_size:
+            buffer = buffer[position:]
+            position = 0
+
+
+def iter_entries(path: str) -> Iterator[dict]:
+    """Entries of one state log segment in either the JSON array or NDJSON layout"""
+    with open_segment(path) as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            yield from iter_json_array(f)
+            return
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.warning(f"Skipping malformed line {number} of {path}: {e}")
+
+
+def iter_vehicle_logs(log_dir: str, vehicle_ids: Optional[Sequence[int]] = None,
+                      first_frame: Optional[int] = None,
+                      last_frame: Optional[int] = None) -> Iterator[Tuple[int, dict]]:
+    """(vehicle_id, entry) pairs from the frame log and every per-vehicle state log under log_dir
+
+    Frame log entries are rebuilt in the per-vehicle layout. Frame bounds
+    only skip frame log segments; use EntryFilter to filter entries.
+    """
+    wanted = set(vehicle_ids) if vehicle_ids is not None else None
+    frame_log = os.path.join(log_dir, FRAME_LOG_FILE)
+    if os.path.exists(frame_log) or os.path.exists(manifest_path(frame_log)):
+        try:
+            for record in FrameLogReader(frame_log).frames(first_frame, last_frame):
+                for vehicle_id in record.get('egos', ()):
+                    if wanted is None or vehicle_id in wanted:
+                        yield vehicle_id, vehicle_view(record, vehicle_id)
+        except Exception as e:
+            logging.error(f"Error reading frame log {frame_log}: {e}")
+
+    for name in sorted(os.listdir(log_dir)):
+        vehicle_path = os.path.join(log_dir, name)
+        if not name.startswith('vehicle_') or not os.path.isdir(vehicle_path):
+            continue
+        try:
+            vehicle_id = int(name[len('vehicle_'):])
+        except ValueError:
+            continue
+        if wanted is not None and vehicle_id not in wanted:
+            continue
+        # Legacy JSON array logs first, then NDJSON, each oldest rotated segment first
+        for log_path in (segment_paths(os.path.join(vehicle_path, 'state_log.json')) +
+                         segment_paths(os.path.join(vehicle_path, 'state_log.ndjson'))):
+            try:
+                for entry in iter_entries(log_path):
+                    yield vehicle_id, entry
+            except Exception as e:
+                logging.error(f"Error reading {log_path}: {e}")
+
+
+@dataclass
+class EntryFilter:
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    collision_only: bool = False
+    min_speed: Optional[float] = None  # km/h
+    timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT
+
+    def matches(self, entry: dict) -> bool:
+        own = entry.get('own_data', {})
+        if self.min_speed is not None and own.get('speed', 0.0) < self.min_speed:
+            return False
+        if self.collision_only and not own.get('sensors', {}).get('collision', False):
+            return False
+        if self.start or self.end:
+            timestamp = entry_time(entry, self.timestamp_format)
+            if timestamp is None or (self.start and timestamp < self.start) or (self.end and timestamp > self.end):
+                return False
+        return True
+
+
+def entry_time(entry: dict, timestamp_format: str = DEFAULT_TIMESTAMP_FORMAT) -> Optional[datetime]:
+    try:
+        return datetime.strptime(entry['timestamp'], timestamp_format)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@dataclass
+class VehicleStats:
+    entries: int = 0
+    collisions: int = 0
+    speed_sum: float = 0.0
+    max_speed: float = 0.0
+    first_timestamp: Optional[str] = None
+    last_timestamp: Optional[str] = None
+
+    @property
+    def mean_speed(self) -> float:
+        return self.speed_sum / self.entries if self.entries else 0.0
+
+
+@dataclass
+class LogStats:
+    """Running aggregates that use constant memory per vehicle however long the log is"""
+    vehicles: Dict[int, VehicleStats] = field(default_factory=dict)
+
+    def add(self, vehicle_id: int, entry: dict) -> None:
+        stats = self.vehicles.get(vehicle_id)
+        if stats is None:
+            stats = self.vehicles[vehicle_id] = VehicleStats()
+        own = entry.get('own_data', {})
+        speed = float(own.get('speed', 0.0))
+        stats.entries += 1
+        stats.speed_sum += speed
+        stats.max_speed = max(stats.max_speed, speed)
+        if own.get('sensors', {}).get('collision', False):
+            stats.collisions += 1
+        timestamp = entry.get('timestamp')
+        if timestamp is not None:
+            if stats.first_timestamp is None:
+                stats.first_timestamp = timestamp
+            stats.last_timestamp = timestamp
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            str(vehicle_id): {
+                'entries': stats.entries,
+                'collisions': stats.collisions,
+                'mean_speed': round(stats.mean_speed, 3),
+                'max_speed': round(stats.max_speed, 3),
+                'first_timestamp': stats.first_timestamp,
+                'last_timestamp': stats.last_timestamp,
+            }
+            for vehicle_id, stats in sorted(self.vehicles.items())
+        }
+
+
+def query(log_dir: str, vehicle_ids: Optional[Sequence[int]] = None,
+          entry_filter: Optional[EntryFilter] = None) -> Iterable[Tuple[int, dict]]:
+    """Matching (vehicle_id, entry) pairs, streamed"""
+    entry_filter = entry_filter or EntryFilter()
+    return ((vid, entry) for vid, entry in iter_vehicle_logs(log_dir, vehicle_ids) if entry_filter.matches(entry))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream, filter and summarize vehicle logs")
+    parser.add_argument('log_dir', help="Logging output directory holding frames.ndjson and/or vehicle_*/")
+    parser.add_argument('--vehicle', type=int, nargs='+', help="Only these vehicle ids")
+    parser.add_argument('--start', help="Earliest entry timestamp, in the log timestamp format")
+    parser.add_argument('--end', help="Latest entry timestamp, in the log timestamp format")
+    parser.add_argument('--collisions', action='store_true', help="Only entries with a collision")
+    parser.add_argument('--min-speed', type=float, help="Only entries at or above this speed in km/h")
+    parser.add_argument('--timestamp-format', default=DEFAULT_TIMESTAMP_FORMAT)
+    parser.add_argument('--stats', action='store_true', help="Print per-vehicle aggregates instead of entries")
+    parser.add_argument('--limit', type=int, help="Stop after this many matching entries")
+    args = parser.parse_args(argv)
+
+    entry_filter = EntryFilter(
+        start=datetime.strptime(args.start, args.timestamp_format) if args.start else None,
+        end=datetime.strptime(args.end, args.timestamp_format) if args.end else None,
+        collision_only=args.collisions,
+        min_speed=args.min_speed,
+        timestamp_format=args.timestamp_format
+    )
+
+    stats = LogStats()
+    for count, (vehicle_id, entry) in enumerate(query(args.log_dir, args.vehicle, entry_filter), 1):
+        if args.stats:
+            stats.add(vehicle_id, entry)
+        else:
+            print(json.dumps({'vehicle_id': vehicle_id, **entry}, separators=(',', ':')))
+        if args.limit is not None and count >= args.limit:
+            break
+    if args.stats:
+        print(json.dumps(stats.summary(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
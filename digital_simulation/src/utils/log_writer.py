@@ -0,0 +1,269 @@
+import glob
+import gzip
+import io
+import json
+import logging
+import lzma
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Optional, TextIO
+
+# Queue item that tells the writer thread to close its files and exit
+_STOP = object()
+
+# Compressed segment suffix per codec, all streaming codecs from the standard library
+CODECS = {'gzip': '.gz', 'lzma': '.xz'}
+_OPENERS = {'.gz': gzip.open, '.xz': lzma.open}
+
+
+class _OpenLog:
+    def __init__(self, handle: BinaryIO, size: int):
+        self.handle = handle
+        self.size = size  # bytes in the file, tracked so rotation never needs a stat call
+        self.entries = 0
+        # Frame range of the entries written; unknown if the file held entries from an earlier run
+        self.frame_min: Optional[int] = None if size else -1
+        self.frame_max: Optional[int] = None if size else -1
+
+
+def manifest_path(path: str) -> str:
+    base, _ = os.path.splitext(path)
+    return f"{base}.manifest.json"
+
+
+def read_manifest(path: str) -> List[Dict]:
+    """Rotated segments of a log, oldest first, as recorded by the writer"""
+    try:
+        with open(manifest_path(path)) as f:
+            return json.load(f)['segments']
+    except FileNotFoundError:
+        return []
+
+
+def segment_paths(path: str, first: Optional[int] = None, last: Optional[int] = None) -> List[str]:
+    """Segments of a log oldest first, ending with the active file
+
+    With a manifest, segments whose recorded frame range misses first..last
+    are skipped. Without one, rotated files are found by name.
+    """
+    directory = os.path.dirname(path)
+    manifest = read_manifest(path)
+    if manifest:
+        paths = []
+        for segment in manifest:
+            if segment['frame_min'] is not None and segment['frame_min'] >= 0:
+                if (first is not None and segment['frame_max'] < first) or \
+                        (last is not None and segment['frame_min'] > last):
+                    continue
+            segment_path = os.path.join(directory, segment['file'])
+            if os.path.exists(segment_path):
+                paths.append(segment_path)
+    else:
+        base, ext = os.path.splitext(path)
+        paths = sorted(glob.glob(f"{glob.escape(base)}_*{ext}*"))
+    if os.path.exists(path):
+        paths.append(path)
+    return paths
+
+
+def open_segment(path: str) -> TextIO:
+    """Open a plain or compressed log segment for streaming text reads"""
+    opener = _OPENERS.get(os.path.splitext(path)[1])
+    if opener is None:
+        return open(path, encoding='utf-8')
+    return io.TextIOWrapper(opener(path, 'rb'), encoding='utf-8')
+
+
+class LogWriter:
+    """Append-only NDJSON log writer with a background thread
+
+    Callers hand over plain dict records; serialization and file I/O happen
+    on one writer thread fed by a bounded queue, so the tick loop never
+    blocks on disk. Each log path keeps one open buffered handle and is
+    rotated to a timestamped file once it would grow past max_file_size.
+    Records are dropped and counted when the queue is full.
+
+    Rotated segments are stream-compressed by a second thread when a codec
+    is set, and listed with their frame ranges in a manifest next to the log
+    so readers can open only the segments they need.
+    """
+
+    def __init__(self, max_file_size: int = 100 * 1024 * 1024, queue_size: int = 4096,
+                 timestamp_format: str = "%Y%m%d_%H%M%S", buffer_size: int = 1024 * 1024,
+                 compression: Optional[str] = 'gzip', compression_level: Optional[int] = None):
+        if compression not in (None, 'none', *CODECS):
+            logging.warning(f"Unknown log compression {compression!r}, rotated logs stay uncompressed")
+        self.max_file_size = max_file_size
+        self.timestamp_format = timestamp_format
+        self.buffer_size = buffer_size
+        self.compression = compression if compression in CODECS else None
+        self.compression_level = compression_level
+        self.queue: 'queue.Queue' = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.compressed_bytes = 0
+        self.raw_bytes = 0
+        self._files: Dict[str, _OpenLog] = {}
+        self._segments: 'queue.Queue' = queue.Queue()
+        # The writer lists rotated segments and the compressor swaps them, both rewrite the manifest
+        self._manifest_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        self._compressor = threading.Thread(target=self._run_compressor, name="log-compressor", daemon=True)
+        self._compressor.start()
+
+    def write(self, path: str, record: dict) -> bool:
+        """Queue a record for path; the record must not be modified afterwards. False if dropped"""
+        try:
+            self.queue.put_nowait((path, record))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logging.warning(f"Log writer queue full, {self.dropped} records dropped so far")
+            return False
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write out everything queued, close all files and stop the writer threads
+
+        Segments still waiting for compression are finished first.
+        """
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+        if self._compressor.is_alive():
+            self._segments.put(_STOP)
+            self._compressor.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                # Idle: push buffered lines to the OS so a crash loses little
+                self._flush()
+                continue
+            if item is _STOP:
+                break
+            self._append(*item)
+            if self.queue.empty():
+                self._flush()
+        self._close_all()
+
+    def _append(self, path: str, record: dict) -> None:
+        try:
+            line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+            log = self._files.get(path)
+            if log is not None and log.size > 0 and log.size + len(line) > self.max_file_size:
+                self._rotate(path)
+                log = None
+            if log is None:
+                log = self._open(path)
+            log.handle.write(line)
+            log.size += len(line)
+            log.entries += 1
+            frame = record.get('frame', -1)
+            if isinstance(frame, int) and frame >= 0 and log.frame_min is not None:
+                log.frame_min = frame if log.frame_min < 0 else min(log.frame_min, frame)
+                log.frame_max = max(log.frame_max, frame)
+            self.written += 1
+        except Exception as e:
+            logging.error(f"Error writing to log file {path}: {e}")
+
+    def _open(self, path: str) -> _OpenLog:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        handle = open(path, 'ab', buffering=self.buffer_size)
+        # One stat when the file is opened; sizes are tracked from here on
+        log = self._files[path] = _OpenLog(handle, handle.seek(0, os.SEEK_END))
+        return log
+
+    def _rotate(self, path: str) -> str:
+        """Close path, move it aside to a timestamped name and hand it to the compressor"""
+        log = self._files.pop(path)
+        log.handle.close()
+        base, ext = os.path.splitext(path)
+        stamp = datetime.now().strftime(self.timestamp_format)
+        rotated = f"{base}_{stamp}{ext}"
+        suffix = 1
+        # A compressed copy of an earlier segment may hold the name as well
+        while any(os.path.exists(rotated + suffix_ext) for suffix_ext in ('', *CODECS.values())):
+            rotated = f"{base}_{stamp}_{suffix}{ext}"
+            suffix += 1
+        os.replace(path, rotated)
+        self.rotations += 1
+        segment = {
+            'file': os.path.basename(rotated),
+            'codec': None,
+            'frame_min': log.frame_min,
+            'frame_max': log.frame_max,
+            'entries': log.entries,
+            'raw_bytes': log.size,
+            'bytes': log.size,
+        }
+        # Listed uncompressed right away so readers find it while earlier segments are still compressing
+        self._update_manifest(path, segment)
+        if self.compression is not None:
+            self._segments.put((path, rotated, segment))
+        return rotated
+
+    def _run_compressor(self) -> None:
+        while True:
+            item = self._segments.get()
+            if item is _STOP:
+                break
+            self._compress(*item)
+
+    def _compress(self, path: str, rotated: str, segment: Dict) -> None:
+        """Swap a rotated segment already listed in the manifest for a compressed copy"""
+        compressed = rotated + CODECS[self.compression]
+        try:
+            options = {} if self.compression_level is None else (
+                {'compresslevel': self.compression_level} if self.compression == 'gzip'
+                else {'preset': self.compression_level})
+            with open(rotated, 'rb') as src, _OPENERS[CODECS[self.compression]](compressed, 'wb', **options) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            size = os.path.getsize(compressed)
+            self._update_manifest(path, {**segment, 'file': os.path.basename(compressed),
+                                         'codec': self.compression, 'bytes': size},
+                                  replace=segment['file'])
+            os.remove(rotated)
+            self.raw_bytes += segment['raw_bytes']
+            self.compressed_bytes += size
+        except Exception as e:
+            logging.error(f"Error compressing log segment {rotated}: {e}")
+
+    def _update_manifest(self, path: str, segment: Dict, replace: Optional[str] = None) -> None:
+        """Append a segment, or replace the one named replace, writing the manifest atomically"""
+        try:
+            with self._manifest_lock:
+                segments = read_manifest(path)
+                if replace is not None:
+                    segments = [segment if s['file'] == replace else s for s in segments]
+                else:
+                    segments.append(segment)
+                target = manifest_path(path)
+                tmp_path = f"{target}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump({'log': os.path.basename(path), 'segments': segments}, f, indent=1)
+                os.replace(tmp_path, target)
+        except Exception as e:
+            logging.error(f"Error updating log manifest for {path}: {e}")
+
+    def _flush(self) -> None:
+        for path, log in self._files.items():
+            try:
+                log.handle.flush()
+            except Exception as e:
+                logging.error(f"Error flushing log file {path}: {e}")
+
+    def _close_all(self) -> None:
+        for path, log in self._files.items():
+            try:
+                log.handle.close()
+            except Exception as e:
+                logging.error(f"Error closing log file {path}: {e}")
+        self._files.clear()
@@ -1,12 +1,15 @@
 from datetime import datetime
-import json
 import os
 import numpy as np
+from dataclasses import asdict
 from typing import Dict, Any, Optional
 from ..data_structures import VehicleState, PointCloudData
-import open3d as o3d
+from .sensor_decoder import decode_sensor_data
+from .log_writer import LogWriter
+from .pointcloud_sink import PointCloudSink
+from .trajectory_store import TrajectoryStoreWriter
+from .frame_log import FRAME_LOG_FILE, build_frame_record
 import logging
-import time
 
 class VehicleLogger:
     def __init__(self, config):
@@ -14,36 +17,60 @@ class VehicleLogger:
         self.log_dir = config['logging']['output']['directory']
         self.timestamp_format = config['logging']['output']['timestamp_format']
         self.max_file_size = config['logging']['json']['max_file_size_mb'] * 1024 * 1024
+        self.layout = config['logging']['json'].get('layout', 'frame')
+        self.store_distances = config['logging']['json'].get('store_distances', True)
         os.makedirs(self.log_dir, exist_ok=True)
+        self.writer = LogWriter(
+            max_file_size=self.max_file_size,
+            queue_size=config['logging']['json'].get('queue_size', 4096),
+            timestamp_format=self.timestamp_format,
+            compression=config['logging']['json'].get('compression', 'gzip'),
+            compression_level=config['logging']['json'].get('compression_level')
+        )
+        pointcloud_config = config['logging'].get('sensors', {}).get('pointcloud', {})
+        self.pointcloud_sink = (PointCloudSink.from_config(self.log_dir, pointcloud_config)
+                                if pointcloud_config.get('enabled', False) else None)
+        columnar_config = config['logging'].get('columnar', {})
+        # Each run gets its own store, frame numbers restart with the CARLA server
+        self.trajectory_store = (
+            TrajectoryStoreWriter.from_config(
+                os.path.join(self.log_dir, columnar_config.get('directory', 'trajectories'),
+                             datetime.now().strftime(self.timestamp_format)), columnar_config)
+            if columnar_config.get('enabled', False) else None
+        )
         
+    def log_frame(self, frame: int, vehicle_states: Dict[int, VehicleState]):
+        """Log one frame of every ego, as a single frame record or as per-vehicle entries"""
+        if self.layout != 'frame':
+            for vehicle_id, state in vehicle_states.items():
+                self.log_vehicle_data(vehicle_id, state, state.other_vehicles, frame)
+            return
+
+        timestamp = datetime.now().strftime(self.timestamp_format)
+        vehicles = {}
+        for vehicle_id, state in vehicle_states.items():
+            vehicles[vehicle_id] = self._own_record(vehicle_id, state)
+            self._save_frame_data(vehicle_id, state, frame)
+        # Background traffic appears only among other vehicles and is recorded once as well
+        for state in vehicle_states.values():
+            for other_id, other in state.other_vehicles.items():
+                if other_id not in vehicles:
+                    vehicles[other_id] = self._state_record(other)
+
+        record = build_frame_record(frame, timestamp, vehicles, list(vehicle_states), self.store_distances)
+        self._write_log(os.path.join(self.log_dir, FRAME_LOG_FILE), record)
+
     def log_vehicle_data(self, vehicle_id: int, own_state: VehicleState, 
-                        other_vehicles_data: Dict[int, VehicleState]):
+                        other_vehicles_data: Dict[int, VehicleState], frame: int = -1):
         """Log vehicle state data"""
         log_file = self._get_log_file(vehicle_id)
         timestamp = datetime.now().strftime(self.timestamp_format)
+        self._save_frame_data(vehicle_id, own_state, frame)
         
         log_entry = {
             "timestamp": timestamp,
-            "own_data": {
-                "vehicle_id": own_state.vehicle_id,
-                "location": {
-                    "x": float(own_state.location[0]),
-                    "y": float(own_state.location[1]),
-                    "z": float(own_state.location[2])
-                },
-                "rotation": {
-                    "pitch": float(own_state.rotation[0]),
-                    "yaw": float(own_state.rotation[1]),
-                    "roll": float(own_state.rotation[2])
-                },
-                "velocity": {
-                    "x": float(own_state.velocity[0]),
-                    "y": float(own_state.velocity[1]),
-                    "z": float(own_state.velocity[2])
-                },
-                "speed": float(own_state.speed),
-                "sensors": self._process_sensor_data(vehicle_id, timestamp, own_state.sensor_data)
-            },
+            "frame": frame,
+            "own_data": {"vehicle_id": own_state.vehicle_id, **self._own_record(vehicle_id, own_state)},
             "other_vehicles": {
                 str(other.vehicle_id): {
                     "location": {
@@ -60,142 +87,125 @@ class VehicleLogger:
                     "relative_distance": float(np.linalg.norm(
                         np.array(own_state.location) - np.array(other.location)
                     )),
-                    "sensors": self._process_sensor_data(other.vehicle_id, timestamp, other.sensor_data)
+                    "sensors": self._process_sensor_data(other.vehicle_id, other.sensor_data)
                 }
                 for other in other_vehicles_data.values()
             }
         }
-        
+        self._write_log(log_file, log_entry)
+
+    def _state_record(self, state: VehicleState) -> dict:
+        """Pose, motion and sensor summaries of one vehicle"""
+        return {
+            "location": {
+                "x": float(state.location[0]),
+                "y": float(state.location[1]),
+                "z": float(state.location[2])
+            },
+            "rotation": {
+                "pitch": float(state.rotation[0]),
+                "yaw": float(state.rotation[1]),
+                "roll": float(state.rotation[2])
+            },
+            "velocity": {
+                "x": float(state.velocity[0]),
+                "y": float(state.velocity[1]),
+                "z": float(state.velocity[2])
+            },
+            "speed": float(state.speed),
+            "sensors": self._process_sensor_data(state.vehicle_id, state.sensor_data)
+        }
+
+    def _own_record(self, vehicle_id: int, own_state: VehicleState) -> dict:
+        """State record of an ego plus its perception and analytics results"""
+        record = self._state_record(own_state)
+
+        # Record the effective sensor resolution so consumers can interpret point counts
+        if own_state.sensor_lod:
+            record["sensor_lod"] = own_state.sensor_lod
+
+        if own_state.fused_objects is not None:
+            record["objects"] = {
+                "detected": len(own_state.detected_objects.objects) if own_state.detected_objects else 0,
+                "fused": len(own_state.fused_objects.objects)
+            }
+
+        if own_state.traffic_flow:
+            record["traffic_flow"] = asdict(own_state.traffic_flow)
+
+        if own_state.obstacle_distance is not None:
+            # A clear lane is logged as null, JSON has no infinity
+            distance = own_state.obstacle_distance
+            record["obstacle_distance"] = distance if np.isfinite(distance) else None
+
         # Add combined point cloud data if available
         if own_state.combined_point_cloud:
-            log_entry["own_data"]["combined_point_cloud"] = {
+            record["combined_point_cloud"] = {
                 "num_points": len(own_state.combined_point_cloud.points),
                 "num_sources": len(np.unique(own_state.combined_point_cloud.sources)),
                 "last_update": own_state.combined_point_cloud.last_update.strftime(self.timestamp_format)
             }
+        return record
+
+    def _save_frame_data(self, vehicle_id: int, own_state: VehicleState, frame: int):
+        """Hand the ego's row and point clouds to the columnar store and point cloud sink"""
+        if self.trajectory_store:
+            self.trajectory_store.append(vehicle_id, frame, own_state.timestamp.timestamp(), own_state.location,
+                                         own_state.rotation, own_state.velocity, own_state.speed)
+
+        # Only the vehicle's own clouds are saved; other vehicles save theirs in their own entries
+        if self.pointcloud_sink:
+            for sensor_type, cloud in own_state.point_cloud_cache.items():
+                self.pointcloud_sink.submit(vehicle_id, sensor_type, cloud)
         
-        self._write_log(log_file, log_entry)
-        
-    def _process_sensor_data(self, vehicle_id: int, timestamp: str, 
-                           sensor_data: Dict[str, Any]) -> dict:
-        """Process and save sensor data, returning processed data structure"""
+    def _process_sensor_data(self, vehicle_id: int, sensor_data: Dict[str, Any]) -> dict:
+        """Summarize decoded sensor data, decoding raw measurements if needed"""
         processed = {}
         
         for sensor_type, data in sensor_data.items():
+            if not isinstance(data, (dict, PointCloudData)):
+                data = decode_sensor_data(sensor_type, data, vehicle_id)
+            if data is None:
+                continue
+
             if sensor_type == 'collision':
-                processed['collision'] = bool(data.other_actor is not None)
+                processed['collision'] = data.get('other_actor_id') is not None
             elif sensor_type == 'gnss':
                 processed['gnss'] = {
-                    'altitude': float(data.altitude),
-                    'latitude': float(data.latitude),
-                    'longitude': float(data.longitude)
+                    'altitude': data['altitude'],
+                    'latitude': data['latitude'],
+                    'longitude': data['longitude']
                 }
             elif sensor_type == 'imu':
                 processed['imu'] = {
-                    'accelerometer': {
-                        'x': float(data.accelerometer.x),
-                        'y': float(data.accelerometer.y),
-                        'z': float(data.accelerometer.z)
-                    },
-                    'gyroscope': {
-                        'x': float(data.gyroscope.x),
-                        'y': float(data.gyroscope.y),
-                        'z': float(data.gyroscope.z)
-                    }
+                    'accelerometer': data['accelerometer'],
+                    'gyroscope': data['gyroscope']
+                }
+            elif sensor_type in ['lidar', 'radar', 'semantic_lidar'] and isinstance(data, PointCloudData):
+                processed[sensor_type] = {
+                    'num_points': len(data.points),
+                    'timestamp': data.sensor_timestamp
                 }
-            elif sensor_type in ['lidar', 'radar', 'semantic_lidar']:
-                point_cloud = self._process_point_cloud(vehicle_id, timestamp, sensor_type, data)
-                if point_cloud:
-                    processed[sensor_type] = {
-                        'num_points': len(point_cloud.points),
-                        'timestamp': float(data.timestamp)
-                    }
         
         return processed
 
-    def _process_point_cloud(self, vehicle_id: int, timestamp: str, 
-                             sensor_type: str, data) -> Optional[PointCloudData]:
-        """Process point cloud data into structured format"""
-        points = []
-        tags = [] if sensor_type == 'semantic_lidar' else None
-        timestamps = []
-        point_size = 16 if sensor_type == 'semantic_lidar' else 12
-        
-        raw_data = bytes(data.raw_data)
-        total_points = len(raw_data) // point_size
-        
-        if total_points == 0:
-            return None
-        
-        current_time = time.time()
-        
-        # Parse points based on sensor type
-        for i in range(total_points):
-            offset = i * point_size
-            if sensor_type == 'semantic_lidar':
-                point_data = np.frombuffer(raw_data[offset:offset + 16], dtype=np.float32)
-                points.append(point_data[:3])
-                tags.append(int(point_data[3]))
-            else:
-                points.append(np.frombuffer(raw_data[offset:offset + 12], dtype=np.float32))
-            timestamps.append(current_time)
-        
-        return PointCloudData(
-            points=np.array(points, dtype=np.float32),
-            timestamps=np.array(timestamps, dtype=np.float32),
-            tags=np.array(tags, dtype=np.int32) if tags else None,
-            source_vehicle=vehicle_id
-        )
-
     def _get_log_file(self, vehicle_id: int) -> str:
         """Get appropriate log file path"""
-        vehicle_dir = os.path.join(self.log_dir, f"vehicle_{vehicle_id}")
-        os.makedirs(vehicle_dir, exist_ok=True)
-        return os.path.join(vehicle_dir, "state_log.json")
+        return os.path.join(self.log_dir, f"vehicle_{vehicle_id}", "state_log.ndjson")
 
     def _write_log(self, log_file: str, log_entry: dict):
-        """Write log entry to file"""
-        try:
-            # Check if file exists and its size
-            if os.path.exists(log_file) and os.path.getsize(log_file) > self.max_file_size:
-                # Create new file with timestamp
-                timestamp = datetime.now().strftime(self.timestamp_format)
-                base, ext = os.path.splitext(log_file)
-                log_file = f"{base}_{timestamp}{ext}"
-            
-            if not os.path.exists(log_file):
-                # Create new file with array start
-                with open(log_file, 'w') as f:
-                    f.write('[\n')
-                    json.dump(log_entry, f, indent=2)
-                    f.write('\n]')
-            else:
-                # Read existing content
-                with open(log_file, 'r+') as f:
-                    # Move cursor to just before the closing bracket
-                    f.seek(0, 2)  # Go to end
-                    f.seek(f.tell() - 2, 0)  # Move back 2 characters (before ']')
-                    f.write(',\n')  # Add comma and newline
-                    json.dump(log_entry, f, indent=2)  # Write new entry
-                    f.write('\n]')  # Close the array
-                
-        except Exception as e:
-            logging.error(f"Error writing to log file: {e}")
+        """Queue a log entry as one NDJSON line; the writer thread does the file I/O"""
+        self.writer.write(log_file, log_entry)
 
     def cleanup(self):
-        """Cleanup method for the VehicleLogger"""
+        """Write out queued entries and close the log files"""
         try:
-            # Close any open log files
-            for vehicle_dir in os.listdir(self.log_dir):
-                if vehicle_dir.startswith('vehicle_'):
-                    log_file = os.path.join(self.log_dir, vehicle_dir, "state_log.json")
-                    if os.path.exists(log_file):
-                        with open(log_file, 'a') as f:
-                            # Ensure JSON file is properly closed
-                            if os.path.getsize(log_file) > 0:
-                                f.seek(0, 2)  # Go to end of file
-                                if f.tell() > 1:  # If file has content
-                                    f.write('\n]')  # Close the JSON array
-                                    
+            self.writer.close()
+            if self.trajectory_store:
+                self.trajectory_store.flush()
+            if self.pointcloud_sink:
+                self.pointcloud_sink.close()
+            if self.writer.dropped:
+                logging.warning(f"{self.writer.dropped} log entries were dropped while the writer was behind")
         except Exception as e:
-            print(f"Error during logger cleanup: {e}") 
\ No newline at end of file
+            print(f"Error during logger cleanup: {e}")
@@ -0,0 +1,123 @@
+import hashlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import numpy as np
+import numpy.typing as npt
+
+# carla.LaneType.Driving
+DRIVING_LANE_TYPE = 2
+
+
+@dataclass
+class MapTopology:
+    map_name: str
+    opendrive_hash: str
+    spawn_points: npt.NDArray[np.float64]  # Nx6 (x, y, z, pitch, yaw, roll)
+    spawn_road_ids: npt.NDArray[np.int32]
+    spawn_lane_ids: npt.NDArray[np.int32]
+    spawn_lane_types: npt.NDArray[np.int32]
+    spawn_is_junction: npt.NDArray[np.bool_]
+    intersections: npt.NDArray[np.float64]  # Mx6 junction waypoint transforms
+    intersection_road_ids: npt.NDArray[np.int32]
+    intersection_lane_ids: npt.NDArray[np.int32]
+
+    @property
+    def urban_spawn_mask(self) -> npt.NDArray[np.bool_]:
+        """Spawn points on driving lanes of urban roads"""
+        return (self.spawn_lane_types == DRIVING_LANE_TYPE) & (self.spawn_road_ids < 100)
+
+
+def _transform_row(transform) -> tuple:
+    location, rotation = transform.location, transform.rotation
+    return (location.x, location.y, location.z, rotation.pitch, rotation.yaw, rotation.roll)
+
+
+class MapTopologyCache:
+    """Spawn point classification and junction waypoints computed once per map
+
+    Results are kept in memory per map name and persisted to a compressed .npz
+    keyed by the hash of the map's OpenDRIVE definition.
+    """
+
+    _memory: Dict[str, MapTopology] = {}
+
+    def __init__(self, cache_dir: str, waypoint_spacing: float = 2.0):
+        self.cache_dir = cache_dir
+        self.waypoint_spacing = waypoint_spacing
+
+    def get(self, carla_map) -> MapTopology:
+        """Get topology for a carla.Map, loading or building it as needed"""
+        cached = self._memory.get(carla_map.name)
+        if cached is not None:
+            return cached
+
+        opendrive_hash = hashlib.sha1(carla_map.to_opendrive().encode('utf-8')).hexdigest()
+        path = self._cache_path(carla_map.name, opendrive_hash)
+
+        topology = self._load(path, carla_map.name, opendrive_hash)
+        if topology is None:
+            start_time = time.perf_counter()
+            topology = self._build(carla_map, opendrive_hash)
+            logging.info(f"Built topology for {carla_map.name} in {time.perf_counter() - start_time:.2f}s")
+            self._save(path, topology)
+
+        self._memory[carla_map.name] = topology
+        return topology
+
+    def _cache_path(self, map_name: str, opendrive_hash: str) -> str:
+        safe_name = re.sub(r'[^A-Za-z0-9_-]+', '_', map_name).strip('_')
+        return os.path.join(self.cache_dir, f"{safe_name}_{opendrive_hash[:16]}.npz")
+
+    def _build(self, carla_map, opendrive_hash: str) -> MapTopology:
+        spawn_points = carla_map.get_spawn_points()
+        spawn_waypoints = [carla_map.get_waypoint(p.location) for p in spawn_points]
+        junctions = [w for w in carla_map.generate_waypoints(self.waypoint_spacing) if w.is_intersection]
+
+        return MapTopology(
+            map_name=carla_map.name,
+            opendrive_hash=opendrive_hash,
+            spawn_points=np.array([_transform_row(p) for p in spawn_points], dtype=np.float64).reshape(-1, 6),
+            spawn_road_ids=np.array([w.road_id for w in spawn_waypoints], dtype=np.int32),
+            spawn_lane_ids=np.array([w.lane_id for w in spawn_waypoints], dtype=np.int32),
+            spawn_lane_types=np.array([int(w.lane_type) for w in spawn_waypoints], dtype=np.int32),
+            spawn_is_junction=np.array([w.is_junction for w in spawn_waypoints], dtype=bool),
+            intersections=np.array([_transform_row(w.transform) for w in junctions], dtype=np.float64).reshape(-1, 6),
+            intersection_road_ids=np.array([w.road_id for w in junctions], dtype=np.int32),
+            intersection_lane_ids=np.array([w.lane_id for w in junctions], dtype=np.int32)
+        )
+
+    def _load(self, path: str, map_name: str, opendrive_hash: str) -> Optional[MapTopology]:
+        if not os.path.exists(path):
+            return None
+        try:
+            start_time = time.perf_counter()
+            with np.load(path) as data:
+                if str(data['opendrive_hash']) != opendrive_hash:
+                    return None
+                topology = MapTopology(
+                    map_name=map_name,
+                    opendrive_hash=opendrive_hash,
+                    **{name: data[name] for name in MapTopology.__dataclass_fields__
+                       if name not in ('map_name', 'opendrive_hash')}
+                )
+            logging.info(f"Loaded topology for {map_name} in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+            return topology
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable topology cache {path}: {e}")
+            return None
+
+    def _save(self, path: str, topology: MapTopology) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fields = {name: getattr(topology, name) for name in MapTopology.__dataclass_fields__
+                      if name != 'map_name'}
+            # Write beside the target and rename so readers never see a partial file
+            tmp_path = f"{path}.tmp.npz"
+            np.savez_compressed(tmp_path, **fields)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.error(f"Error saving topology cache {path}: {e}")
@@ -0,0 +1,157 @@
+from typing import Dict, Iterable, Sequence
+import numpy as np
+import numpy.typing as npt
+from ..data_structures import ObjectList, PointCloudData
+
+# One detected object as exchanged over V2V, packed to 34 bytes
+OBJECT_DTYPE = np.dtype([
+    ('center', np.float32, (3,)),  # world position of the cluster centroid
+    ('size', np.float32, (3,)),  # axis-aligned bounding box extent in meters
+    ('tag', np.uint8),  # CARLA semantic tag
+    ('observers', np.uint8),  # vehicles that saw the object, 1 before fusion
+    ('num_points', np.uint32),
+    ('source', np.int32),  # vehicle contributing the most points
+])
+
+# CARLA 0.9.14+ semantic tags for unlabeled, road, sidewalk, terrain, sky,
+# road line, ground and rail track (0.9.13 and earlier used 0, 7, 8, 22, 13, 6, 14, 16)
+DEFAULT_IGNORE_TAGS = (0, 1, 2, 10, 11, 24, 25, 27)
+
+# Half of the 8-neighbourhood, so each pair of adjacent cells is linked once
+_HALF_NEIGHBOURS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def _grid_components(cells: npt.NDArray[np.int64], groups: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    """Label 8-connected occupied 2D grid cells within each group
+
+    Returns a component index per input row. Rows sharing a cell share a component.
+    """
+    # Pad by one cell on each side so neighbour offsets never wrap into the next row or group
+    cells = cells - cells.min(axis=0) + 1
+    width = int(cells[:, 1].max()) + 2
+    height = (int(cells[:, 0].max()) + 2) * width
+    keys = groups * height + cells[:, 0] * width + cells[:, 1]
+    occupied, cell_of_row = np.unique(keys, return_inverse=True)
+    m = len(occupied)
+
+    first, second = [], []
+    for dx, dy in _HALF_NEIGHBOURS:
+        targets = occupied + dx * width + dy
+        idx = np.minimum(np.searchsorted(occupied, targets), m - 1)
+        found = np.flatnonzero(occupied[idx] == targets)
+        first.append(found)
+        second.append(idx[found])
+    a, b = np.concatenate(first), np.concatenate(second)
+
+    # Union-find over the adjacency edges: hook larger roots onto smaller, then compress
+    labels = np.arange(m)
+    while len(a):
+        la, lb = labels[a], labels[b]
+        differ = la != lb
+        if not differ.any():
+            break
+        np.minimum.at(labels, np.maximum(la, lb)[differ], np.minimum(la, lb)[differ])
+        while True:
+            compressed = labels[labels]
+            if np.array_equal(compressed, labels):
+                break
+            labels = compressed
+
+    _, component = np.unique(labels, return_inverse=True)
+    return component[cell_of_row.ravel()]
+
+
+def _aggregate(component: npt.NDArray[np.int64], lows: npt.NDArray[np.float32],
+               highs: npt.NDArray[np.float32], weights: npt.NDArray, tags: npt.NDArray,
+               observers: npt.NDArray, sources: npt.NDArray) -> npt.NDArray:
+    """Reduce rows sharing a component into one object each"""
+    # Sort by component, heaviest row first, so the first row of each run names the source
+    order = np.lexsort((-np.asarray(weights, dtype=np.float64), component))
+    component = component[order]
+    starts = np.flatnonzero(np.r_[True, component[1:] != component[:-1]])
+
+    weights = weights[order].astype(np.float64)
+    totals = np.add.reduceat(weights, starts)
+    centers = np.add.reduceat((lows[order] + highs[order]) * 0.5 * weights[:, None], starts) / totals[:, None]
+    low = np.minimum.reduceat(lows[order], starts)
+    high = np.maximum.reduceat(highs[order], starts)
+
+    objects = np.empty(len(starts), dtype=OBJECT_DTYPE)
+    objects['center'] = centers
+    objects['size'] = high - low
+    objects['tag'] = tags[order][starts]
+    objects['observers'] = np.minimum(np.add.reduceat(observers[order].astype(np.int64), starts), 255)
+    objects['num_points'] = totals
+    objects['source'] = sources[order][starts]
+    return objects
+
+
+class ObjectClusterer:
+    """Turns semantic lidar frames into compact per-vehicle object lists"""
+
+    def __init__(self, cell_size: float = 0.5, min_points: int = 5,
+                 ignore_tags: Sequence[int] = DEFAULT_IGNORE_TAGS, merge_distance: float = 1.5):
+        self.cell_size = cell_size
+        self.min_points = min_points
+        self.ignore_tags = np.asarray(ignore_tags, dtype=np.int32)
+        self.merge_distance = merge_distance
+        self._cache: Dict[int, ObjectList] = {}  # source vehicle -> last clustered frame
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'ObjectClusterer':
+        return cls(
+            cell_size=config.get('cell_size', 0.5),
+            min_points=config.get('min_points', 5),
+            ignore_tags=config.get('ignore_tags', DEFAULT_IGNORE_TAGS),
+            merge_distance=config.get('merge_distance', 1.5)
+        )
+
+    def cluster(self, cloud: PointCloudData, transform_matrix: npt.NDArray[np.float32]) -> ObjectList:
+        """Cluster one semantic lidar frame into world-frame objects, reusing the result per frame"""
+        cached = self._cache.get(cloud.source_vehicle)
+        if cached is not None and cloud.frame >= 0 and cached.frame == cloud.frame:
+            return cached
+
+        objects = np.empty(0, dtype=OBJECT_DTYPE)
+        keep = ~np.isin(cloud.tags, self.ignore_tags) if cloud.tags is not None else None
+        if keep is not None and keep.any():
+            points = cloud.points[keep] @ transform_matrix[:3, :3].T + transform_matrix[:3, 3]
+            points = points.astype(np.float32, copy=False)
+            tags = cloud.tags[keep].astype(np.int64)
+            cells = np.floor(points[:, :2] / self.cell_size).astype(np.int64)
+            component = _grid_components(cells, tags)
+
+            ones = np.ones(len(points), dtype=np.int64)
+            objects = _aggregate(component, points, points, ones, tags, ones,
+                                 np.full(len(points), cloud.source_vehicle, dtype=np.int32))
+            objects = objects[objects['num_points'] >= self.min_points]
+
+        result = ObjectList(objects=objects, source_vehicle=cloud.source_vehicle,
+                            frame=cloud.frame, sensor_timestamp=cloud.sensor_timestamp)
+        self._cache[cloud.source_vehicle] = result
+        return result
+
+    def fuse(self, object_lists: Iterable[ObjectList]) -> ObjectList:
+        """Merge object lists from several vehicles, joining same-class objects closer than merge_distance"""
+        lists = [o for o in object_lists if o is not None and len(o.objects)]
+        if not lists:
+            return ObjectList(objects=np.empty(0, dtype=OBJECT_DTYPE), source_vehicle=-1)
+
+        objects = np.concatenate([o.objects for o in lists])
+        half = objects['size'] * 0.5
+        cells = np.floor(objects['center'][:, :2] / self.merge_distance).astype(np.int64)
+        component = _grid_components(cells, objects['tag'].astype(np.int64))
+        fused = _aggregate(component, objects['center'] - half, objects['center'] + half,
+                           objects['num_points'], objects['tag'], objects['observers'], objects['source'])
+        # Count distinct reporting vehicles rather than merged objects
+        pairs = np.unique(np.stack([component, objects['source'].astype(np.int64)], axis=1), axis=0)
+        fused['observers'] = np.minimum(np.bincount(pairs[:, 0], minlength=len(fused)), 255)
+        return ObjectList(
+            objects=fused,
+            source_vehicle=-1,
+            frame=max(o.frame for o in lists),
+            sensor_timestamp=max(o.sensor_timestamp for o in lists)
+        )
+
+    def forget(self, vehicle_id: int) -> None:
+        self._cache.pop(vehicle_id, None)
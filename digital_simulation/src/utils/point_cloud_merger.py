@@ -95,13 +95,19 @@ class PointCloudMerger:
             last_update=datetime.now()
         )
 
-    def _transform_vehicle_points(self, vehicle_state: VehicleState) -> Optional[PointCloudData]:
+    def world_points(self, vehicle_state: VehicleState,
+                     sensor_type: str = 'semantic_lidar') -> Optional[PointCloudData]:
+        """A vehicle's point cloud in world coordinates; points view a reused buffer"""
+        return self._transform_vehicle_points(vehicle_state, sensor_type)
+
+    def _transform_vehicle_points(self, vehicle_state: VehicleState,
+                                  sensor_type: str = 'semantic_lidar') -> Optional[PointCloudData]:
         """Transform point cloud with pre-allocated buffers"""
         try:
-            if 'semantic_lidar' not in vehicle_state.point_cloud_cache:
+            if sensor_type not in vehicle_state.point_cloud_cache:
                 return None
             
-            cloud = vehicle_state.point_cloud_cache['semantic_lidar']
+            cloud = vehicle_state.point_cloud_cache[sensor_type]
             if cloud is None or len(cloud.points) == 0:
                 return None
             
@@ -116,7 +122,7 @@ class PointCloudMerger:
             # Create or reuse buffers
             if buffer_key not in self._points_buffer:
                 self._points_buffer[buffer_key] = np.zeros((points_count, 4), dtype=np.float32)
-                self._transformed_buffer[buffer_key] = np.zeros((points_count, 3), dtype=np.float32)
+                self._transformed_buffer[buffer_key] = np.zeros((points_count, 4), dtype=np.float32)
             
             # Reuse existing buffer
             homogeneous_points = self._points_buffer[buffer_key]
@@ -133,7 +139,9 @@ class PointCloudMerger:
                 points=transformed_points[:, :3],  # View, not copy
                 timestamps=cloud.timestamps,
                 tags=cloud.tags,
-                source_vehicle=vehicle_state.vehicle_id
+                source_vehicle=vehicle_state.vehicle_id,
+                frame=cloud.frame,
+                sensor_timestamp=cloud.sensor_timestamp
             )
             
         except Exception as e:
@@ -0,0 +1,124 @@
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence, Tuple
+import numpy as np
+import open3d as o3d
+from ..data_structures import PointCloudData
+
+# Queue item that tells a writer thread to exit
+_STOP = object()
+
+# File extension per supported output format
+FORMATS = {'pcd': 'pcd', 'npy': 'npy'}
+
+
+class PointCloudSink:
+    """Writes per-vehicle point cloud frames to disk from a pool of background threads
+
+    Frames go through a bounded queue and are dropped, not waited on, when
+    the writers fall behind. Each vehicle keeps at most max_files_per_vehicle
+    files; the oldest are deleted as new ones are written.
+    """
+
+    def __init__(self, directory: str, formats: Sequence[str] = ('pcd',), max_files_per_vehicle: int = 1000,
+                 workers: int = 2, queue_size: int = 32, sensors: Optional[Sequence[str]] = None):
+        unknown = [f for f in formats if f not in FORMATS]
+        if unknown:
+            logging.warning(f"Ignoring unsupported point cloud formats: {unknown}")
+        self.directory = directory
+        self.formats = [f for f in formats if f in FORMATS]
+        self.max_files_per_vehicle = max_files_per_vehicle
+        self.sensors = set(sensors) if sensors is not None else None
+        self.queue: 'queue.Queue' = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._files: Dict[int, Deque[str]] = {}  # vehicle_id -> written files, oldest first
+        self._last_frames: Dict[Tuple[int, str], int] = {}
+        self._workers = [threading.Thread(target=self._run, name=f"pointcloud-writer-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+        for worker in self._workers:
+            worker.start()
+
+    @classmethod
+    def from_config(cls, directory: str, config: Dict) -> 'PointCloudSink':
+        return cls(directory, **{k: v for k, v in config.items() if k != 'enabled'})
+
+    def submit(self, vehicle_id: int, sensor_type: str, cloud: PointCloudData) -> bool:
+        """Queue one frame once per vehicle, sensor and frame; False if skipped or dropped
+
+        The cloud's points must not be modified after submission.
+        """
+        if not self.formats or (self.sensors is not None and sensor_type not in self.sensors):
+            return False
+        if cloud is None or len(cloud.points) == 0:
+            return False
+        key = (vehicle_id, sensor_type)
+        if cloud.frame >= 0 and self._last_frames.get(key) == cloud.frame:
+            return False
+        self._last_frames[key] = cloud.frame
+
+        try:
+            self.queue.put_nowait((vehicle_id, sensor_type, cloud))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logging.warning(f"Point cloud writers are behind, {self.dropped} frames dropped so far")
+            return False
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write out queued frames and stop the writer threads"""
+        alive = [worker for worker in self._workers if worker.is_alive()]
+        for _ in alive:
+            self.queue.put(_STOP)
+        for worker in alive:
+            worker.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            self._write(*item)
+
+    def _write(self, vehicle_id: int, sensor_type: str, cloud: PointCloudData) -> None:
+        vehicle_dir = os.path.join(self.directory, f"vehicle_{vehicle_id}", "pointcloud")
+        frame = cloud.frame if cloud.frame >= 0 else int(cloud.sensor_timestamp * 1000)
+        for fmt in self.formats:
+            path = os.path.join(vehicle_dir, f"{sensor_type}_{frame:08d}.{FORMATS[fmt]}")
+            try:
+                os.makedirs(vehicle_dir, exist_ok=True)
+                if fmt == 'npy':
+                    # Raw float32 Nx3 dump, no conversion
+                    np.save(path, cloud.points)
+                else:
+                    pcd = o3d.geometry.PointCloud()
+                    pcd.points = o3d.utility.Vector3dVector(cloud.points.astype(np.float64))
+                    o3d.io.write_point_cloud(path, pcd, write_ascii=False)
+            except Exception as e:
+                logging.error(f"Error writing point cloud {path}: {e}")
+                continue
+            self._track(vehicle_id, vehicle_dir, path)
+
+    def _track(self, vehicle_id: int, vehicle_dir: str, path: str) -> None:
+        """Record a written file and delete the vehicle's oldest files beyond the cap"""
+        with self._lock:
+            files = self._files.get(vehicle_id)
+            if files is None:
+                # Files left by an earlier run count towards the cap too
+                existing = sorted((os.path.join(vehicle_dir, name) for name in os.listdir(vehicle_dir)),
+                                  key=os.path.getmtime)
+                files = self._files[vehicle_id] = deque(p for p in existing if p != path)
+            files.append(path)
+            self.written += 1
+            stale = [files.popleft() for _ in range(max(0, len(files) - self.max_files_per_vehicle))]
+        for old in stale:
+            try:
+                os.remove(old)
+            except OSError as e:
+                logging.warning(f"Could not delete old point cloud {old}: {e}")
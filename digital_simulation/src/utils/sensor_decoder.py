@@ -0,0 +1,75 @@
+import time
+import numpy as np
+from typing import Any, Dict, Optional
+from ..data_structures import PointCloudData
+
+# Raw point layouts of the CARLA lidar sensors
+LIDAR_DTYPE = np.dtype([('x', np.float32), ('y', np.float32), ('z', np.float32),
+                        ('intensity', np.float32)])
+SEMANTIC_LIDAR_DTYPE = np.dtype([('x', np.float32), ('y', np.float32), ('z', np.float32),
+                                 ('cos_inc_angle', np.float32), ('object_idx', np.uint32),
+                                 ('object_tag', np.uint32)])
+
+POINT_CLOUD_SENSORS = ('lidar', 'semantic_lidar')
+
+
+def _vector_to_dict(vector) -> Dict[str, float]:
+    return {'x': float(vector.x), 'y': float(vector.y), 'z': float(vector.z)}
+
+
+def decode_point_cloud(data, vehicle_id: int, sensor_type: str) -> Optional[PointCloudData]:
+    """Convert a lidar measurement into a PointCloudData with one vectorized pass"""
+    dtype = SEMANTIC_LIDAR_DTYPE if sensor_type == 'semantic_lidar' else LIDAR_DTYPE
+    raw = np.frombuffer(data.raw_data, dtype=dtype)
+    if len(raw) == 0:
+        return None
+
+    points = np.empty((len(raw), 3), dtype=np.float32)
+    points[:, 0] = raw['x']
+    points[:, 1] = raw['y']
+    points[:, 2] = raw['z']
+
+    return PointCloudData(
+        points=points,
+        timestamps=np.full(len(raw), time.time(), dtype=np.float32),
+        tags=raw['object_tag'].astype(np.int32) if sensor_type == 'semantic_lidar' else None,
+        source_vehicle=vehicle_id,
+        frame=int(getattr(data, 'frame', -1)),
+        sensor_timestamp=float(getattr(data, 'timestamp', 0.0))
+    )
+
+
+def decode_sensor_data(sensor_type: str, data, vehicle_id: int = -1) -> Any:
+    """Convert a raw carla.SensorData into its final numpy/primitive form"""
+    if sensor_type in POINT_CLOUD_SENSORS:
+        return decode_point_cloud(data, vehicle_id, sensor_type)
+    if sensor_type == 'imu':
+        return {
+            'accelerometer': _vector_to_dict(data.accelerometer),
+            'gyroscope': _vector_to_dict(data.gyroscope),
+            'compass': float(data.compass),
+            'timestamp': float(data.timestamp)
+        }
+    if sensor_type == 'gnss':
+        return {
+            'altitude': float(data.altitude),
+            'latitude': float(data.latitude),
+            'longitude': float(data.longitude),
+            'timestamp': float(data.timestamp)
+        }
+    if sensor_type == 'collision':
+        other = data.other_actor
+        return {
+            'other_actor_id': int(other.id) if other is not None else None,
+            'other_actor_type': other.type_id if other is not None else None,
+            'normal_impulse': _vector_to_dict(data.normal_impulse),
+            'frame': int(data.frame),
+            'timestamp': float(data.timestamp)
+        }
+    if sensor_type == 'lane_invasion':
+        return {
+            'crossed_lane_markings': [str(marking.type) for marking in data.crossed_lane_markings],
+            'frame': int(data.frame),
+            'timestamp': float(data.timestamp)
+        }
+    return data
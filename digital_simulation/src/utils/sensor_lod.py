@@ -0,0 +1,161 @@
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+@dataclass(frozen=True)
+class LidarLODLevel:
+    points_per_second: int
+    channels: int
+    frame_skip: int = 0  # frames dropped between kept frames
+
+    @property
+    def effective_points_per_second(self) -> float:
+        return self.points_per_second / (self.frame_skip + 1)
+
+    def same_resolution(self, other: 'LidarLODLevel') -> bool:
+        return (self.points_per_second == other.points_per_second and
+                self.channels == other.channels)
+
+
+@dataclass
+class LODChange:
+    vehicle_id: int
+    old_level: int
+    new_level: int
+    reason: str
+
+
+class LidarLODController:
+    """Chooses a lidar level of detail per vehicle from tick pressure, dashboards and proximity"""
+
+    def __init__(self, levels: List[LidarLODLevel], near_distance: float = 20.0,
+                 far_distance: float = 60.0, overrun_ratio: float = 1.0,
+                 recover_ratio: float = 0.7, min_hold_ticks: int = 40,
+                 smoothing: float = 0.1):
+        if not levels:
+            raise ValueError("At least one lidar LOD level is required")
+        self.levels = levels
+        self.near_distance = near_distance
+        self.far_distance = far_distance
+        self.overrun_ratio = overrun_ratio
+        self.recover_ratio = recover_ratio
+        self.min_hold_ticks = min_hold_ticks
+        self.smoothing = smoothing
+
+        self.tick = 0
+        self.load = 0.0  # smoothed tick time / tick budget
+        self.pressure = 0  # extra levels shed fleet-wide under overrun
+        self._pressure_changed_tick = 0
+        self.vehicle_levels: Dict[int, int] = {}
+        self._level_changed_tick: Dict[int, int] = {}
+
+    @classmethod
+    def from_config(cls, lidar_config: Dict) -> 'LidarLODController':
+        lod_config = lidar_config.get('lod', {})
+        levels = [LidarLODLevel(int(lidar_config['points_per_second']), int(lidar_config['channels']))]
+        levels += [
+            LidarLODLevel(int(level['points_per_second']), int(level['channels']),
+                          int(level.get('frame_skip', 0)))
+            for level in lod_config.get('levels', [])
+        ]
+        return cls(
+            levels,
+            near_distance=lod_config.get('near_distance', 20.0),
+            far_distance=lod_config.get('far_distance', 60.0),
+            overrun_ratio=lod_config.get('overrun_ratio', 1.0),
+            recover_ratio=lod_config.get('recover_ratio', 0.7),
+            min_hold_ticks=lod_config.get('min_hold_ticks', 40)
+        )
+
+    @property
+    def max_level(self) -> int:
+        return len(self.levels) - 1
+
+    def level_info(self, level: int) -> Dict:
+        """Describe a level for consumers of the lidar data"""
+        info = asdict(self.levels[level])
+        info['level'] = level
+        info['effective_points_per_second'] = self.levels[level].effective_points_per_second
+        return info
+
+    def update(self, tick_time: float, tick_budget: float, watched_ids: Iterable[int],
+               positions: Dict[int, Tuple[float, float, float]],
+               neighbours: Optional[Sequence[Tuple[float, float, float]]] = None) -> List[LODChange]:
+        """Advance one tick and return the per-vehicle level changes to apply
+
+        positions are the vehicles whose lidar is controlled; neighbours are
+        the other vehicles around them, such as background traffic, which
+        count for proximity but get no level of their own.
+        """
+        self.tick += 1
+        self._update_pressure(tick_time / tick_budget if tick_budget > 0 else 0.0)
+
+        watched = set(watched_ids)
+        nearest = self._nearest_distances(positions, neighbours)
+        changes = []
+
+        for vehicle_id, distance in nearest.items():
+            if vehicle_id in watched:
+                base, reason = 0, "dashboard open"
+            elif distance < self.near_distance:
+                base, reason = 0, f"vehicle within {distance:.0f}m"
+            elif distance < self.far_distance:
+                base, reason = 1, f"nearest vehicle {distance:.0f}m"
+            else:
+                base, reason = 2, "no nearby vehicles"
+            if self.pressure:
+                reason += f", tick load {self.load:.2f}"
+            target = min(base + self.pressure, self.max_level)
+
+            # Sensors are spawned at full resolution
+            current = self.vehicle_levels.setdefault(vehicle_id, 0)
+            if current == target:
+                continue
+            # Hold each level for a while so respawning lidars does not thrash
+            last_change = self._level_changed_tick.get(vehicle_id)
+            if last_change is not None and self.tick - last_change < self.min_hold_ticks:
+                continue
+
+            self.vehicle_levels[vehicle_id] = target
+            self._level_changed_tick[vehicle_id] = self.tick
+            changes.append(LODChange(vehicle_id, current, target, reason))
+
+        for vehicle_id in set(self.vehicle_levels) - set(nearest):
+            self.forget(vehicle_id)
+
+        return changes
+
+    def forget(self, vehicle_id: int) -> None:
+        self.vehicle_levels.pop(vehicle_id, None)
+        self._level_changed_tick.pop(vehicle_id, None)
+
+    def _update_pressure(self, load: float) -> None:
+        self.load += self.smoothing * (load - self.load)
+        if self.tick - self._pressure_changed_tick < self.min_hold_ticks:
+            return
+        if self.load > self.overrun_ratio and self.pressure < self.max_level:
+            self.pressure += 1
+            self._pressure_changed_tick = self.tick
+        elif self.load < self.recover_ratio and self.pressure > 0:
+            self.pressure -= 1
+            self._pressure_changed_tick = self.tick
+
+    @staticmethod
+    def _nearest_distances(positions: Dict[int, Tuple[float, float, float]],
+                           neighbours: Optional[Sequence[Tuple[float, float, float]]] = None) -> Dict[int, float]:
+        """Distance from each vehicle to its nearest other vehicle or neighbour in one vectorized pass"""
+        if not positions:
+            return {}
+        ids = list(positions.keys())
+        coords = np.asarray([positions[vid][:2] for vid in ids], dtype=np.float32)
+        others = coords
+        if neighbours:
+            others = np.concatenate([coords, np.asarray([p[:2] for p in neighbours], dtype=np.float32)])
+        if len(others) == 1:
+            return {ids[0]: float('inf')}
+        diff = coords[:, None, :] - others[None, :, :]
+        dist = np.einsum('ijk,ijk->ij', diff, diff)
+        # The first len(ids) columns are the vehicles themselves
+        np.fill_diagonal(dist, np.inf)
+        return dict(zip(ids, np.sqrt(dist.min(axis=1)).tolist()))
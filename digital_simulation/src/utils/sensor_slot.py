@@ -0,0 +1,34 @@
+from itertools import count
+from typing import Any, Optional, Tuple
+
+
+class SensorSlot:
+    """Latest-value slot written by one sensor callback thread and read by any number of readers.
+
+    The writer publishes by swapping a single (sequence, value) tuple reference, which is
+    atomic under the GIL, so readers never take a lock and never see a torn pair.
+    """
+
+    __slots__ = ('_latest', '_sequence')
+
+    def __init__(self):
+        self._latest: Tuple[int, Any] = (0, None)
+        self._sequence = count(1)
+
+    def publish(self, value: Any) -> int:
+        """Publish a new value, returning its sequence number"""
+        seq = next(self._sequence)
+        self._latest = (seq, value)
+        return seq
+
+    def read(self) -> Tuple[int, Any]:
+        """Return the latest (sequence, value) pair; sequence 0 means nothing published yet"""
+        return self._latest
+
+    @property
+    def sequence(self) -> int:
+        return self._latest[0]
+
+    @property
+    def value(self) -> Optional[Any]:
+        return self._latest[1]
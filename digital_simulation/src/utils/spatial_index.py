@@ -0,0 +1,140 @@
+import math
+from typing import Optional, Tuple
+import numpy as np
+import numpy.typing as npt
+
+# Grids with at most this many cells use 16-bit keys, which numpy sorts with a linear-time radix sort
+_RADIX_CELLS = np.iinfo(np.uint16).max + 1
+
+
+class SpatialIndex:
+    """Sorted 2D grid hash over a point cloud for nearest, corridor and box queries
+
+    Points are bucketed by x/y cell and a sort order by cell key is kept,
+    with the key laid out x-major so every column of cells in a query box is
+    one contiguous run of the order. The points themselves are never
+    reordered; queries gather just their candidates. Built once per frame and
+    shared by every ego.
+    """
+
+    def __init__(self, points: npt.NDArray[np.float32], cell_size: float = 2.0):
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        self.num_points = len(points)
+        # Contiguous columns for the key computation; z is only read for query candidates
+        x, y = np.ascontiguousarray(points[:, 0]), np.ascontiguousarray(points[:, 1])
+        self.x, self.y, self.z = x, y, points[:, 2]
+
+        if self.num_points == 0:
+            self.cell_size, self.origin, self.shape = cell_size, (0.0, 0.0), (1, 1)
+            self.starts = np.zeros(2, dtype=np.int64)
+            self.order = np.empty(0, dtype=np.intp)
+            return
+
+        self.origin = (float(x.min()), float(y.min()))
+        extent_x, extent_y = float(x.max()) - self.origin[0], float(y.max()) - self.origin[1]
+        # Coarsen the grid for very spread out clouds so keys still fit the radix sort
+        self.cell_size = cell_size
+        while True:
+            nx = int(extent_x / self.cell_size) + 1
+            ny = int(extent_y / self.cell_size) + 1
+            if nx * ny <= _RADIX_CELLS:
+                break
+            self.cell_size *= 1.25
+        self.shape = (nx, ny)
+
+        inv = 1.0 / self.cell_size
+        # Clip since float32 rounding can push the farthest point one cell past the grid
+        ix = np.minimum(((x - self.origin[0]) * inv).astype(np.int32), nx - 1)
+        iy = np.minimum(((y - self.origin[1]) * inv).astype(np.int32), ny - 1)
+        keys = (ix * ny + iy).astype(np.uint16)
+
+        self.order = np.argsort(keys, kind='stable')
+        self.starts = np.zeros(nx * ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=nx * ny), out=self.starts[1:])
+
+    def box_indices(self, lo: Tuple[float, float], hi: Tuple[float, float]) -> npt.NDArray[np.int64]:
+        """Indices of the points in cells overlapping an x/y box"""
+        if self.num_points == 0:
+            return np.empty(0, dtype=np.int64)
+        nx, ny = self.shape
+        inv = 1.0 / self.cell_size
+        ix0 = max(int((lo[0] - self.origin[0]) * inv), 0)
+        ix1 = min(int((hi[0] - self.origin[0]) * inv), nx - 1)
+        iy0 = max(int((lo[1] - self.origin[1]) * inv), 0)
+        iy1 = min(int((hi[1] - self.origin[1]) * inv), ny - 1)
+        if ix0 > ix1 or iy0 > iy1:
+            return np.empty(0, dtype=np.int64)
+
+        # Each x column of cells is one contiguous run of the order
+        columns = np.arange(ix0, ix1 + 1) * ny
+        begins = self.starts[columns + iy0]
+        ends = self.starts[columns + iy1 + 1]
+        lengths = ends - begins
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return self.order[np.repeat(begins, lengths) + offsets]
+
+    def query_box(self, lo: Tuple[float, ...], hi: Tuple[float, ...]) -> npt.NDArray[np.float32]:
+        """Points inside an axis-aligned box; z bounds are optional"""
+        idx = self.box_indices(lo, hi)
+        x, y, z = self.x[idx], self.y[idx], self.z[idx]
+        inside = (x >= lo[0]) & (x <= hi[0]) & (y >= lo[1]) & (y <= hi[1])
+        if len(lo) > 2:
+            inside &= (z >= lo[2]) & (z <= hi[2])
+        return np.stack([x[inside], y[inside], z[inside]], axis=1)
+
+    def nearest(self, point: Tuple[float, float, float], max_distance: float = 100.0,
+                z_range: Optional[Tuple[float, float]] = None) -> Tuple[float, Optional[npt.NDArray[np.float32]]]:
+        """Closest point in x/y to point within max_distance, searching outwards ring by ring"""
+        px, py = float(point[0]), float(point[1])
+        radius = self.cell_size
+        while True:
+            radius = min(radius, max_distance)
+            idx = self.box_indices((px - radius, py - radius), (px + radius, py + radius))
+            if z_range is not None and len(idx):
+                idx = idx[(self.z[idx] >= z_range[0]) & (self.z[idx] <= z_range[1])]
+            if len(idx):
+                dist2 = (self.x[idx] - px) ** 2 + (self.y[idx] - py) ** 2
+                best = int(np.argmin(dist2))
+                distance = math.sqrt(float(dist2[best]))
+                # A hit beyond the searched square could still be beaten just outside it
+                if distance <= radius or radius >= max_distance:
+                    if distance > max_distance:
+                        return float('inf'), None
+                    i = idx[best]
+                    return distance, np.array([self.x[i], self.y[i], self.z[i]], dtype=np.float32)
+                radius = distance
+                continue
+            if radius >= max_distance:
+                return float('inf'), None
+            radius *= 2
+
+    def query_corridor(self, origin: Tuple[float, float, float], yaw_degrees: float, length: float,
+                       half_width: float, start: float = 0.0,
+                       z_range: Optional[Tuple[float, float]] = None) -> Tuple[npt.NDArray[np.float32], npt.NDArray[np.float32]]:
+        """Points in a rectangle ahead of origin along yaw, with their forward distances"""
+        heading = math.radians(yaw_degrees)
+        c, s = math.cos(heading), math.sin(heading)
+        ox, oy = float(origin[0]), float(origin[1])
+        corners_x = [ox + c * f - s * l for f in (start, length) for l in (-half_width, half_width)]
+        corners_y = [oy + s * f + c * l for f in (start, length) for l in (-half_width, half_width)]
+
+        idx = self.box_indices((min(corners_x), min(corners_y)), (max(corners_x), max(corners_y)))
+        dx, dy = self.x[idx] - ox, self.y[idx] - oy
+        forward = dx * c + dy * s
+        lateral = -dx * s + dy * c
+        inside = (forward >= start) & (forward <= length) & (np.abs(lateral) <= half_width)
+        if z_range is not None:
+            z = self.z[idx]
+            inside &= (z >= z_range[0]) & (z <= z_range[1])
+        idx = idx[inside]
+        return np.stack([self.x[idx], self.y[idx], self.z[idx]], axis=1), forward[inside]
+
+    def obstacle_distance_ahead(self, origin: Tuple[float, float, float], yaw_degrees: float,
+                                length: float = 50.0, half_width: float = 1.2, start: float = 2.5,
+                                z_range: Optional[Tuple[float, float]] = None) -> float:
+        """Forward distance to the first point in the lane-width corridor ahead, inf if clear"""
+        _, forward = self.query_corridor(origin, yaw_degrees, length, half_width, start, z_range)
+        return float(forward.min()) if len(forward) else float('inf')
@@ -0,0 +1,292 @@
+"""Columnar on-disk store for vehicle state logs.
+
+Each vehicle gets a directory of fixed-size chunks, one .npy file per field,
+plus an index.json recording the frame and time range of every chunk. Range
+queries open only the overlapping chunks, memory-mapped, and binary search
+the frame column within them.
+
+Convert existing frame logs and JSON or NDJSON state logs with:
+    python -m src.utils.trajectory_store convert logs/ trajectories/
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import numpy.typing as npt
+from .log_reader import iter_vehicle_logs
+
+# Column name -> dtype, one row per logged vehicle state
+FIELDS: Dict[str, np.dtype] = {
+    'frame': np.dtype(np.int64),
+    'timestamp': np.dtype(np.float64),  # seconds since the epoch
+    'x': np.dtype(np.float32),
+    'y': np.dtype(np.float32),
+    'z': np.dtype(np.float32),
+    'pitch': np.dtype(np.float32),
+    'yaw': np.dtype(np.float32),
+    'roll': np.dtype(np.float32),
+    'vx': np.dtype(np.float32),
+    'vy': np.dtype(np.float32),
+    'vz': np.dtype(np.float32),
+    'speed': np.dtype(np.float32),  # km/h
+}
+
+INDEX_FILE = 'index.json'
+
+
+def _vehicle_dir(root: str, vehicle_id: int) -> str:
+    return os.path.join(root, f"vehicle_{vehicle_id}")
+
+
+class TrajectoryStoreWriter:
+    """Buffers per-vehicle rows in preallocated columns and writes them out a chunk at a time"""
+
+    def __init__(self, root: str, chunk_rows: int = 65536):
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self._buffers: Dict[int, Dict[str, npt.NDArray]] = {}
+        self._rows: Dict[int, int] = {}
+        self._indexes: Dict[int, List[Dict]] = {}
+        self._last_frames: Dict[int, int] = {}
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, root: str, config: Dict) -> 'TrajectoryStoreWriter':
+        return cls(root, config.get('chunk_rows', 65536))
+
+    def append(self, vehicle_id: int, frame: int, timestamp: float, location: Sequence[float],
+               rotation: Sequence[float], velocity: Sequence[float], speed: float) -> None:
+        """Add one state row; rows of a vehicle must arrive in increasing frame order
+
+        A row whose frame is not after the vehicle's last one, including the
+        chunks already on disk, is rejected so query() can binary search.
+        """
+        buffer = self._buffers.get(vehicle_id)
+        if buffer is None:
+            buffer = self._buffers[vehicle_id] = {
+                name: np.empty(self.chunk_rows, dtype=dtype) for name, dtype in FIELDS.items()
+            }
+            self._rows[vehicle_id] = 0
+            index = self._indexes[vehicle_id] = _load_index(_vehicle_dir(self.root, vehicle_id))
+            if index:
+                self._last_frames[vehicle_id] = max(chunk['frame_max'] for chunk in index)
+        last_frame = self._last_frames.get(vehicle_id)
+        if last_frame is not None and frame <= last_frame:
+            self.rejected += 1
+            if self.rejected % 100 == 1:
+                logging.warning(f"Trajectory row of vehicle {vehicle_id} at frame {frame} is not after frame "
+                                f"{last_frame}, rejected {self.rejected} so far")
+            return
+        self._last_frames[vehicle_id] = frame
+        row = self._rows[vehicle_id]
+        buffer['frame'][row] = frame
+        buffer['timestamp'][row] = timestamp
+        buffer['x'][row], buffer['y'][row], buffer['z'][row] = location[:3]
+        buffer['pitch'][row], buffer['yaw'][row], buffer['roll'][row] = rotation[:3]
+        buffer['vx'][row], buffer['vy'][row], buffer['vz'][row] = velocity[:3]
+        buffer['speed'][row] = speed
+        self._rows[vehicle_id] = row + 1
+        if row + 1 == self.chunk_rows:
+            self._write_chunk(vehicle_id)
+
+    def flush(self) -> None:
+        """Write every partially filled chunk as a short chunk of its own"""
+        for vehicle_id, rows in list(self._rows.items()):
+            if rows:
+                self._write_chunk(vehicle_id)
+
+    def _write_chunk(self, vehicle_id: int) -> None:
+        rows = self._rows[vehicle_id]
+        buffer = self._buffers[vehicle_id]
+        vehicle_dir = _vehicle_dir(self.root, vehicle_id)
+        index = self._indexes[vehicle_id]
+
+        name = f"chunk_{len(index):05d}"
+        try:
+            chunk_dir = os.path.join(vehicle_dir, name)
+            os.makedirs(chunk_dir, exist_ok=True)
+            for field, column in buffer.items():
+                np.save(os.path.join(chunk_dir, f"{field}.npy"), column[:rows])
+            index.append({
+                'name': name,
+                'rows': rows,
+                'frame_min': int(buffer['frame'][0]),
+                'frame_max': int(buffer['frame'][rows - 1]),
+                'time_min': float(buffer['timestamp'][:rows].min()),
+                'time_max': float(buffer['timestamp'][:rows].max()),
+            })
+            _save_index(vehicle_dir, index)
+        except Exception as e:
+            logging.error(f"Error writing trajectory chunk {name} for vehicle {vehicle_id}: {e}")
+        self._rows[vehicle_id] = 0
+
+
+class TrajectoryStore:
+    """Read-only access to a trajectory store by vehicle and frame or time range"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._indexes: Dict[int, List[Dict]] = {}
+
+    def vehicles(self) -> List[int]:
+        ids = []
+        for name in os.listdir(self.root):
+            if name.startswith('vehicle_') and os.path.exists(os.path.join(self.root, name, INDEX_FILE)):
+                ids.append(int(name[len('vehicle_'):]))
+        return sorted(ids)
+
+    def index(self, vehicle_id: int) -> List[Dict]:
+        if vehicle_id not in self._indexes:
+            self._indexes[vehicle_id] = _load_index(_vehicle_dir(self.root, vehicle_id))
+        return self._indexes[vehicle_id]
+
+    def frame_range(self, vehicle_id: int) -> Optional[Tuple[int, int]]:
+        index = self.index(vehicle_id)
+        if not index:
+            return None
+        return min(chunk['frame_min'] for chunk in index), max(chunk['frame_max'] for chunk in index)
+
+    def query(self, vehicle_id: int, fields: Optional[Iterable[str]] = None,
+              frames: Optional[Tuple[int, int]] = None,
+              times: Optional[Tuple[float, float]] = None) -> Dict[str, npt.NDArray]:
+        """Columns of a vehicle's rows with frames and times in the given inclusive ranges
+
+        Only chunks overlapping the ranges are opened, memory-mapped, and only
+        the matching rows are copied out.
+        """
+        fields = list(fields) if fields is not None else list(FIELDS)
+        unknown = [f for f in fields if f not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown trajectory fields: {unknown}")
+
+        vehicle_dir = _vehicle_dir(self.root, vehicle_id)
+        parts: Dict[str, list] = {field: [] for field in fields}
+        for chunk in self.index(vehicle_id):
+            if frames and (chunk['frame_max'] < frames[0] or chunk['frame_min'] > frames[1]):
+                continue
+            if times and (chunk['time_max'] < times[0] or chunk['time_min'] > times[1]):
+                continue
+            chunk_dir = os.path.join(vehicle_dir, chunk['name'])
+            lo, hi = 0, chunk['rows']
+            if frames:
+                # Frames are stored in order, so the range is one contiguous slice
+                frame = np.load(os.path.join(chunk_dir, 'frame.npy'), mmap_mode='r')
+                lo = int(np.searchsorted(frame, frames[0], side='left'))
+                hi = int(np.searchsorted(frame, frames[1], side='right'))
+            if hi <= lo:
+                continue
+            keep = None
+            if times:
+                timestamp = np.load(os.path.join(chunk_dir, 'timestamp.npy'), mmap_mode='r')[lo:hi]
+                keep = (timestamp >= times[0]) & (timestamp <= times[1])
+            for field in fields:
+                column = np.load(os.path.join(chunk_dir, f"{field}.npy"), mmap_mode='r')[lo:hi]
+                parts[field].append(np.array(column[keep] if keep is not None else column))
+
+        return {
+            field: np.concatenate(columns) if columns else np.empty(0, dtype=FIELDS[field])
+            for field, columns in parts.items()
+        }
+
+
+def _load_index(vehicle_dir: str) -> List[Dict]:
+    path = os.path.join(vehicle_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)['chunks']
+
+
+def _save_index(vehicle_dir: str, index: List[Dict]) -> None:
+    path = os.path.join(vehicle_dir, INDEX_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'fields': {name: dtype.str for name, dtype in FIELDS.items()}, 'chunks': index}, f)
+    os.replace(tmp_path, path)
+
+
+def _entry_row(entry: Dict, timestamp_format: str) -> Tuple:
+    own = entry['own_data']
+    location, rotation, velocity = own['location'], own['rotation'], own['velocity']
+    return (
+        datetime.strptime(entry['timestamp'], timestamp_format).timestamp(),
+        (location['x'], location['y'], location['z']),
+        (rotation['pitch'], rotation['yaw'], rotation['roll']),
+        (velocity['x'], velocity['y'], velocity['z']),
+        own['speed']
+    )
+
+
+def convert_logs(log_dir: str, store_dir: str, timestamp_format: str = "%Y%m%d_%H%M%S",
+                 chunk_rows: int = 65536) -> Dict[int, int]:
+    """Convert the frame log and every vehicle_*/state_log* file under log_dir
+
+    Returns rows accepted per vehicle. The sources are read one after the
+    other, so each vehicle's rows are buffered and stably sorted by frame
+    before writing. Entries logged without a frame number are numbered
+    -n..-1 in log order, ahead of and never colliding with real frames.
+    """
+    framed: Dict[int, List[Tuple[int, Tuple]]] = {}
+    frameless: Dict[int, List[Tuple]] = {}
+    for vehicle_id, entry in iter_vehicle_logs(log_dir):
+        try:
+            row = _entry_row(entry, timestamp_format)
+            frame = int(entry.get('frame', -1))
+        except (KeyError, TypeError, ValueError) as e:
+            logging.error(f"Skipping unreadable entry of vehicle {vehicle_id}: {e}")
+            continue
+        if frame < 0:
+            frameless.setdefault(vehicle_id, []).append(row)
+        else:
+            framed.setdefault(vehicle_id, []).append((frame, row))
+
+    writer = TrajectoryStoreWriter(store_dir, chunk_rows)
+    rows: Dict[int, int] = {}
+    for vehicle_id in sorted(set(framed) | set(frameless)):
+        legacy = frameless.pop(vehicle_id, [])
+        numbered = [(position - len(legacy), row) for position, row in enumerate(legacy)]
+        numbered.extend(sorted(framed.pop(vehicle_id, []), key=lambda item: item[0]))
+        rejected = writer.rejected
+        for frame, row in numbered:
+            writer.append(vehicle_id, frame, *row)
+        # Repeated frames, e.g. two runs logged into one directory, are rejected by the writer
+        rows[vehicle_id] = len(numbered) - (writer.rejected - rejected)
+    writer.flush()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar trajectory store tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help="Convert frame and state logs into a trajectory store")
+    convert.add_argument('log_dir')
+    convert.add_argument('store_dir')
+    convert.add_argument('--timestamp-format', default="%Y%m%d_%H%M%S")
+    convert.add_argument('--chunk-rows', type=int, default=65536)
+    query = commands.add_parser('query', help="Print one vehicle's columns over a frame range")
+    query.add_argument('store_dir')
+    query.add_argument('vehicle_id', type=int)
+    query.add_argument('--fields', nargs='+', default=['frame', 'speed'])
+    query.add_argument('--frames', nargs=2, type=int, metavar=('FIRST', 'LAST'))
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        rows = convert_logs(args.log_dir, args.store_dir, args.timestamp_format, args.chunk_rows)
+        for vehicle_id, count in sorted(rows.items()):
+            print(f"vehicle {vehicle_id}: {count} rows")
+        return 0
+
+    columns = TrajectoryStore(args.store_dir).query(args.vehicle_id, args.fields,
+                                                    tuple(args.frames) if args.frames else None)
+    print("\t".join(args.fields))
+    for row in zip(*(columns[field].tolist() for field in args.fields)):
+        print("\t".join(str(value) for value in row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set, Tuple
+import numpy as np
+import numpy.typing as npt
+
+TileKey = Tuple[int, int]
+
+_MAX_COUNT = np.iinfo(np.uint16).max
+
+# Queue item that tells the writer thread to exit
+_STOP = object()
+
+
+@dataclass
+class VoxelTile:
+    counts: npt.NDArray[np.uint16]  # (tile_voxels, tile_voxels, z_voxels) hit counts
+    occupied: npt.NDArray[np.int64]  # flat indices of voxels with at least one hit
+    last_used: int = 0  # map tick of the last update or query
+    dirty: bool = False  # changed since it was last written to disk
+
+
+class VoxelWorldMap:
+    """Persistent voxel occupancy map split into fixed-size tiles
+
+    Each tile covers tile_voxels x tile_voxels voxels in x/y and the full
+    z range, in absolute world z. At most max_resident_tiles tiles stay in
+    memory. Tiles far from every vehicle, unused for cold_ticks, or least
+    recently used once the cap is hit are handed to a writer thread, saved
+    to store_dir and loaded again on demand.
+    """
+
+    def __init__(self, store_dir: str, voxel_size: float = 0.5, tile_voxels: int = 64,
+                 z_min: float = -2.0, z_max: float = 6.0, max_resident_tiles: int = 256,
+                 evict_distance: float = 200.0, cold_ticks: int = 600, max_pending_writes: int = 64):
+        self.store_dir = store_dir
+        self.voxel_size = voxel_size
+        self.tile_voxels = tile_voxels
+        self.tile_size = voxel_size * tile_voxels
+        self.z_min = z_min
+        self.z_voxels = int(np.ceil((z_max - z_min) / voxel_size))
+        self.max_resident_tiles = max_resident_tiles
+        self.evict_distance = evict_distance
+        self.cold_ticks = cold_ticks
+
+        self.tiles: 'OrderedDict[TileKey, VoxelTile]' = OrderedDict()
+        self.tick = 0
+        self.tiles_written = 0
+        self.tiles_loaded = 0
+        self._last_frames: Dict[int, int] = {}
+        self._voxels_per_tile = tile_voxels * tile_voxels * self.z_voxels
+
+        # Tiles saved by earlier runs, so a miss on any other tile never touches the disk
+        self._on_disk: Set[TileKey] = self._scan_store()
+        # Tiles handed to the writer and not saved yet, taken back instead of loaded if needed again
+        self._pending: Dict[TileKey, tuple] = {}
+        self._pending_lock = threading.Lock()
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_pending_writes)
+        self._thread = threading.Thread(target=self._run, name="voxel-map-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, store_dir: str, config: Dict) -> 'VoxelWorldMap':
+        return cls(store_dir, **{k: v for k, v in config.items() if k not in ('enabled', 'sensor', 'directory')})
+
+    @property
+    def resident_bytes(self) -> int:
+        return len(self.tiles) * self._voxels_per_tile * np.dtype(np.uint16).itemsize
+
+    def integrate(self, points: npt.NDArray[np.float32], source: Optional[int] = None, frame: int = -1) -> int:
+        """Add a world-frame Nx3 cloud, once per source and frame; returns the number of points used"""
+        if source is not None and frame >= 0:
+            if self._last_frames.get(source) == frame:
+                return 0
+            self._last_frames[source] = frame
+        if len(points) == 0:
+            return 0
+
+        # Work on contiguous per-axis columns, which numpy reduces far faster than strided slices
+        vz = np.floor((points[:, 2] - self.z_min) / self.voxel_size).astype(np.int64)
+        inside = (vz >= 0) & (vz < self.z_voxels)
+        vx = np.floor(points[inside, 0] / self.voxel_size).astype(np.int64)
+        vy = np.floor(points[inside, 1] / self.voxel_size).astype(np.int64)
+        vz = vz[inside]
+        if len(vz) == 0:
+            return 0
+
+        tx, ty = vx // self.tile_voxels, vy // self.tile_voxels
+        origin_x, origin_y = int(tx.min()), int(ty.min())
+        span = int(ty.max()) - origin_y + 1
+        tile_slot = (tx - origin_x) * span + (ty - origin_y)
+        flat = ((vx - tx * self.tile_voxels) * self.tile_voxels + (vy - ty * self.tile_voxels)) \
+            * self.z_voxels + vz
+
+        # One sort gives the hit count of every distinct voxel, grouped by tile
+        voxel_keys, hits = np.unique(tile_slot * self._voxels_per_tile + flat, return_counts=True)
+        slots = int(tile_slot.max()) + 1
+        bounds = np.searchsorted(voxel_keys, np.arange(slots + 1) * self._voxels_per_tile)
+
+        for slot in range(slots):
+            lo, hi = bounds[slot], bounds[slot + 1]
+            if lo == hi:
+                continue
+            tile = self._get_tile((origin_x + slot // span, origin_y + slot % span), create=True)
+            index = voxel_keys[lo:hi] - slot * self._voxels_per_tile
+            counts = tile.counts.reshape(-1)
+            previous = counts[index]
+            counts[index] = np.minimum(previous + hits[lo:hi], _MAX_COUNT)
+            new = index[previous == 0]
+            if len(new):
+                tile.occupied = np.concatenate([tile.occupied, new])
+            tile.dirty = True
+
+        self._enforce_capacity()
+        return len(vz)
+
+    def occupied_within(self, center: Tuple[float, float, float], radius: float,
+                        min_count: int = 1) -> Tuple[npt.NDArray[np.float32], npt.NDArray[np.uint16]]:
+        """Centres (Mx3) and hit counts (M) of voxels with at least min_count hits within radius"""
+        cx, cy = float(center[0]), float(center[1])
+        lo = np.floor((np.array([cx, cy]) - radius) / self.tile_size).astype(int)
+        hi = np.floor((np.array([cx, cy]) + radius) / self.tile_size).astype(int)
+
+        centres, counts = [], []
+        for tx in range(lo[0], hi[0] + 1):
+            for ty in range(lo[1], hi[1] + 1):
+                tile = self._get_tile((tx, ty), create=False)
+                if tile is None:
+                    continue
+                # Only occupied voxels are visited, never the dense tile
+                index = tile.occupied
+                hits = tile.counts.reshape(-1)[index]
+                if min_count > 1:
+                    index, hits = index[hits >= min_count], hits[hits >= min_count]
+                column, iz = np.divmod(index, self.z_voxels)
+                ix, iy = np.divmod(column, self.tile_voxels)
+                x = (tx * self.tile_voxels + ix + 0.5) * self.voxel_size
+                y = (ty * self.tile_voxels + iy + 0.5) * self.voxel_size
+                near = (x - cx) ** 2 + (y - cy) ** 2 <= radius * radius
+                centres.append(np.stack([x[near], y[near], self.z_min + (iz[near] + 0.5) * self.voxel_size],
+                                        axis=1).astype(np.float32))
+                counts.append(hits[near])
+
+        self._enforce_capacity()
+        if not centres:
+            return np.empty((0, 3), dtype=np.float32), np.empty(0, dtype=np.uint16)
+        return np.concatenate(centres), np.concatenate(counts)
+
+    def evict(self, focus_positions: Iterable[Tuple[float, float, float]]) -> int:
+        """Advance one simulation tick and write out tiles far from every focus position or gone cold"""
+        self.tick += 1
+        focus = np.asarray([p[:2] for p in focus_positions], dtype=np.float64).reshape(-1, 2)
+        keys = list(self.tiles.keys())
+        if not keys:
+            return 0
+
+        centres = (np.asarray(keys, dtype=np.float64) + 0.5) * self.tile_size
+        if len(focus):
+            diff = centres[:, None, :] - focus[None, :, :]
+            far = np.sqrt(np.einsum('tfk,tfk->tf', diff, diff).min(axis=1)) > self.evict_distance
+        else:
+            far = np.ones(len(keys), dtype=bool)
+        cold = np.array([self.tick - self.tiles[key].last_used > self.cold_ticks for key in keys])
+
+        evicted = 0
+        for key in np.asarray(keys)[far | cold].tolist():
+            self._write_out(tuple(key))
+            evicted += 1
+        return evicted
+
+    def flush(self) -> None:
+        """Queue every dirty resident tile for saving without evicting it"""
+        for key, tile in self.tiles.items():
+            if tile.dirty:
+                self._submit(key, tile)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Save every dirty tile and stop the writer once the queued tiles are on disk"""
+        self.flush()
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'resident_tiles': len(self.tiles),
+            'resident_mb': self.resident_bytes // (1024 * 1024),
+            'tiles_written': self.tiles_written,
+            'tiles_loaded': self.tiles_loaded,
+        }
+
+    def _get_tile(self, key: TileKey, create: bool) -> Optional[VoxelTile]:
+        tile = self.tiles.get(key)
+        if tile is None:
+            with self._pending_lock:
+                pending = self._pending.get(key)
+            tile = pending[1] if pending is not None else self._load(key)
+            if tile is None:
+                if not create:
+                    return None
+                tile = VoxelTile(np.zeros((self.tile_voxels, self.tile_voxels, self.z_voxels), dtype=np.uint16),
+                                 np.empty(0, dtype=np.int64))
+            self.tiles[key] = tile
+        else:
+            self.tiles.move_to_end(key)
+        tile.last_used = self.tick
+        return tile
+
+    def _enforce_capacity(self) -> None:
+        while len(self.tiles) > self.max_resident_tiles:
+            self._write_out(next(iter(self.tiles)))
+
+    def _write_out(self, key: TileKey) -> None:
+        tile = self.tiles.pop(key)
+        if tile.dirty:
+            self._submit(key, tile)
+
+    def _tile_path(self, key: TileKey) -> str:
+        return os.path.join(self.store_dir, f"tile_{key[0]}_{key[1]}.npz")
+
+    def _scan_store(self) -> Set[TileKey]:
+        keys = set()
+        if not os.path.isdir(self.store_dir):
+            return keys
+        for name in os.listdir(self.store_dir):
+            parts = name[len('tile_'):-len('.npz')].split('_')
+            if name.startswith('tile_') and name.endswith('.npz') and len(parts) == 2:
+                try:
+                    keys.add((int(parts[0]), int(parts[1])))
+                except ValueError:
+                    continue  # Leftover temporary file
+        return keys
+
+    def _submit(self, key: TileKey, tile: VoxelTile) -> None:
+        """Snapshot the occupied voxels of a tile and hand them to the writer thread"""
+        occupied = np.sort(tile.occupied).astype(np.uint32)
+        item = (key, tile, occupied, tile.counts.reshape(-1)[occupied])
+        tile.dirty = False
+        with self._pending_lock:
+            self._pending[key] = item
+        self._on_disk.add(key)
+        # Waits for the writer when it is far behind rather than losing map data
+        self._queue.put(item)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            self._save(*item)
+            with self._pending_lock:
+                if self._pending.get(item[0]) is item:
+                    del self._pending[item[0]]
+
+    def _save(self, key: TileKey, tile: VoxelTile, occupied: npt.NDArray[np.uint32],
+              counts: npt.NDArray[np.uint16]) -> None:
+        """Store only occupied voxels, which keeps sparse tiles small on disk"""
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            path = self._tile_path(key)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez_compressed(tmp_path, index=occupied, counts=counts,
+                                shape=np.array(tile.counts.shape), voxel_size=self.voxel_size,
+                                z_min=self.z_min)
+            os.replace(tmp_path, path)
+            self.tiles_written += 1
+        except Exception as e:
+            logging.error(f"Error writing voxel tile {key}: {e}")
+
+    def _load(self, key: TileKey) -> Optional[VoxelTile]:
+        if key not in self._on_disk:
+            return None
+        path = self._tile_path(key)
+        try:
+            with np.load(path) as data:
+                shape = tuple(data['shape'].tolist())
+                if (shape != (self.tile_voxels, self.tile_voxels, self.z_voxels) or
+                        float(data['voxel_size']) != self.voxel_size or float(data['z_min']) != self.z_min):
+                    logging.warning(f"Ignoring voxel tile {path} written with a different layout")
+                    return None
+                occupied = data['index'].astype(np.int64)
+                counts = np.zeros(self._voxels_per_tile, dtype=np.uint16)
+                counts[occupied] = data['counts']
+            self.tiles_loaded += 1
+            return VoxelTile(counts.reshape(shape), occupied)
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable voxel tile {path}: {e}")
+            return None
@@ -6,33 +6,48 @@ from .data_structures import VehicleState
 import logging
 
 class VehicleManager:
-    def __init__(self, world: carla.World, client: carla.Client):
+    def __init__(self, world: carla.World, client: carla.Client, tm_port: int = 8000):
         self.world = world
         self.client = client
         self.vehicles: Dict[int, carla.Vehicle] = {}
+        self.background_vehicles: Dict[int, carla.Vehicle] = {}  # kinematics-only V2V participants
         self.blueprint_library = self.world.get_blueprint_library()
         self.sequential_mapping = {}  # Maps CARLA ID to sequential ID
         self.next_sequential_id = 1
         
         # Initialize traffic manager
-        self.traffic_manager = self.client.get_trafficmanager()
+        self.traffic_manager = self.client.get_trafficmanager(tm_port)
         self.traffic_manager.set_global_distance_to_leading_vehicle(2.5)
         self.traffic_manager.set_synchronous_mode(True)
         self.traffic_manager.global_percentage_speed_difference(10.0)
         
-    def spawn_vehicles(self, num_vehicles: int) -> List[carla.Vehicle]:
-        """Spawn vehicles close to each other"""
-        spawn_points = self.world.get_map().get_spawn_points()
-        if not spawn_points:
-            logging.error("No spawn points found")
+    def _sorted_spawn_points(self, spawn_points: Optional[List[carla.Transform]] = None) -> List[carla.Transform]:
+        """Spawn points sorted by distance to a random initial point"""
+        if spawn_points is None:
+            spawn_points = self.world.get_map().get_spawn_points()
+        if not len(spawn_points):
             return []
         
         # Pick a random initial spawn point
         initial_point = random.choice(spawn_points)
         
         # Sort spawn points by distance to initial point
-        sorted_points = sorted(spawn_points, 
+        return sorted(spawn_points, 
             key=lambda p: initial_point.location.distance(p.location))
+
+    def _configure_traffic_manager(self, vehicle: carla.Vehicle):
+        """Apply per-vehicle traffic manager settings"""
+        self.traffic_manager.auto_lane_change(vehicle, True)
+        self.traffic_manager.random_left_lanechange_percentage(vehicle, 10)
+        self.traffic_manager.random_right_lanechange_percentage(vehicle, 10)
+
+    def spawn_vehicles(self, num_vehicles: int,
+                       spawn_points: Optional[List[carla.Transform]] = None) -> List[carla.Vehicle]:
+        """Spawn vehicles close to each other, optionally restricted to given spawn points"""
+        sorted_points = self._sorted_spawn_points(spawn_points)
+        if not sorted_points:
+            logging.error("No spawn points found")
+            return []
         
         spawned_vehicles = []
         max_attempts = num_vehicles * 2
@@ -52,9 +67,7 @@ class VehicleManager:
                 
                 # Configure autopilot for this vehicle
                 vehicle.set_autopilot(True, self.traffic_manager.get_port())
-                self.traffic_manager.auto_lane_change(vehicle, True)
-                self.traffic_manager.random_left_lanechange_percentage(vehicle, 10)
-                self.traffic_manager.random_right_lanechange_percentage(vehicle, 10)
+                self._configure_traffic_manager(vehicle)
                 
                 spawned_vehicles.append(vehicle)
             except RuntimeError as e:
@@ -66,11 +79,87 @@ class VehicleManager:
             logging.warning(f"Only spawned {len(spawned_vehicles)}/{num_vehicles} vehicles after {attempts} attempts")
         
         return spawned_vehicles
+
+    def spawn_vehicles_batch(self, num_vehicles: int, autopilot: bool = True,
+                             spawn_points: Optional[List[carla.Transform]] = None) -> List[carla.Vehicle]:
+        """Spawn vehicles close to each other with one batched RPC per attempt round"""
+        sorted_points = self._sorted_spawn_points(spawn_points)
+        if not sorted_points:
+            logging.error("No spawn points found")
+            return []
+
+        return self._spawn_batch(num_vehicles, autopilot, sorted_points, self.vehicles)
+
+    def spawn_background_vehicles(self, num_vehicles: int) -> List[carla.Vehicle]:
+        """Spawn sensorless traffic manager vehicles spread over the map's free spawn points"""
+        occupied = [vehicle.get_location() for vehicle in self.vehicles.values()]
+        free_points = [
+            point for point in self.world.get_map().get_spawn_points()
+            if all(point.location.distance(location) > 5.0 for location in occupied)
+        ]
+        if not free_points:
+            logging.error("No free spawn points for background vehicles")
+            return []
+
+        random.shuffle(free_points)
+        return self._spawn_batch(num_vehicles, True, free_points, self.background_vehicles)
+
+    def _spawn_batch(self, num_vehicles: int, autopilot: bool, spawn_points: List[carla.Transform],
+                     registry: Dict[int, carla.Vehicle]) -> List[carla.Vehicle]:
+        """Spawn vehicles over spawn_points in batched rounds and register them under sequential IDs"""
+        vehicle_blueprints = self.blueprint_library.filter('vehicle.*')
+        tm_port = self.traffic_manager.get_port()
+        # In synchronous mode the new actors only exist after the next tick
+        do_tick = self.world.get_settings().synchronous_mode
+
+        spawned_ids = []
+        max_attempts = num_vehicles * 2
+        attempts = 0
+
+        while len(spawned_ids) < num_vehicles and attempts < max_attempts:
+            round_size = min(num_vehicles - len(spawned_ids), max_attempts - attempts)
+            batch = [
+                carla.command.SpawnActor(
+                    random.choice(vehicle_blueprints),
+                    spawn_points[(attempts + i) % len(spawn_points)]
+                ).then(carla.command.SetAutopilot(carla.command.FutureActor, autopilot, tm_port))
+                for i in range(round_size)
+            ]
+            attempts += round_size
+
+            for response in self.client.apply_batch_sync(batch, do_tick):
+                if response.error:
+                    logging.warning(f"Failed to spawn vehicle: {response.error}")
+                else:
+                    spawned_ids.append(response.actor_id)
+
+        actors = {actor.id: actor for actor in self.world.get_actors(spawned_ids)}
+        spawned_vehicles = []
+        for actor_id in spawned_ids:
+            vehicle = actors.get(actor_id)
+            if vehicle is None:
+                continue
+            seq_id = self.next_sequential_id
+            self.sequential_mapping[vehicle.id] = seq_id
+            registry[seq_id] = vehicle
+            self.next_sequential_id += 1
+            # Traffic manager settings are local calls with no batch command
+            self._configure_traffic_manager(vehicle)
+            spawned_vehicles.append(vehicle)
+
+        if len(spawned_vehicles) < num_vehicles:
+            logging.warning(f"Only spawned {len(spawned_vehicles)}/{num_vehicles} vehicles after {attempts} attempts")
+
+        return spawned_vehicles
         
     def get_vehicles(self) -> List[carla.Vehicle]:
         """Get list of all managed vehicles"""
         return list(self.vehicles.values())
         
+    def get_background_vehicles(self) -> Dict[int, carla.Vehicle]:
+        """Get background traffic vehicles keyed by sequential ID"""
+        return self.background_vehicles
+        
     def get_sequential_ids(self) -> List[int]:
         """Get list of sequential IDs for all managed vehicles"""
         return sorted(list(self.vehicles.keys()))
@@ -81,6 +170,13 @@ class VehicleManager:
             if vehicle.is_alive:
                 vehicle.destroy()
         self.vehicles.clear()
+
+        # Background traffic can be hundreds of actors, destroy it in one batch
+        if self.background_vehicles:
+            self.client.apply_batch([
+                carla.command.DestroyActor(vehicle.id) for vehicle in self.background_vehicles.values()
+            ])
+            self.background_vehicles.clear()
         self.sequential_mapping.clear()
         self.next_sequential_id = 1
         